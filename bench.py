@@ -0,0 +1,13 @@
+"""
+запуск бенчмарков
+"""
+import sys
+import os
+
+# Корень проекта нужен для импорта src и benchmarks
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from benchmarks.suite import main
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,214 @@
+"""
+Заглушки виджетов Tkinter для запуска бенчмарков без дисплея
+
+Реализуют только то подмножество API канваса, которое использует
+игровое поле. Отложенные вызовы (after) не выполняются сами:
+бенчмарки вызывают нужные методы напрямую.
+"""
+import itertools
+from types import SimpleNamespace
+from typing import Callable, Dict, List
+
+
+class StubWidget:
+    """Базовый виджет-заглушка"""
+
+    def __init__(self, master=None, **options):
+        self.master = master
+        self.options = options
+        self._width = options.get("width", 800)
+        self._height = options.get("height", 600)
+        self._after_ids = itertools.count(1)
+        self.pending: Dict[str, Callable] = {}
+
+    def pack(self, **options) -> None:
+        pass
+
+    def pack_forget(self) -> None:
+        pass
+
+    def place(self, **options) -> None:
+        pass
+
+    def bind(self, sequence: str, func: Callable, add: str = None) -> None:
+        pass
+
+    def config(self, **options) -> None:
+        self.options.update(options)
+
+    configure = config
+
+    def after(self, delay: int, func: Callable) -> str:
+        after_id = f"after#{next(self._after_ids)}"
+        self.pending[after_id] = func
+        return after_id
+
+    def after_idle(self, func: Callable) -> str:
+        return self.after(0, func)
+
+    def after_cancel(self, after_id: str) -> None:
+        self.pending.pop(after_id, None)
+
+    def run_pending(self) -> None:
+        """Выполняет все накопившиеся отложенные вызовы"""
+        pending, self.pending = self.pending, {}
+        for func in pending.values():
+            func()
+
+    def winfo_exists(self) -> bool:
+        return True
+
+    def winfo_width(self) -> int:
+        return self._width
+
+    def winfo_height(self) -> int:
+        return self._height
+
+    def winfo_reqwidth(self) -> int:
+        # Запрошенный размер кнопки без явных размеров
+        return self.options.get("width", 80)
+
+    def winfo_reqheight(self) -> int:
+        return self.options.get("height", 30)
+
+    def update(self) -> None:
+        pass
+
+    def destroy(self) -> None:
+        self.pending.clear()
+
+    def update_idletasks(self) -> None:
+        pass
+
+    def resize(self, width: int, height: int) -> None:
+        """Имитирует изменение размера виджета"""
+        self._width = width
+        self._height = height
+
+
+class StubCanvas(StubWidget):
+    """Канвас-заглушка, хранящий элементы в словаре"""
+
+    def __init__(self, master=None, **options):
+        super().__init__(master, **options)
+        self.items: Dict[int, dict] = {}
+        self._ids = itertools.count(1)
+
+    def _create(self, kind: str, coords: tuple, options: dict) -> int:
+        item = next(self._ids)
+        if len(coords) == 1 and isinstance(coords[0], (list, tuple)):
+            coords = tuple(coords[0])
+        tags = options.pop("tags", ())
+        if isinstance(tags, str):
+            tags = (tags,)
+        self.items[item] = {"kind": kind, "coords": list(coords),
+                            "tags": set(tags), **options}
+        return item
+
+    def create_rectangle(self, *coords, **options) -> int:
+        return self._create("rectangle", coords, options)
+
+    def create_oval(self, *coords, **options) -> int:
+        return self._create("oval", coords, options)
+
+    def create_polygon(self, *coords, **options) -> int:
+        return self._create("polygon", coords, options)
+
+    def create_line(self, *coords, **options) -> int:
+        return self._create("line", coords, options)
+
+    def create_text(self, *coords, **options) -> int:
+        return self._create("text", coords, options)
+
+    def create_image(self, *coords, **options) -> int:
+        return self._create("image", coords, options)
+
+    def _resolve(self, tag_or_id) -> List[int]:
+        if tag_or_id == "all":
+            return list(self.items)
+        if isinstance(tag_or_id, int):
+            return [tag_or_id] if tag_or_id in self.items else []
+        return [item for item, data in self.items.items() if tag_or_id in data["tags"]]
+
+    def coords(self, tag_or_id, *coords):
+        items = self._resolve(tag_or_id)
+        if not coords:
+            return list(self.items[items[0]]["coords"]) if items else []
+        if len(coords) == 1 and isinstance(coords[0], (list, tuple)):
+            coords = tuple(coords[0])
+        for item in items:
+            self.items[item]["coords"] = list(coords)
+
+    def itemconfigure(self, tag_or_id, **options) -> None:
+        for item in self._resolve(tag_or_id):
+            self.items[item].update(options)
+
+    itemconfig = itemconfigure
+
+    def delete(self, *tags_or_ids) -> None:
+        for tag_or_id in tags_or_ids:
+            for item in self._resolve(tag_or_id):
+                del self.items[item]
+
+    def find_withtag(self, tag_or_id) -> tuple:
+        return tuple(self._resolve(tag_or_id))
+
+    def find_all(self) -> tuple:
+        return tuple(self.items)
+
+    def find_overlapping(self, x1, y1, x2, y2) -> tuple:
+        found = []
+        for item, data in self.items.items():
+            xs = data["coords"][::2]
+            ys = data["coords"][1::2]
+            if xs and min(xs) <= x2 and max(xs) >= x1 and min(ys) <= y2 and max(ys) >= y1:
+                found.append(item)
+        return tuple(found)
+
+    def tag_raise(self, tag_or_id, above=None) -> None:
+        pass
+
+    def tag_lower(self, tag_or_id, below=None) -> None:
+        pass
+
+    def scale(self, tag_or_id, x0, y0, xs, ys) -> None:
+        for item in self._resolve(tag_or_id):
+            coords = self.items[item]["coords"]
+            for i in range(0, len(coords), 2):
+                coords[i] = x0 + (coords[i] - x0) * xs
+                coords[i + 1] = y0 + (coords[i + 1] - y0) * ys
+
+
+class StubPhotoImage:
+    """Изображение-заглушка"""
+
+    def __init__(self, master=None, width: int = 0, height: int = 0):
+        self.width = width
+        self.height = height
+        self.data = None
+
+    def put(self, data: str, to: tuple = None) -> None:
+        self.data = data
+
+    def zoom(self, x: int, y: int = None) -> "StubPhotoImage":
+        image = StubPhotoImage(width=self.width * x, height=self.height * (y or x))
+        image.data = self.data
+        return image
+
+
+# Пространство имен, подменяющее модуль tkinter в модулях игры
+stub_tk = SimpleNamespace(
+    Tk=StubWidget,
+    PhotoImage=StubPhotoImage,
+    Frame=StubWidget,
+    Button=StubWidget,
+    Label=StubWidget,
+    Canvas=StubCanvas,
+    Misc=StubWidget,
+    Event=SimpleNamespace,
+)
+
+
+def make_event(x: float, y: float, time_ms: int = 0) -> SimpleNamespace:
+    """Создает событие мыши"""
+    return SimpleNamespace(x=x, y=y, time=time_ms)
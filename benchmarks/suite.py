@@ -0,0 +1,501 @@
+"""
+Бенчмарки горячих путей: отрисовка фона, спавн, клик, анимации, переходы
+
+Результаты выводятся в JSON с перцентилями (мкс), чтобы сравнивать
+их между коммитами.
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tkinter as tk
+from typing import Callable, Dict, List, Optional
+from benchmarks.stub import StubCanvas, StubWidget, make_event, stub_tk
+
+GRADIENT_SIZES = {
+    "800x600": (800, 600),
+    "1080p": (1920, 1080),
+    "4k": (3840, 2160),
+}
+
+
+class Skip(Exception):
+    """Бенчмарк не может быть выполнен в текущем окружении"""
+
+
+def summarize(samples_ns: List[int]) -> Dict[str, float]:
+    """Сводит замеры в перцентили (мкс)"""
+    ordered = sorted(samples_ns)
+    count = len(ordered)
+
+    def pick(q: float) -> float:
+        return ordered[min(count - 1, int(q * count))] / 1000
+
+    return {
+        "n": count,
+        "mean_us": sum(ordered) / count / 1000,
+        "min_us": ordered[0] / 1000,
+        "p50_us": pick(0.50),
+        "p90_us": pick(0.90),
+        "p99_us": pick(0.99),
+        "max_us": ordered[-1] / 1000,
+    }
+
+
+def measure(func: Callable[[], None], iterations: int,
+            setup: Optional[Callable[[], None]] = None,
+            warmup: int = 5) -> Dict[str, float]:
+    """
+    Замеряет время вызова func
+
+    :param setup: Подготовка перед каждым вызовом (не входит в замер)
+    """
+    for _ in range(warmup):
+        if setup:
+            setup()
+        func()
+
+    samples = []
+    clock = time.perf_counter_ns
+    for _ in range(iterations):
+        if setup:
+            setup()
+        started = clock()
+        func()
+        samples.append(clock() - started)
+    return summarize(samples)
+
+
+class Environment:
+    """Окно и игровое поле для бенчмарков (настоящий Tk или заглушки)"""
+
+    def __init__(self, backend: str):
+        self.backend = backend
+        self.root = None
+        self.log_dir = tempfile.TemporaryDirectory()
+        if backend in ("auto", "tk"):
+            try:
+                self.root = tk.Tk()
+                self.root.geometry("800x600")
+                self.backend = "tk"
+            except tk.TclError:
+                if backend == "tk":
+                    raise
+                self.backend = "stub"
+        self._field = None
+        self._patched = []
+        if self.backend == "stub":
+            # Модули игры обращаются к tkinter через глобальное имя tk
+            from src.utils import animations
+            self._patch(animations)
+
+    def _patch(self, module) -> None:
+        """Подменяет tkinter в модуле на заглушки до закрытия окружения"""
+        self._patched.append((module, module.tk))
+        module.tk = stub_tk
+
+    def field(self):
+        """Создает игровое поле (один раз)"""
+        if self._field is not None:
+            return self._field
+        try:
+            import src.components.field as field_module
+            from src.core.recording import NullRecorder
+            from src.utils.audio import AudioEngine, NullBackend
+            from src.utils.trial_log import TrialLog
+        except ImportError as e:
+            raise Skip(f"игровое поле недоступно: {e}")
+
+        # Без записи сессий в каталог запуска и без звука платформы:
+        # замеры не оставляют следов и не зависят от аудиоустройства
+        options = {"recorder": NullRecorder(), "audio": AudioEngine(NullBackend())}
+        if self.backend == "tk":
+            field = field_module.GameField(self.root, lambda: None, **options)
+            field.show()
+            self.root.update()
+        else:
+            self._patch(field_module)
+            field = field_module.GameField(StubWidget(), lambda: None, **options)
+
+        field.trial_log = TrialLog(os.path.join(self.log_dir.name, "trials.bin"))
+        # Уровень фиксирован: иначе контроллер сложности меняет режим посреди замера
+        # (стоимость самого контроллера замеряется отдельно)
+        field.engine.adaptive = None
+        self._field = field
+        return field
+
+    def canvas(self, width: int = 800, height: int = 600):
+        """Создает отдельный канвас заданного размера"""
+        if self.backend == "tk":
+            canvas = tk.Canvas(self.root, width=width, height=height,
+                               highlightthickness=0)
+            canvas.pack()
+            self.root.update()
+            return canvas
+        return StubCanvas(width=width, height=height)
+
+    def close(self) -> None:
+        if self._field is not None:
+            self._field.stop_game()
+            self._field.close()
+        if self.root is not None:
+            self.root.destroy()
+        for module, real_tk in reversed(self._patched):
+            module.tk = real_tk
+        self.log_dir.cleanup()
+
+
+def bench_gradient(env: Environment, size: str, iterations: int,
+                   cached: bool) -> Dict[str, float]:
+    """
+    Отрисовка градиентного фона
+
+    С заглушками замеряется только подготовка данных изображения.
+    """
+    from src.utils import animations
+    from src.utils.colors import COLORS
+
+    width, height = GRADIENT_SIZES[size]
+    canvas = env.canvas(width, height)
+
+    def setup() -> None:
+        canvas.delete("all")
+        if not cached:
+            animations._gradient_cache.clear()
+
+    result = measure(
+        lambda: animations.create_gradient(canvas, COLORS["gradient1"], COLORS["gradient2"]),
+        iterations, setup
+    )
+    canvas.destroy()
+    return result
+
+
+def bench_spawn(env: Environment, mode: str, iterations: int) -> Dict[str, float]:
+    """Спавн стимула в заданном режиме"""
+    field = env.field()
+    field.start_game(mode, "medium")
+    result = measure(field.spawn_shape, iterations)
+    field.stop_game()
+    return result
+
+
+def bench_click(env: Environment, iterations: int) -> Dict[str, float]:
+    """Клик по стимулу: проверка попадания, счет, журнал"""
+    field = env.field()
+    field.start_game("color", "medium")
+    event = make_event(0, 0)
+
+    def setup() -> None:
+        field.spawn_shape()
+        stimulus = field.engine.current
+        event.x = stimulus.x
+        event.y = stimulus.y
+
+    result = measure(lambda: field.on_click(event), iterations, setup)
+    field.stop_game()
+    return result
+
+
+def bench_rush(env: Environment, iterations: int, click: bool) -> Dict[str, float]:
+    """Режим "rush" при максимальном числе живых целей: партия или клик"""
+    from src.utils.settings import GAME
+
+    field = env.field()
+    field.start_game("rush", "easy")
+    # Заполняем поле до предела
+    rush = GAME["rush"]
+    for _ in range(rush["max_targets"] // rush["batch"] + 1):
+        field.rush_tick()
+    event = make_event(0, 0)
+
+    def setup() -> None:
+        if click:
+            field.rush_tick()
+            target = next(iter(field.engine.targets.values()))
+            event.x = target.stimulus.x
+            event.y = target.stimulus.y
+
+    if click:
+        result = measure(lambda: field.on_click(event), iterations, setup)
+    else:
+        result = measure(field.rush_tick, iterations)
+    field.stop_game()
+    return result
+
+
+def bench_animation_step(env: Environment, kind: str,
+                         iterations: int) -> Dict[str, float]:
+    """Один шаг анимации фигуры или текста"""
+    from src.utils.animations import animate_shape, animate_text
+    from src.utils.scheduler import get_scheduler
+    from src.utils.settings import ANIMATION
+
+    canvas = env.canvas()
+    if kind == "shape":
+        item = canvas.create_oval(375, 275, 425, 325, fill="#ffffff")
+        handle = animate_shape(canvas, item)
+    else:
+        item = canvas.create_text(790, 30, text="Счет: 0", anchor="e")
+        handle = animate_text(canvas, item, 790, 30)
+    get_scheduler(canvas).cancel_all()
+
+    frames = ANIMATION["steps"]
+    frame = [0]
+
+    def step() -> None:
+        handle.step(frame[0] % frames)
+        frame[0] += 1
+
+    result = measure(step, iterations)
+    canvas.destroy()
+    return result
+
+
+def bench_transition(env: Environment, iterations: int) -> Dict[str, float]:
+    """Переход меню -> игра -> меню"""
+    field = env.field()
+
+    def cycle() -> None:
+        field.stop_game()
+        field.hide()
+        field.show()
+        field.start_game("color", "medium")
+
+    result = measure(cycle, iterations)
+    field.stop_game()
+    return result
+
+
+def bench_resize(env: Environment, iterations: int,
+                 burst: int = 100) -> Dict[str, float]:
+    """Серия из burst событий <Configure> (как при входе в полноэкранный режим)"""
+    field = env.field()
+    layout = field.layout
+    sizes = [make_event(0, 0) for _ in range(burst)]
+    for i, event in enumerate(sizes):
+        event.width = 800 + i % 7
+        event.height = 600 + i % 5
+
+    def resize() -> None:
+        for event in sizes:
+            layout._on_configure(event)
+        if env.backend == "stub":
+            # Настоящий Tk сообщает размер последнего события серии
+            field.canvas.resize(event.width, event.height)
+        layout.flush()
+
+    result = measure(resize, iterations)
+    backgrounds = len(field.canvas.find_withtag("gradient"))
+    if backgrounds != 1:
+        raise RuntimeError(f"после изменения размера на канвасе {backgrounds} фонов")
+    return result
+
+
+def bench_replay(env: Environment, iterations: int,
+                 trials: int = 1000) -> Dict[str, float]:
+    """Воспроизведение записанной сессии из trials попыток без дисплея"""
+    from src.core.recording import SessionRecorder, replay_session
+
+    field = env.field()
+    path = os.path.join(env.log_dir.name, "replay.rec")
+    recorder, field.recorder = field.recorder, SessionRecorder(path)
+    field.start_game("color", "medium")
+    event = make_event(0, 0)
+    for _ in range(trials):
+        field.spawn_shape()
+        stimulus = field.engine.current
+        event.x, event.y = stimulus.x, stimulus.y
+        field.on_click(event)
+    field.stop_game()
+    field.recorder.close()
+    field.recorder = recorder
+
+    result = replay_session(path)
+    if not result.ok:
+        raise RuntimeError(f"воспроизведение расходится с записью: {result.mismatches[:3]}")
+    return measure(lambda: replay_session(path), iterations)
+
+
+def rss_kb() -> int:
+    """Текущий размер резидентной памяти процесса (КБ)"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError, AttributeError):
+        # Без /proc доступен только пик
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def bench_endurance(env: Environment, trials: int = 100_000,
+                    samples: int = 10,
+                    rss_limit_kb: int = 16 * 1024) -> Dict[str, object]:
+    """
+    Долгая сессия: trials попыток подряд в одной игре
+
+    Проверяет, что после прогрева не растет число элементов канваса,
+    а RSS прибавляет не больше rss_limit_kb (шум аллокатора).
+    """
+    from src.utils.resources import live_counts
+
+    field = env.field()
+    canvas = field.canvas
+    field.start_game("color", "medium")
+    event = make_event(0, 0)
+
+    def trial() -> None:
+        stimulus = field.engine.current
+        event.x, event.y = stimulus.x, stimulus.y
+        field.on_click(event)
+        if env.backend == "stub":
+            # Цикл событий: спавн, кадры анимаций, перерисовка счета
+            canvas.run_pending()
+        else:
+            field.spawn_shape()
+            env.root.update()
+
+    history = []
+    step = trials // samples
+    started = time.perf_counter()
+    for sample in range(samples + 1):
+        if sample:
+            for _ in range(step):
+                trial()
+        field.trial_log.flush()
+        history.append({
+            "trials": sample * step,
+            "canvas_items": len(canvas.find_all()),
+            "rss_kb": rss_kb(),
+            "resources": live_counts(),
+        })
+    elapsed = time.perf_counter() - started
+    field.stop_game()
+
+    # Первая точка - после прогрева (пулы и кэши уже заполнены)
+    warm, last = history[1], history[-1]
+    if last["canvas_items"] > warm["canvas_items"]:
+        raise RuntimeError(
+            f"элементов канваса стало больше: {warm['canvas_items']} -> {last['canvas_items']}"
+        )
+    rss_growth = last["rss_kb"] - warm["rss_kb"]
+    if rss_growth > rss_limit_kb:
+        raise RuntimeError(
+            f"RSS вырос на {rss_growth} КБ: {warm['rss_kb']} -> {last['rss_kb']}"
+        )
+    return {
+        "trials": trials,
+        "trials_per_s": trials / elapsed,
+        "canvas_items": last["canvas_items"],
+        "rss_growth_kb": rss_growth,
+        "history": history,
+    }
+
+
+def bench_adaptive(iterations: int) -> Dict[str, float]:
+    """Обновление контроллера сложности на одном попадании"""
+    import random
+    from src.core.adaptive import AdaptiveController
+
+    controller = AdaptiveController("color", "hard", random.Random(0))
+    return measure(lambda: controller.on_hit(350.0, 0), iterations)
+
+
+def build_suite(env: Environment, iterations: int) -> Dict[str, Callable[[], Dict]]:
+    """Собирает список бенчмарков"""
+    suite = {}
+    for size in GRADIENT_SIZES:
+        suite[f"gradient_{size}_cold"] = (
+            lambda size=size: bench_gradient(env, size, max(3, iterations // 100), False)
+        )
+        suite[f"gradient_{size}_cached"] = (
+            lambda size=size: bench_gradient(env, size, iterations, True)
+        )
+    for mode in ("color", "shape", "sound"):
+        suite[f"spawn_{mode}"] = lambda mode=mode: bench_spawn(env, mode, iterations)
+    suite["click_hit"] = lambda: bench_click(env, iterations)
+    suite["rush_tick_full"] = lambda: bench_rush(env, iterations, False)
+    suite["rush_click_full"] = lambda: bench_rush(env, iterations, True)
+    suite["adaptive_update"] = lambda: bench_adaptive(iterations)
+    suite["animate_shape_step"] = lambda: bench_animation_step(env, "shape", iterations)
+    suite["animate_text_step"] = lambda: bench_animation_step(env, "text", iterations)
+    suite["resize_burst"] = lambda: bench_resize(env, max(10, iterations // 10))
+    suite["replay_1000"] = lambda: bench_replay(env, max(3, iterations // 100))
+    suite["transition"] = lambda: bench_transition(env, max(10, iterations // 10))
+    suite["endurance_100k"] = lambda: bench_endurance(env)
+    return suite
+
+
+def git_revision() -> Optional[str]:
+    """Возвращает текущий коммит, если доступен git"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+            check=True, cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(backend: str = "auto", iterations: int = 1000,
+        only: Optional[str] = None) -> Dict[str, object]:
+    """
+    Выполняет бенчмарки
+
+    :param backend: "tk", "stub" или "auto" (Tk, если доступен дисплей)
+    :param iterations: Число замеров на бенчмарк
+    :param only: Подстрока для отбора бенчмарков по имени
+    """
+    env = Environment(backend)
+    results = {}
+    # Сообщения игры не должны попадать в JSON на stdout
+    with contextlib.redirect_stdout(sys.stderr):
+        try:
+            for name, bench in build_suite(env, iterations).items():
+                if only and only not in name:
+                    continue
+                try:
+                    results[name] = bench()
+                except Skip as e:
+                    results[name] = {"skipped": str(e)}
+        finally:
+            env.close()
+
+    return {
+        "meta": {
+            "backend": env.backend,
+            "iterations": iterations,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "revision": git_revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Бенчмарки тренажера реакции")
+    parser.add_argument("--backend", choices=("auto", "tk", "stub"), default="auto")
+    parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument("--only", help="запускать только бенчмарки, содержащие подстроку")
+    parser.add_argument("--output", help="файл для JSON (по умолчанию stdout)")
+    args = parser.parse_args(argv)
+
+    report = run(args.backend, args.iterations, args.only)
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,13 @@
+"""
+калибровка формулы очков и порогов прогрессии
+"""
+import sys
+import os
+
+# Корень проекта нужен для импорта src
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from src.core.calibration import main
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,13 @@
+"""
+экспорт истории попыток в CSV или Parquet
+"""
+import sys
+import os
+
+# Корень проекта нужен для импорта src
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from src.utils.export import main
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -7,6 +7,18 @@ import os
 # Добавляем путь к src в PYTHONPATH
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "src")))
 
+# Флаги запуска разбираются до импорта модулей игры:
+# --profile выводит отчет профилирования в stderr, --profile=файл.json
+# пишет его в файл, --user=имя выбирает профиль игрока
+for arg in sys.argv[1:]:
+    if arg == "--profile":
+        os.environ.setdefault("REACTION_PROFILE", "1")
+    elif arg.startswith("--profile="):
+        os.environ["REACTION_PROFILE"] = arg.split("=", 1)[1]
+    elif arg.startswith("--user="):
+        # Профиль игрока в базе результатов
+        os.environ["REACTION_USER"] = arg.split("=", 1)[1]
+
 from main import ReactionTrainer
 
 if __name__ == "__main__":
@@ -2,36 +2,51 @@
 Модуль с игровым полем
 """
 import tkinter as tk
-import random
-import time
-import winsound
 from typing import Callable, Dict, List, Optional, Tuple
-from src.utils.colors import COLORS
-from src.utils.animations import (
-    create_gradient, animate_shape,
-    create_flash_effect, animate_text
-)
-from src.utils.settings import GAME, WINDOW, LOCALIZATION
+from src.components.hud import ScoreHud
+from src.components.stimuli import StimulusPool
+from src.core.engine import GameEngine
+from src.core.recording import SessionRecorder, make_recorder
+from src.core.schedule import Rect, build_schedule
+from src.utils.animations import create_gradient, animate_shape, create_flash_effect
+from src.utils.config import current
+from src.utils.layout import get_layout
+from src.utils.scheduler import get_scheduler
+from src.utils.settings import SCHEDULE, LOCALIZATION
+from src.utils.loop_monitor import LoopMonitor, overlay_enabled
+from src.utils.profiling import profiled
+from src.utils.resources import ResourceRegistry
+from src.utils.timing import ReactionTimer
+from src.utils.trial_log import FLAG_COMPROMISED, FLAG_SILENT, TrialLog
 
 
 class GameField:
-    def __init__(self, parent: tk.Tk, on_menu: Callable):
+    def __init__(self, parent: tk.Tk, on_menu: Callable,
+                 monitor: Optional[LoopMonitor] = None,
+                 recorder: Optional[SessionRecorder] = None,
+                 audio=None):
         """
         Инициализация игрового поля
         
         :param parent: Родительское окно
         :param on_menu: Функция для возврата в меню
+        :param monitor: Монитор задержек цикла событий
+        :param recorder: Запись сессии (по умолчанию - make_recorder())
+        :param audio: Звуковой движок (по умолчанию создается при первом звуке)
         """
         self.parent = parent
         self.on_menu = on_menu
+        self.monitor = monitor
+        self.config = current()
+        colors = self.config.colors
         
         # Создание фрейма и канваса
         self.frame = tk.Frame(parent)
         self.canvas = tk.Canvas(
             self.frame,
-            width=WINDOW["width"],
-            height=WINDOW["height"],
-            bg=COLORS["bg"],
+            width=self.config.window.width,
+            height=self.config.window.height,
+            bg=colors.bg,
             highlightthickness=0
         )
         self.canvas.pack(expand=True, fill="both")
@@ -42,32 +57,56 @@ class GameField:
             text=LOCALIZATION["buttons"]["menu"],
             command=self.on_menu,
             font=("Helvetica", 12),
-            bg=COLORS["button"],
-            fg=COLORS["text"]
+            bg=colors.button,
+            fg=colors.text
         )
+        self.menu_button_position = (10, 10)
         self.menu_button.place(x=10, y=10)
         
         # Инициализация переменных
+        self.engine = GameEngine()
+        self.pool = StimulusPool(self.canvas)
         self.current_shape = None
-        self.current_score = 0
-        self.best_score = 0
-        self.score_text = None
-        self.game_mode = "color"
-        self.difficulty = "medium"
-        self.animation_ids = []
+        self.shape_animation = None
+        self.staged = None  # (ID элемента, стимул) следующего стимула
+        self.rush_items = {}  # ID цели режима "rush" -> (ID элемента, анимация)
+        self.hud = ScoreHud(self.canvas)
+        # Отложенные вызовы и анимации поля (завершенные убираются сами)
+        self.resources = ResourceRegistry(self.canvas, "field")
         self.next_spawn_id = None
-        self.spawn_delay = GAME["spawn_delay"]["medium"]
-        self.last_spawn_time = 0
-        self.is_running = False
-        self.has_sound = False  # Флаг наличия звука у текущего объекта
+        self.timer = ReactionTimer()
+        self.trial_log = TrialLog()
+        self.recorder = recorder or make_recorder()
+        self._audio = audio  # Звуковой движок создается при первом звуке
+        self.sound_ticket = None  # Квитанция звука текущего стимула
         
         # Привязка событий
         self.canvas.bind("<Button-1>", self.on_click)
+
+        if monitor is not None and overlay_enabled():
+            monitor.attach_overlay(self.canvas)
         
-        # Создание градиентного фона
-        self.canvas.bind("<Configure>", lambda e: create_gradient(
-            self.canvas, COLORS["gradient1"], COLORS["gradient2"]
-        ))
+        # Раскладка: размеры канваса и пересчет фона раз за серию событий
+        self.layout = get_layout(self.canvas)
+        self.layout.subscribe(self._on_resize)
+
+    @property
+    def audio(self):
+        """Звуковой движок (создается при первом обращении)"""
+        if self._audio is None:
+            from src.utils.audio import AudioEngine
+            self._audio = AudioEngine()
+        return self._audio
+
+    def close(self) -> None:
+        """Дописывает журнал, останавливает фоновые потоки и освобождает ресурсы"""
+        self.resources.close()
+        self.hud.resources.close()
+        self.pool.resources.close()
+        self.trial_log.close()
+        self.recorder.close()
+        if self._audio is not None:
+            self._audio.close()
 
     def start_game(self, mode: str, difficulty: str,
                   current_score: int = 0,
@@ -80,12 +119,21 @@ class GameField:
         :param current_score: Текущий счет
         :param best_score: Лучший счет
         """
-        self.game_mode = mode
-        self.difficulty = difficulty
-        self.current_score = current_score
-        self.best_score = best_score
-        self.spawn_delay = GAME["spawn_delay"][difficulty]
-        self.is_running = True
+        if current() is not self.config:
+            self.apply_config()
+        self.engine.start(mode, difficulty, current_score, best_score)
+
+        # Вся последовательность стимулов строится заранее под реальный канвас
+        width, height, exclusions = self.play_area()
+        self.engine.resize(width, height)
+        schedule = build_schedule(mode, width, height, exclusions)
+        self.engine.use_schedule(schedule)
+        # Генератор движка тоже от зерна: сессию можно воспроизвести по записи
+        self.engine.rng.seed(schedule.seed)
+        self.recorder.start(self.engine, schedule.seed, self.timer.clock())
+        if mode == "sound":
+            # Тон синтезируется заранее, а не на первом стимуле
+            self.audio.tone()
         
         # Очистка анимаций
         self.cleanup_animations()
@@ -94,200 +142,334 @@ class GameField:
         self.update_score()
         
         # Запуск спавна объектов
-        self.spawn_shape()
+        if mode == "rush":
+            self.rush_tick()
+        else:
+            self.spawn_shape()
+
+    def _on_resize(self, width: int, height: int) -> None:
+        """Заменяет фон и переносит стимулы в новые границы канваса"""
+        create_gradient(self.canvas, self.config.colors.gradient1,
+                        self.config.colors.gradient2)
+        engine = self.engine
+        if not engine.is_running:
+            return
+        engine.resize(width, height)
+        schedule = engine.schedule
+        if schedule is None:
+            return
+        staged_index = schedule.index - 1
+        schedule.resize(width, height, self.exclusions(width, height))
+
+        # Уже выбранные стимулы переносятся, а не выбираются заново,
+        # чтобы не сдвигать последовательность расписания
+        if self.staged is not None:
+            item, stimulus = self.staged
+            moved = schedule.relocate(stimulus, f"stimulus:{staged_index}")
+            if moved is not stimulus:
+                self.pool.release(item)
+                self.staged = (self.pool.stage(moved), moved)
+        for target in list(engine.targets.values()):
+            moved = schedule.relocate(target.stimulus, f"target:{target.target_id}")
+            if moved is target.stimulus:
+                continue
+            engine.move_target(target.target_id, moved.x, moved.y)
+            self.recorder.move(target.target_id, moved.x, moved.y, self.timer.clock())
+            item, animation = self.rush_items[target.target_id]
+            if animation:
+                animation.cancel()
+            self.pool.release(item)
+            item = self.pool.stage(moved)
+            self.pool.show(item)
+            self.rush_items[target.target_id] = (item, None)
+
+    def apply_config(self) -> None:
+        """Применяет перечитанную конфигурацию к виджетам поля"""
+        self.config = current()
+        colors = self.config.colors
+        self.canvas.configure(bg=colors.bg)
+        self.menu_button.configure(bg=colors.button, fg=colors.text)
+        get_scheduler(self.canvas).interval = self.config.animation.speed
+        self.layout.interval = self.config.animation.speed
+        # Фон и счет пересоздаются в cleanup_animations уже с новыми цветами
+        self.canvas.delete("gradient")
+
+    def play_area(self) -> Tuple[int, int, List[Rect]]:
+        """
+        Возвращает размеры канваса и области, закрытые кнопкой меню и счетом
+        """
+        # Размер из серии событий <Configure>, которая еще не применена
+        self.layout.flush()
+        width, height = self.layout.width, self.layout.height
+        return width, height, self.exclusions(width, height)
+
+    def exclusions(self, width: int, height: int) -> List[Rect]:
+        """Области, закрытые кнопкой меню и счетом, при заданном размере канваса"""
+        margin = SCHEDULE["exclusion_margin"]
+        button = self.menu_button
+        button_x, button_y = self.menu_button_position
+        hud_width, hud_height = SCHEDULE["hud_size"]
+        exclusions = [
+            Rect(0, 0,
+                 button_x + button.winfo_reqwidth() + margin,
+                 button_y + button.winfo_reqheight() + margin),
+            Rect(width - hud_width - margin, 0, width, hud_height + margin)
+        ]
+        return exclusions
 
     def stop_game(self) -> None:
         """Останавливает приложение"""
-        if self.is_running:
-            print(f"\nИтог: {self.current_score}")
-            if self.current_score >= self.best_score:
-                print(f"Рекорд: {self.current_score}")
-        
-        self.is_running = False
+        engine = self.engine
+        # Итог игры попадает в запись сессии и в историю профиля
+        if engine.is_running:
+            self.recorder.stop(engine, self.timer.clock())
+        engine.stop()
         self.cleanup_animations()
+        self.trial_log.flush()
+        self.recorder.flush()
 
+    @profiled("field.cleanup_animations")
     def cleanup_animations(self) -> None:
         """Очищает все анимации"""
-        # Отменяем все анимации
-        for anim_id in self.animation_ids:
-            if anim_id:
-                self.canvas.after_cancel(anim_id)
-        self.animation_ids.clear()
-        
-        # Отменяем следующий спавн
-        if self.next_spawn_id:
-            self.canvas.after_cancel(self.next_spawn_id)
-            self.next_spawn_id = None
+        # Отменяем все анимации и следующий спавн
+        self.resources.cancel_all()
+        self.next_spawn_id = None
         
-        # Удаляем все объекты с канваса
-        self.canvas.delete("all")
+        # Прячем стимулы обратно в пул и убираем счет
+        for _, animation in self.rush_items.values():
+            if animation:
+                animation.cancel()
+        self.rush_items.clear()
+        self.pool.release_all()
+        self.current_shape = None
+        self.shape_animation = None
+        self.staged = None
+        self.hud.clear()
         
-        # Пересоздаем градиентный фон
-        create_gradient(self.canvas, COLORS["gradient1"], COLORS["gradient2"])
+        # Создаем градиентный фон, если его еще нет
+        if not self.canvas.find_withtag("gradient"):
+            create_gradient(self.canvas, self.config.colors.gradient1,
+                            self.config.colors.gradient2)
 
+    @profiled("field.spawn_shape")
     def spawn_shape(self) -> None:
-        """Создает новую фигуру"""
-        if not self.is_running:
+        """Показывает подготовленную фигуру и готовит следующую"""
+        if not self.engine.is_running:
+            return
+
+        self.timer.fired()
+
+        # Стимул, по которому так и не кликнули, засчитывается как пропуск
+        mode = self.engine.mode
+        if self.engine.current is not None:
+            self.recorder.expire(self.timer.clock())
+        self.engine.expire()
+        if self.follow_mode(mode):
             return
             
-        # Очищаем предыдущую фигуру
-        if self.current_shape:
-            self.canvas.delete(self.current_shape)
-            self.current_shape = None
-            
-        # Определяем размер и позицию
-        size = GAME["shape_size"]
-        padding = size + 20
-        x = random.randint(padding, WINDOW["width"] - padding)
-        y = random.randint(padding, WINDOW["height"] - padding)
-        
-        # Создаем фигуру в зависимости от режима
-        if self.game_mode == "color":
-            self.current_shape = self.canvas.create_rectangle(
-                x - size/2, y - size/2,
-                x + size/2, y + size/2,
-                fill=random.choice(list(COLORS["shapes"].values())),
-                outline=""
-            )
-            self.has_sound = True  # В режиме цвета всегда считаем попадания
-        elif self.game_mode == "shape":
-            shape_type = random.choice(["rectangle", "oval", "triangle"])
-            if shape_type == "rectangle":
-                self.current_shape = self.canvas.create_rectangle(
-                    x - size/2, y - size/2,
-                    x + size/2, y + size/2,
-                    fill=COLORS["shapes"]["default"],
-                    outline=""
-                )
-            elif shape_type == "oval":
-                self.current_shape = self.canvas.create_oval(
-                    x - size/2, y - size/2,
-                    x + size/2, y + size/2,
-                    fill=COLORS["shapes"]["default"],
-                    outline=""
-                )
-            else:  # triangle
-                points = [
-                    x, y - size/2,
-                    x - size/2, y + size/2,
-                    x + size/2, y + size/2
-                ]
-                self.current_shape = self.canvas.create_polygon(
-                    points,
-                    fill=COLORS["shapes"]["default"],
-                    outline=""
-                )
-            self.has_sound = True  # В режиме фигур всегда считаем попадания
-        elif self.game_mode == "sound":
-            # В режиме звука случайно определяем, будет ли звук
-            self.has_sound = random.random() < 0.4  # 40% шанс появления звука
-            
-            # Создаем белый круг для звукового режима
-            self.current_shape = self.canvas.create_oval(
-                x - size/2, y - size/2,
-                x + size/2, y + size/2,
-                fill=COLORS["shapes"]["default"],
-                outline=""
-            )
-            # Воспроизводим звуковой сигнал только если has_sound=True
-            if self.has_sound:
-                winsound.PlaySound('SystemExclamation', winsound.SND_ALIAS | winsound.SND_ASYNC)
+        # Возвращаем предыдущую фигуру в пул
+        self.release_current()
+
+        if self.staged is None:
+            self.stage_next()
+        self.current_shape, stimulus = self.staged
+        self.staged = None
         
-        # Анимация появления
-        anim_id = animate_shape(
+        # Первый кадр анимации появления, затем показ одним переключением
+        self.shape_animation = animate_shape(
             self.canvas,
             self.current_shape,
             start_scale=0.1,
             end_scale=1.0
         )
-        if anim_id:
-            self.animation_ids.append(anim_id)
+        self.resources.track(self.shape_animation)
+        self.pool.show(self.current_shape)
+
+        # Воспроизводим звуковой сигнал только если has_sound=True
+        self.sound_ticket = None
+        if self.engine.mode == "sound" and stimulus.has_sound:
+            self.sound_ticket = self.audio.play_tone()
         
-        # Запоминаем время спавна
-        self.last_spawn_time = time.time()
+        # Время появления отсчитываем от первого отрисованного кадра
+        self.canvas.update_idletasks()
+        self.timer.stimulus_shown()
+        self.engine.present(stimulus)
+        self.recorder.present(stimulus, self.engine.onset_ns)
+
+        # Следующий стимул готовим заранее, пока идет текущая попытка
+        self.stage_next()
         
         # Планируем следующий спавн
-        self.next_spawn_id = self.canvas.after(
-            self.spawn_delay,
-            self.spawn_shape
+        self.schedule_spawn()
+
+    def release_current(self) -> None:
+        """Останавливает анимацию текущей фигуры и возвращает ее в пул"""
+        if self.shape_animation:
+            self.shape_animation.cancel()
+            self.shape_animation = None
+        if self.current_shape:
+            self.pool.release(self.current_shape)
+            self.current_shape = None
+
+    def stage_next(self) -> None:
+        """Выбирает следующий стимул и готовит его скрытым в пуле"""
+        stimulus = self.engine.choose_stimulus()
+        self.staged = (self.pool.stage(stimulus), stimulus)
+
+    def schedule_spawn(self) -> None:
+        """Планирует следующий спавн через интервал из расписания"""
+        self.resources.after_cancel(self.next_spawn_id)
+        delay = self.engine.next_interval()
+        self.timer.schedule(delay)
+        self.next_spawn_id = self.resources.after(delay, self.spawn_shape)
+
+    def rush_tick(self) -> None:
+        """Шаг режима "rush": убирает истекшие цели и добавляет новую партию"""
+        engine = self.engine
+        if not engine.is_running:
+            return
+
+        now = self.timer.clock()
+        self.recorder.expire(now)
+        for target in engine.expire_targets(now):
+            self.release_target(target.target_id)
+        if self.follow_mode("rush"):
+            return
+
+        targets = engine.spawn_targets(now)
+        for target in targets:
+            item = self.pool.stage(target.stimulus)
+            animation = self.resources.track(
+                animate_shape(self.canvas, item, start_scale=0.1, end_scale=1.0)
+            )
+            self.pool.show(item)
+            self.rush_items[target.target_id] = (item, animation)
+
+        if targets:
+            # Время появления всей партии - после отрисовки первого кадра
+            self.canvas.update_idletasks()
+            onset_ns = self.timer.clock()
+            for target in targets:
+                target.onset_ns = onset_ns
+            self.recorder.tick(now, onset_ns, targets)
+
+        self.next_spawn_id = self.resources.after(
+            engine.config.game.rush.spawn_interval, self.rush_tick
         )
 
+    def release_target(self, target_id: int) -> None:
+        """Прячет элемент цели режима "rush" """
+        item, animation = self.rush_items.pop(target_id)
+        if animation:
+            animation.cancel()
+        self.pool.release(item)
+
+    def on_rush_click(self, event: tk.Event, handled_ns: int) -> None:
+        """Обработка клика в режиме "rush" """
+        engine = self.engine
+        click_ns = self.timer.event_clock.to_perf_ns(event.time, handled_ns)
+        difficulty = engine.difficulty
+        hit = engine.hit_target(event.x, event.y, click_ns)
+        if hit is None:
+            self.recorder.click(event.x, event.y, click_ns, False)
+            return
+
+        target, result = hit
+        self.recorder.click(event.x, event.y, click_ns, True,
+                            result.reaction_ns, result.points)
+        self.release_target(target.target_id)
+        self.flash(event.x, event.y)
+        self.update_score()
+        compromised = self.monitor is not None and self.monitor.check_click(
+            target.onset_ns, click_ns, handled_ns
+        )
+        self.trial_log.append(
+            "rush", difficulty,
+            result.stimulus.x, result.stimulus.y,
+            result.reaction_ns, result.points,
+            flags=FLAG_COMPROMISED if compromised else 0
+        )
+        self.follow_mode("rush")
+
+    @profiled("field.on_click")
     def on_click(self, event: tk.Event) -> None:
         """Обработка клика мыши"""
-        if not self.is_running or not self.current_shape:
+        handled_ns = self.timer.clock()
+        engine = self.engine
+        if engine.is_running and engine.mode == "rush":
+            self.on_rush_click(event, handled_ns)
+            return
+        if not engine.is_running or not self.current_shape:
             return
             
         # Проверяем попадание
-        clicked = self.canvas.find_overlapping(
-            event.x - 1, event.y - 1,
-            event.x + 1, event.y + 1
-        )
-        
-        if self.current_shape in clicked:
-            reaction_time = time.time() - self.last_spawn_time
-            
-            # Начисляем очки только если это не беззвучный объект в режиме звука
-            if self.game_mode != "sound" or self.has_sound:
-                max_points = GAME["points"]["max"]
-                min_points = GAME["points"]["min"]
-                points = max(
-                    min_points,
-                    int(max_points * (1 - reaction_time / (self.spawn_delay / 1000)))
-                )
-                
-                # Обновляем счет
-                self.current_score += points
-                if self.current_score > self.best_score:
-                    self.best_score = self.current_score
-                
-                # Выводим информацию в терминал
-                print(f"Время реакции: {int(reaction_time * 1000)}мс +{points}")
-                print(f"Очки: +{points}")
-                
+        if engine.hit_test(event.x, event.y):
+            # Контроллер сложности может сменить уровень на этом попадании
+            mode, difficulty = engine.mode, engine.difficulty
+            # В режиме звука реакция отсчитывается от начала сигнала
+            audio_onset_ns = self.sound_ticket.onset_ns if self.sound_ticket else None
+            timing = self.timer.click(event.time, handled_ns, audio_onset_ns)
+            if timing is not None:
+                click_ns, reaction_ns = timing.click_ns, timing.reaction_ns
+            else:
+                # Момент появления еще не отмечен: реакцию считает движок
+                # от своего момента показа, попытка помечается
+                click_ns = self.timer.event_clock.to_perf_ns(event.time, handled_ns)
+                reaction_ns = None
+            result = engine.hit(reaction_ns)
+            self.recorder.click(event.x, event.y, click_ns, True,
+                                result.reaction_ns, result.points)
+            if result.scored:
+                self.flash(event.x, event.y)
                 self.update_score()
+
+            # Попытки, искаженные остановками цикла событий, помечаются
+            flags = 0 if result.scored else FLAG_SILENT
+            if timing is None or (
+                    self.monitor is not None and self.monitor.check_trial(timing)):
+                flags |= FLAG_COMPROMISED
+
+            # Записываем попытку в журнал (без ввода-вывода в обработчике)
+            self.trial_log.append(
+                mode, difficulty,
+                result.stimulus.x, result.stimulus.y,
+                result.reaction_ns, result.points,
+                flags=flags
+            )
             
-        
-            
-            # Удаляем фигуру и запускаем следующий объект
-            self.canvas.delete(self.current_shape)
-            self.current_shape = None
+            # Прячем фигуру и запускаем следующий объект
+            self.release_current()
             
-            if self.next_spawn_id:
-                self.canvas.after_cancel(self.next_spawn_id)
-            self.next_spawn_id = self.canvas.after(
-                self.spawn_delay,
-                self.spawn_shape
-            )
+            if not self.follow_mode(mode):
+                self.schedule_spawn()
+        else:
+            click_ns = self.timer.event_clock.to_perf_ns(event.time, handled_ns)
+            self.recorder.click(event.x, event.y, click_ns, False)
 
+    def flash(self, x: int, y: int) -> None:
+        """Показывает вспышку в точке попадания"""
+        self.resources.track(create_flash_effect(
+            self.canvas, x, y, self.config.colors.flash, self.resources
+        ))
+
+    def follow_mode(self, previous: str) -> bool:
+        """
+        Перезапускает игру, если контроллер сложности сменил режим
+
+        :param previous: Режим до последнего события
+        :return: True, если игра перезапущена
+        """
+        engine = self.engine
+        if not engine.is_running or engine.mode == previous:
+            return False
+        self.start_game(engine.mode, engine.difficulty,
+                        engine.current_score, engine.best_score)
+        return True
+
+    @profiled("field.update_score")
     def update_score(self) -> None:
         """Обновляет счет"""
-        if self.score_text:
-            self.canvas.delete(self.score_text)
-            
-        score_text = (
-            f"{LOCALIZATION['score']}: {self.current_score}\n"
-            f"{LOCALIZATION['best_score']}: {self.best_score}"
-        )
-        
-        self.score_text = self.canvas.create_text(
-            self.canvas.winfo_width() - 10,
-            30,
-            text=score_text,
-            font=("Helvetica", 14),
-            fill=COLORS["text"],
-            anchor="e",
-            justify="right"
-        )
-        
-        # Анимация для счета
-        anim_id = animate_text(
-            self.canvas,
-            self.score_text,
-            self.canvas.winfo_width() - 10,
-            30
-        )
-        if anim_id:
-            self.animation_ids.append(anim_id)
+        self.hud.set_scores(self.engine.current_score, self.engine.best_score)
 
     def get_scores(self) -> Dict[str, int]:
         """
@@ -295,10 +477,11 @@ class GameField:
         
         :return: Словарь с текущим и лучшим счетом
         """
-        return {
-            'current_score': self.current_score,
-            'best_score': self.best_score
-        }
+        return self.engine.get_scores()
+
+    def get_level(self) -> Tuple[str, str]:
+        """Возвращает режим и сложность (их может сменить контроллер сложности)"""
+        return self.engine.mode, self.engine.difficulty
 
     def show(self) -> None:
         """Показывает игровое поле"""
@@ -0,0 +1,100 @@
+"""
+Модуль с индикатором счета на игровом поле
+"""
+import tkinter as tk
+from typing import Optional
+from src.utils.animations import animate_text
+from src.utils.config import current
+from src.utils.layout import get_layout
+from src.utils.resources import ResourceRegistry
+from src.utils.scheduler import AnimationHandle
+from src.utils.settings import LOCALIZATION
+
+# Шрифт счета (анимация появления ведет размер к нему)
+FONT = ("Helvetica", 14)
+
+
+class ScoreHud:
+    """
+    Постоянный текстовый элемент со счетом
+
+    Текст обновляется на месте, положение берется из раскладки канваса
+    и пересчитывается только при изменении его размера, а несколько
+    изменений счета за один проход цикла событий объединяются в одну
+    перерисовку.
+    """
+
+    def __init__(self, canvas: tk.Canvas, margin: int = 10, y: int = 30):
+        """
+        :param canvas: Канвас игрового поля
+        :param margin: Отступ от правого края
+        :param y: Вертикальная позиция текста
+        """
+        self.canvas = canvas
+        self.margin = margin
+        self.y = y
+        self.item: Optional[int] = None
+        self.animation: Optional[AnimationHandle] = None
+        self.current_score = 0
+        self.best_score = 0
+        self.layout = get_layout(canvas)
+        self._anchor_x = self.layout.width - margin
+        self._redraw_id: Optional[str] = None
+        self._text = ""
+        self.resources = ResourceRegistry(canvas, "hud")
+
+        self.layout.subscribe(self._on_resize)
+
+    def set_scores(self, current_score: int, best_score: int) -> None:
+        """Запоминает новый счет и планирует перерисовку"""
+        self.current_score = current_score
+        self.best_score = best_score
+        if self._redraw_id is None:
+            self._redraw_id = self.resources.after_idle(self._redraw)
+
+    def clear(self) -> None:
+        """Удаляет индикатор с канваса"""
+        self.resources.cancel_all()
+        self._redraw_id = None
+        self.animation = None
+        if self.item:
+            self.resources.delete(self.item)
+            self.item = None
+        self._text = ""
+
+    def _redraw(self) -> None:
+        """Применяет накопленные изменения счета"""
+        self._redraw_id = None
+        text = (
+            f"{LOCALIZATION['score']}: {self.current_score}\n"
+            f"{LOCALIZATION['best_score']}: {self.best_score}"
+        )
+        if text == self._text:
+            return
+        self._text = text
+
+        if self.item is None:
+            self.item = self.resources.own(self.canvas.create_text(
+                self._anchor_x,
+                self.y,
+                text=text,
+                font=FONT,
+                fill=current().colors.text,
+                anchor="e",
+                justify="right"
+            ))
+        else:
+            self.canvas.itemconfigure(self.item, text=text)
+            self.canvas.tag_raise(self.item)
+
+        if self.animation:
+            self.animation.cancel()
+        self.animation = self.resources.track(animate_text(
+            self.canvas, self.item, self._anchor_x, self.y, font=FONT
+        ))
+
+    def _on_resize(self, width: int, height: int) -> None:
+        """Переносит счет к правому краю при изменении размера"""
+        self._anchor_x = width - self.margin
+        if self.item:
+            self.canvas.coords(self.item, self._anchor_x, self.y)
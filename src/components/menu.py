@@ -2,10 +2,9 @@
 Модуль с компонентом меню
 """
 import tkinter as tk
-from tkinter import messagebox
-from typing import Callable, Dict
-from src.utils.colors import COLORS
-from src.utils.settings import WINDOW, LOCALIZATION
+from typing import Callable, Dict, Optional
+from src.utils.config import current
+from src.utils.settings import LOCALIZATION
 
 
 class Menu:
@@ -16,21 +15,23 @@ class Menu:
         :param parent: Родительское окно
         :param callbacks: Словарь с функциями обратного вызова
         """
+        colors = current().colors
         self.parent = parent
         self.callbacks = callbacks
-        self.frame = tk.Frame(parent, bg=COLORS['bg'])
+        self.frame = tk.Frame(parent, bg=colors.bg)
         
         self._create_widgets()
         
     def _create_widgets(self) -> None:
         """Создает виджеты меню"""
+        colors = current().colors
         # Заголовок
         title_label = tk.Label(
             self.frame,
-            text=WINDOW["title"],
+            text=current().window.title,
             font=("Helvetica", 24, "bold"),
-            bg=COLORS['bg'],
-            fg=COLORS['text']
+            bg=colors.bg,
+            fg=colors.text
         )
         title_label.pack(pady=(20, 30))
 
@@ -39,8 +40,8 @@ class Menu:
             'font': ("Helvetica", 14),
             'width': 30,
             'height': 2,
-            'bg': COLORS['button'],
-            'fg': COLORS['text'],
+            'bg': colors.button,
+            'fg': colors.text,
             'relief': 'flat'
         }
 
@@ -72,8 +73,8 @@ class Menu:
             self.frame,
             text=f"Режим: {LOCALIZATION['modes']['color']}",
             font=("Helvetica", 14),
-            bg=COLORS['bg'],
-            fg=COLORS['text']
+            bg=colors.bg,
+            fg=colors.text
         )
         self.mode_label.pack(pady=(20, 5))
 
@@ -81,8 +82,8 @@ class Menu:
             self.frame,
             text=f"Скорость: {LOCALIZATION['difficulties']['medium']}",
             font=("Helvetica", 14),
-            bg=COLORS['bg'],
-            fg=COLORS['text']
+            bg=colors.bg,
+            fg=colors.text
         )
         self.difficulty_label.pack(pady=(0, 20))
 
@@ -91,8 +92,8 @@ class Menu:
             self.frame,
             text=f"{LOCALIZATION['best_score']}: 0",
             font=("Helvetica", 16),
-            bg=COLORS['bg'],
-            fg=COLORS['text']
+            bg=colors.bg,
+            fg=colors.text
         )
         best_score_label.pack(pady=(0, 20))
         self.best_score_label = best_score_label
@@ -102,22 +103,23 @@ class Menu:
             self.frame,
             text="Ознакомьтесь с инструкцией перед началом старта",
             font=("Helvetica", 12, "italic"),
-            bg=COLORS['bg'],
-            fg=COLORS['text']
+            bg=colors.bg,
+            fg=colors.text
         )
         hint_label.pack(pady=(0, 10))
 
     def _on_button_hover(self, button: tk.Button, entering: bool) -> None:
         """Эффект при наведении на кнопку"""
+        colors = current().colors
         if entering:
             button.config(
-                bg=COLORS['primary'],
-                fg=COLORS['text']
+                bg=colors.primary,
+                fg=colors.text
             )
         else:
             button.config(
-                bg=COLORS['button'],
-                fg=COLORS['text']
+                bg=colors.button,
+                fg=colors.text
             )
 
     def show(self) -> None:
@@ -141,90 +143,36 @@ class Menu:
         self.mode_label.config(text=f"Режим: {LOCALIZATION['modes'][mode]}")
         self.difficulty_label.config(text=f"Скорость: {LOCALIZATION['difficulties'][difficulty]}")
 
+    # Окно выбора режима создается один раз и затем только показывается
+    _mode_window: Optional["ModeSelectionWindow"] = None
+
     @staticmethod
     def show_mode_selection(parent: tk.Tk, current_mode: str, 
                           current_difficulty: str,
                           on_save: Callable[[str, str], None]) -> None:
         """Показывает окно выбора режима приложения"""
-        mode_window = tk.Toplevel(parent)
-        mode_window.title("Настройки")
-        mode_window.geometry("400x500")
-        mode_window.resizable(False, False)
-        mode_window.configure(bg=COLORS['bg'])
-        mode_window.grab_set()
-
-        # Заголовок
-        tk.Label(
-            mode_window,
-            text="Настройки приложения",
-            font=("Helvetica", 18, "bold"),
-            bg=COLORS['bg'],
-            fg=COLORS['text']
-        ).pack(pady=20)
-
-        mode_var = tk.StringVar(value=current_mode)
-        difficulty_var = tk.StringVar(value=current_difficulty)
-
-        # Создаем фреймы для режимов и сложности
-        modes_frame = Menu._create_radio_group(
-            mode_window, "Режим пользователя", mode_var,
-            [(LOCALIZATION["modes"][mode], mode) for mode in ["color", "shape", "sound"]]
-        )
-        modes_frame.pack(padx=20, pady=10, fill="x")
-
-        difficulty_frame = Menu._create_radio_group(
-            mode_window, "Уровень сложности", difficulty_var,
-            [(LOCALIZATION["difficulties"][diff], diff) 
-             for diff in ["easy", "medium", "hard"]]
-        )
-        difficulty_frame.pack(padx=20, pady=20, fill="x")
-
-        # Кнопки
-        buttons_frame = tk.Frame(mode_window, bg=COLORS['bg'])
-        buttons_frame.pack(pady=20)
-
-        save_button = tk.Button(
-            buttons_frame,
-            text="Сохранить",
-            command=lambda: [
-                on_save(mode_var.get(), difficulty_var.get()),
-                mode_window.destroy()
-            ],
-            font=("Helvetica", 12),
-            bg=COLORS['button'],
-            fg=COLORS['text'],
-            relief='flat',
-            width=15
-        )
-        save_button.pack(side="left", padx=10)
-
-        cancel_button = tk.Button(
-            buttons_frame,
-            text="Отмена",
-            command=mode_window.destroy,
-            font=("Helvetica", 12),
-            bg=COLORS['button'],
-            fg=COLORS['text'],
-            relief='flat',
-            width=15
-        )
-        cancel_button.pack(side="left", padx=10)
+        window = Menu._mode_window
+        if window is None or not window.exists():
+            window = ModeSelectionWindow(parent)
+            Menu._mode_window = window
+        window.open(current_mode, current_difficulty, on_save)
 
     @staticmethod
     def _create_radio_group(parent: tk.Widget, title: str, 
                           variable: tk.StringVar,
                           options: list) -> tk.LabelFrame:
         """Создает группу радиокнопок"""
+        colors = current().colors
         frame = tk.LabelFrame(
             parent,
             text=title,
             font=("Helvetica", 12),
-            bg=COLORS['bg'],
-            fg=COLORS['text']
+            bg=colors.bg,
+            fg=colors.text
         )
 
         for text, value in options:
-            radio_frame = tk.Frame(frame, bg=COLORS['bg'])
+            radio_frame = tk.Frame(frame, bg=colors.bg)
             radio_frame.pack(fill="x", padx=10, pady=5)
             
             rb = tk.Radiobutton(
@@ -233,10 +181,10 @@ class Menu:
                 value=value,
                 variable=variable,
                 font=("Helvetica", 12),
-                bg=COLORS['bg'],
-                fg=COLORS['text'],
-                selectcolor=COLORS['primary'],
-                activebackground=COLORS['bg']
+                bg=colors.bg,
+                fg=colors.text,
+                selectcolor=colors.primary,
+                activebackground=colors.bg
             )
             rb.pack(side="left")
 
@@ -259,6 +207,7 @@ class Menu:
         - Цвет: реагируйте на цветной квадрат
         - Фигура: реагируйте на определенную фигуру
         - Звук: реагируйте на звуковой сигнал (нужны колонки)
+        - Натиск: успейте кликнуть по множеству исчезающих целей
 
         Уровни сложности:
         - Легкий: больше времени на реакцию
@@ -270,4 +219,105 @@ class Menu:
         - 'Продолжить' - вернуться к текущей игре
         - 'Меню' - вернуться в главное меню
         """
-        messagebox.showinfo("Инструкция", instructions)
\ No newline at end of file
+        from tkinter import messagebox
+        messagebox.showinfo("Инструкция", instructions)
+
+
+class ModeSelectionWindow:
+    """Переиспользуемое окно выбора режима и сложности"""
+
+    def __init__(self, parent: tk.Tk):
+        """
+        :param parent: Родительское окно
+        """
+        colors = current().colors
+        self.on_save: Optional[Callable[[str, str], None]] = None
+        self.window = tk.Toplevel(parent)
+        self.window.title("Настройки")
+        self.window.geometry("400x540")
+        self.window.resizable(False, False)
+        self.window.configure(bg=colors.bg)
+        # Закрытие окна только прячет его
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        # Заголовок
+        tk.Label(
+            self.window,
+            text="Настройки приложения",
+            font=("Helvetica", 18, "bold"),
+            bg=colors.bg,
+            fg=colors.text
+        ).pack(pady=20)
+
+        self.mode_var = tk.StringVar(master=self.window)
+        self.difficulty_var = tk.StringVar(master=self.window)
+
+        # Создаем фреймы для режимов и сложности
+        modes_frame = Menu._create_radio_group(
+            self.window, "Режим пользователя", self.mode_var,
+            [(LOCALIZATION["modes"][mode], mode) for mode in current().progression.mode_order]
+        )
+        modes_frame.pack(padx=20, pady=10, fill="x")
+
+        difficulty_frame = Menu._create_radio_group(
+            self.window, "Уровень сложности", self.difficulty_var,
+            [(LOCALIZATION["difficulties"][diff], diff) 
+             for diff in current().progression.difficulty_order]
+        )
+        difficulty_frame.pack(padx=20, pady=20, fill="x")
+
+        # Кнопки
+        buttons_frame = tk.Frame(self.window, bg=colors.bg)
+        buttons_frame.pack(pady=20)
+
+        save_button = tk.Button(
+            buttons_frame,
+            text="Сохранить",
+            command=self.save,
+            font=("Helvetica", 12),
+            bg=colors.button,
+            fg=colors.text,
+            relief='flat',
+            width=15
+        )
+        save_button.pack(side="left", padx=10)
+
+        cancel_button = tk.Button(
+            buttons_frame,
+            text="Отмена",
+            command=self.close,
+            font=("Helvetica", 12),
+            bg=colors.button,
+            fg=colors.text,
+            relief='flat',
+            width=15
+        )
+        cancel_button.pack(side="left", padx=10)
+
+    def exists(self) -> bool:
+        """Проверяет, что окно не было уничтожено"""
+        try:
+            return bool(self.window.winfo_exists())
+        except tk.TclError:
+            return False
+
+    def open(self, current_mode: str, current_difficulty: str,
+             on_save: Callable[[str, str], None]) -> None:
+        """Показывает окно с текущими настройками"""
+        self.on_save = on_save
+        self.mode_var.set(current_mode)
+        self.difficulty_var.set(current_difficulty)
+        self.window.deiconify()
+        self.window.lift()
+        self.window.grab_set()
+
+    def save(self) -> None:
+        """Применяет выбор и прячет окно"""
+        if self.on_save:
+            self.on_save(self.mode_var.get(), self.difficulty_var.get())
+        self.close()
+
+    def close(self) -> None:
+        """Прячет окно до следующего открытия"""
+        self.window.grab_release()
+        self.window.withdraw()
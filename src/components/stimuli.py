@@ -0,0 +1,94 @@
+"""
+Модуль с пулом элементов-стимулов
+"""
+import tkinter as tk
+from typing import Dict, List, Set
+from src.core.engine import SHAPE_TYPES, Stimulus
+from src.utils.resources import ResourceRegistry
+
+
+class StimulusPool:
+    """
+    Пул заранее созданных скрытых элементов канваса
+
+    Фигуры не создаются и не удаляются на каждой попытке: элемент берется
+    из пула, настраивается через coords/itemconfigure и показывается
+    переключением state.
+    """
+
+    def __init__(self, canvas: tk.Canvas, per_type: int = 2):
+        """
+        :param canvas: Канвас, на котором живут элементы
+        :param per_type: Сколько элементов каждого типа создать заранее
+        """
+        self.canvas = canvas
+        self.per_type = per_type
+        self.free: Dict[str, List[int]] = {}
+        self.kinds: Dict[int, str] = {}
+        self.in_use: Set[int] = set()
+        self.resources = ResourceRegistry(canvas, "stimulus_pool")
+        self.rebuild()
+
+    def rebuild(self) -> None:
+        """Создает элементы пула заново (например, после очистки канваса)"""
+        self.resources.close()
+        self.free = {kind: [] for kind in SHAPE_TYPES}
+        self.kinds.clear()
+        self.in_use.clear()
+        for kind in SHAPE_TYPES:
+            for _ in range(self.per_type):
+                self.free[kind].append(self._create(kind))
+
+    def _create(self, kind: str) -> int:
+        """Создает скрытый элемент заданного типа"""
+        options = {"outline": "", "state": "hidden", "tags": ("stimulus",)}
+        if kind == "rectangle":
+            item = self.canvas.create_rectangle(0, 0, 1, 1, **options)
+        elif kind == "oval":
+            item = self.canvas.create_oval(0, 0, 1, 1, **options)
+        else:  # triangle
+            item = self.canvas.create_polygon(0, 0, 1, 1, 0, 1, **options)
+        self.kinds[item] = kind
+        return self.resources.own(item)
+
+    def stage(self, stimulus: Stimulus) -> int:
+        """
+        Готовит скрытый стимул в его позиции
+
+        :return: ID элемента, который можно показать через show
+        """
+        kind, x, y, size, fill, _ = stimulus
+        free = self.free[kind]
+        item = free.pop() if free else self._create(kind)
+        self.in_use.add(item)
+
+        half = size / 2
+        if kind == "triangle":
+            self.canvas.coords(
+                item,
+                x, y - half,
+                x - half, y + half,
+                x + half, y + half
+            )
+        else:
+            self.canvas.coords(item, x - half, y - half, x + half, y + half)
+        self.canvas.itemconfigure(item, fill=fill)
+        return item
+
+    def show(self, item: int) -> None:
+        """Делает подготовленный стимул видимым"""
+        self.canvas.itemconfigure(item, state="normal")
+        self.canvas.tag_raise(item)
+
+    def release(self, item: int) -> None:
+        """Скрывает стимул и возвращает его в пул"""
+        if item not in self.in_use:
+            return
+        self.in_use.discard(item)
+        self.canvas.itemconfigure(item, state="hidden")
+        self.free[self.kinds[item]].append(item)
+
+    def release_all(self) -> None:
+        """Возвращает в пул все занятые элементы"""
+        for item in list(self.in_use):
+            self.release(item)
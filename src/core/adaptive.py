@@ -0,0 +1,156 @@
+"""
+Модуль адаптивной сложности
+
+Контроллер хранит только потоковую статистику времени реакции
+(среднее, дисперсия, EWMA) и на каждом клике подстраивает интервал
+между стимулами, а при достижении порогов PROGRESSION повышает
+сложность и открывает новые режимы.
+"""
+import math
+import random
+from typing import List, NamedTuple, Optional
+from src.utils.config import current
+from src.utils.settings import ADAPTIVE
+
+
+class StreamingStats:
+    """Среднее и дисперсия по Уэлфорду плюс экспоненциальное среднее"""
+
+    __slots__ = ("alpha", "count", "mean", "_m2", "ewma")
+
+    def __init__(self, alpha: float = ADAPTIVE["ewma_alpha"]):
+        """
+        :param alpha: Вес нового значения в EWMA
+        """
+        self.alpha = alpha
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.ewma: Optional[float] = None
+
+    def update(self, value: float) -> None:
+        """Учитывает новое значение за O(1)"""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        if self.ewma is None:
+            self.ewma = value
+        else:
+            self.ewma += self.alpha * (value - self.ewma)
+
+    @property
+    def variance(self) -> float:
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stdev(self) -> float:
+        return math.sqrt(self.variance)
+
+
+def base_delay(mode: str, difficulty: str) -> int:
+    """Исходный интервал уровня (в режиме "rush" - время жизни цели)"""
+    game = current().game
+    if mode == "rush":
+        return game.rush.lifetime[difficulty]
+    return game.spawn_delay[difficulty]
+
+
+class Progress(NamedTuple):
+    """Решение контроллера после очередного события"""
+    spawn_delay: int
+    difficulty: str
+    mode: str
+    level_changed: bool
+
+
+class AdaptiveController:
+    """Подстраивает интервал, сложность и режим под игрока"""
+
+    def __init__(self, mode: str, difficulty: str,
+                 rng: Optional[random.Random] = None):
+        """
+        :param mode: Текущий режим
+        :param difficulty: Текущая сложность
+        :param rng: Генератор для случайной смены режима
+        """
+        self.rng = rng or random.Random()
+        self.stats = StreamingStats()
+        self.mode = mode
+        self.difficulty = difficulty
+        self.spawn_delay = base_delay(mode, difficulty)
+        self._unlocked = 1  # Сколько режимов из mode_order уже открыто
+
+    def set_level(self, mode: str, difficulty: str, score: int = 0) -> None:
+        """
+        Задает уровень извне (выбор игрока); статистика сохраняется
+
+        :param score: Счет, с которого продолжается игра
+        """
+        self.mode = mode
+        self.difficulty = difficulty
+        self.spawn_delay = base_delay(mode, difficulty)
+        self._unlocked = len(self.unlocked_modes(score))
+
+    def unlocked_modes(self, score: int) -> List[str]:
+        """Режимы, открытые при данном счете"""
+        progression = current().progression
+        thresholds = progression.mode_thresholds
+        return [mode for mode in progression.mode_order
+                if score >= thresholds.get(mode, 0)]
+
+    def on_hit(self, reaction_ms: float, score: int) -> Progress:
+        """
+        Учитывает попадание
+
+        :param reaction_ms: Время реакции в мс
+        :param score: Текущий счет игры
+        """
+        self.stats.update(reaction_ms)
+
+        # Интервал стремится к EWMA реакции, умноженному на запас
+        target = self.stats.ewma * ADAPTIVE["delay_factor"]
+        self._step_delay(target)
+        return self._progress(score)
+
+    def on_miss(self, score: int) -> Progress:
+        """Учитывает пропущенный стимул: интервал увеличивается"""
+        self._step_delay(self.spawn_delay * (1 + ADAPTIVE["delay_step"]))
+        return self._progress(score)
+
+    def _step_delay(self, target: float) -> None:
+        """Сдвигает интервал к цели не больше чем на delay_step за шаг"""
+        step = ADAPTIVE["delay_step"]
+        low = self.spawn_delay * (1 - step)
+        high = self.spawn_delay * (1 + step)
+        delay = min(max(target, low), high)
+        base = base_delay(self.mode, self.difficulty)
+        low, high = base * ADAPTIVE["min_ratio"], base * ADAPTIVE["max_ratio"]
+        self.spawn_delay = int(min(max(delay, low), high))
+
+    def _progress(self, score: int) -> Progress:
+        """Проверяет пороги сложности и режимов"""
+        changed = False
+        progression = current().progression
+        order = progression.difficulty_order
+        threshold = progression.difficulty_thresholds.get(self.difficulty)
+        if threshold is not None and score >= threshold:
+            index = order.index(self.difficulty)
+            if index + 1 < len(order):
+                self.difficulty = order[index + 1]
+                changed = True
+
+        unlocked = self.unlocked_modes(score)
+        if len(unlocked) > self._unlocked:
+            self._unlocked = len(unlocked)
+            changed = True
+
+        # При переходе на новый уровень режим может смениться на другой открытый
+        if changed and self.rng.random() < progression.mode_change_chance:
+            modes = [mode for mode in unlocked if mode != self.mode]
+            if modes:
+                self.mode = self.rng.choice(modes)
+        if changed:
+            self.spawn_delay = base_delay(self.mode, self.difficulty)
+
+        return Progress(self.spawn_delay, self.difficulty, self.mode, changed)
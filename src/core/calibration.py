@@ -0,0 +1,267 @@
+"""
+Модуль калибровки формулы очков методом Монте-Карло
+
+Время клика игрока моделируется экс-гауссовым распределением (сумма
+нормальной и экспоненциальной величин) для нескольких уровней игроков.
+Миллионы попыток разыгрываются векторно блоками NumPy по тем же
+правилам, что и в движке: стимул сменяется через интервал с разбросом,
+очки считаются по compute_points, после попадания следующий стимул
+появляется через интервал от клика. Режим "rush" моделируется как
+поток одиночных целей со временем жизни цели вместо интервала.
+
+По результатам видно ожидаемую скорость набора очков на каждой
+сложности и время до открытия следующих сложностей и режимов, так что
+таблицы GAME и PROGRESSION можно подбирать по данным. Параметры игры
+берутся из действующей конфигурации (вместе с config.json).
+"""
+import sys
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+import numpy as np
+from src.core.adaptive import base_delay
+from src.utils.config import Config, current
+from src.utils.settings import ADAPTIVE, CALIBRATION, SCHEDULE
+
+
+class Skill(NamedTuple):
+    """Параметры экс-гауссова распределения времени клика (мс)"""
+    mu: float
+    sigma: float
+    tau: float
+
+    @property
+    def mean(self) -> float:
+        return self.mu + self.tau
+
+
+def skills() -> Dict[str, Skill]:
+    """Уровни игроков из настроек калибровки"""
+    return {name: Skill(**params) for name, params in CALIBRATION["skills"].items()}
+
+
+def draw_reactions(rng: np.random.Generator, skill: Skill, size: int) -> np.ndarray:
+    """Разыгрывает size времен клика (мс)"""
+    values = rng.normal(skill.mu, skill.sigma, size)
+    values += rng.exponential(skill.tau, size)
+    # Нормальная часть может уйти в отрицательные значения на редких выборках
+    np.maximum(values, 1.0, out=values)
+    return values
+
+
+def points_for(reaction_ms: np.ndarray, spawn_delay: int,
+               config: Optional[Config] = None) -> np.ndarray:
+    """Векторная версия engine.compute_points"""
+    game = (config or current()).game
+    raw = np.trunc(game.points_max * (1 - reaction_ms / spawn_delay))
+    return np.maximum(game.points_min, raw).astype(np.int64)
+
+
+def steady_delay(base: int, skill: Skill, adaptive: bool) -> int:
+    """
+    Интервал, к которому приходит контроллер сложности
+
+    Контроллер ведет интервал к EWMA реакции с запасом delay_factor
+    в пределах [min_ratio, max_ratio] от исходного; в установившемся
+    режиме EWMA близко к среднему распределения.
+    """
+    if not adaptive:
+        return base
+    target = skill.mean * ADAPTIVE["delay_factor"]
+    low, high = base * ADAPTIVE["min_ratio"], base * ADAPTIVE["max_ratio"]
+    return int(min(max(target, low), high))
+
+
+class LevelStats(NamedTuple):
+    """Итог моделирования одной сложности"""
+    spawn_delay: int
+    trials: int
+    hit_rate: float
+    points_per_hit: float
+    points_per_minute: float
+    floor_share: float          # Доля попаданий, получивших минимум очков
+    points_p50: float
+    points_p90: float
+
+
+def _chunks(total: int, chunk_size: int) -> Iterator[int]:
+    while total > 0:
+        size = min(total, chunk_size)
+        total -= size
+        yield size
+
+
+def simulate_level(skill: Skill, mode: str, difficulty: str, draws: int,
+                   rng: np.random.Generator, adaptive: bool = True,
+                   chunk_size: int = CALIBRATION["chunk_size"]) -> LevelStats:
+    """
+    Моделирует draws попыток на одной сложности
+
+    Память ограничена chunk_size попытками; распределение очков
+    накапливается гистограммой.
+    """
+    config = current()
+    base = base_delay(mode, difficulty)
+    delay = steady_delay(base, skill, adaptive)
+    jitter = SCHEDULE["interval_jitter"]
+    # Беззвучные стимулы режима "sound" только занимают время
+    scored_share = config.game.sound_chance if mode == "sound" else 1.0
+
+    hits = 0
+    floor_hits = 0
+    points_total = 0
+    time_total = 0.0
+    histogram = np.zeros(config.game.points_max + 1, dtype=np.int64)
+
+    for size in _chunks(draws, chunk_size):
+        reactions = draw_reactions(rng, skill, size)
+        intervals = delay * rng.uniform(1 - jitter, 1 + jitter, size)
+        scored = rng.random(size) < scored_share
+        # Попадание - если клик успел до смены стимула
+        hit = scored & (reactions < intervals)
+        hit_reactions = reactions[hit]
+        # Очки, как и в движке, - от исходного интервала уровня
+        points = points_for(hit_reactions, base, config)
+
+        hits += hit_reactions.size
+        floor_hits += int(np.count_nonzero(points == config.game.points_min))
+        points_total += int(points.sum())
+        histogram += np.bincount(points, minlength=histogram.size)[:histogram.size]
+        # После попадания следующий стимул - через интервал от клика
+        time_total += float(intervals.sum() + hit_reactions.sum())
+
+    cumulative = np.cumsum(histogram)
+
+    def percentile(q: float) -> float:
+        if not hits:
+            return float("nan")
+        return float(np.searchsorted(cumulative, q * hits))
+
+    return LevelStats(
+        spawn_delay=delay,
+        trials=draws,
+        hit_rate=hits / draws,
+        points_per_hit=points_total / hits if hits else 0.0,
+        points_per_minute=points_total / (time_total / 60_000) if time_total else 0.0,
+        floor_share=floor_hits / hits if hits else 0.0,
+        points_p50=percentile(0.5),
+        points_p90=percentile(0.9),
+    )
+
+
+def unlock_times(rates: Dict[str, float], start: str = "easy",
+                 config: Optional[Config] = None) -> List[Tuple[str, int, float]]:
+    """
+    Время до каждого порога прогрессии при игре с начала
+
+    Сложность повышается по difficulty_thresholds, скорость набора очков
+    на каждой сложности берется из rates.
+
+    :param rates: Очки в минуту по сложностям
+    :return: [(событие, порог очков, минуты)] в порядке порогов
+    """
+    progression = (config or current()).progression
+    order = progression.difficulty_order
+    events = [(f"сложность {order[order.index(level) + 1]}", threshold)
+              for level, threshold in progression.difficulty_thresholds.items()
+              if order.index(level) + 1 < len(order)]
+    events += [(f"режим {mode}", threshold)
+               for mode, threshold in progression.mode_thresholds.items() if threshold > 0]
+    events.sort(key=lambda event: event[1])
+
+    result = []
+    level = start
+    score = 0
+    minutes = 0.0
+    for name, target in events:
+        while score < target and minutes != float("inf"):
+            threshold = progression.difficulty_thresholds.get(level)
+            index = order.index(level)
+            upgrades = threshold is not None and index + 1 < len(order)
+            step_to = min(target, threshold) if upgrades else target
+            if rates[level] <= 0:
+                minutes = float("inf")
+                break
+            minutes += (step_to - score) / rates[level]
+            score = step_to
+            if upgrades and score >= threshold:
+                level = order[index + 1]
+        result.append((name, target, minutes))
+    return result
+
+
+def calibrate(mode: str = "color", draws: int = CALIBRATION["draws"],
+              seed: Optional[int] = CALIBRATION["seed"],
+              adaptive: bool = ADAPTIVE["enabled"],
+              skill_names: Optional[List[str]] = None) -> Dict[str, object]:
+    """
+    Моделирует все уровни игроков на всех сложностях
+
+    :return: {игрок: {"levels": {сложность: LevelStats}, "unlocks": [...]}}
+    """
+    rng = np.random.default_rng(seed)
+    available = skills()
+    result = {}
+    for name in skill_names or list(available):
+        skill = available[name]
+        levels = {
+            difficulty: simulate_level(skill, mode, difficulty, draws, rng, adaptive)
+            for difficulty in current().progression.difficulty_order
+        }
+        rates = {difficulty: stats.points_per_minute for difficulty, stats in levels.items()}
+        result[name] = {"skill": skill, "levels": levels, "unlocks": unlock_times(rates)}
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Калибровка из командной строки
+
+    :return: Код выхода
+    """
+    import argparse
+    import json
+    import time
+
+    parser = argparse.ArgumentParser(description="Калибровка формулы очков и порогов прогрессии")
+    parser.add_argument("--mode", default="color", choices=("color", "shape", "sound", "rush"))
+    parser.add_argument("--draws", type=int, default=CALIBRATION["draws"],
+                        help="попыток на игрока и сложность")
+    parser.add_argument("--seed", type=int, default=CALIBRATION["seed"])
+    parser.add_argument("--skill", action="append", choices=list(skills()),
+                        help="уровень игрока (можно указать несколько раз)")
+    parser.add_argument("--static", action="store_true",
+                        help="без контроллера сложности: исходные интервалы уровней")
+    parser.add_argument("--json", action="store_true", help="вывести результат в JSON")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    result = calibrate(args.mode, args.draws, args.seed,
+                       ADAPTIVE["enabled"] and not args.static, args.skill)
+    elapsed = time.perf_counter() - started
+
+    if args.json:
+        print(json.dumps({
+            name: {
+                "skill": data["skill"]._asdict(),
+                "levels": {level: stats._asdict() for level, stats in data["levels"].items()},
+                "unlocks": [
+                    {"event": event, "score": score, "minutes": minutes}
+                    for event, score, minutes in data["unlocks"]
+                ],
+            }
+            for name, data in result.items()
+        }, indent=2, ensure_ascii=False))
+    else:
+        for name, data in result.items():
+            skill = data["skill"]
+            print(f"{name}: mu={skill.mu:g} sigma={skill.sigma:g} tau={skill.tau:g} "
+                  f"(среднее {skill.mean:g} мс)")
+            print("  сложность  интервал  попадания  очки/попад.  очки/мин  минимум  p50  p90")
+            for level, stats in data["levels"].items():
+                print(f"  {level:<10} {stats.spawn_delay:>8}  {stats.hit_rate:>9.1%}  "
+                      f"{stats.points_per_hit:>11.1f}  {stats.points_per_minute:>8.0f}  "
+                      f"{stats.floor_share:>7.1%}  {stats.points_p50:>3.0f}  "
+                      f"{stats.points_p90:>3.0f}")
+            for event, score, minutes in data["unlocks"]:
+                print(f"  {event} ({score} очков): {minutes:.1f} мин")
+    print(f"Попыток: {args.draws} на уровень, время: {elapsed:.2f}с", file=sys.stderr)
+    return 0
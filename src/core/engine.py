@@ -0,0 +1,404 @@
+"""
+Модуль с игровой логикой без привязки к Tkinter
+
+Движок выбирает стимулы, проверяет попадания и считает очки.
+Игровое поле только отрисовывает его состояние, поэтому те же правила
+можно прогонять без дисплея с подставными часами и генератором.
+"""
+import itertools
+import random
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+from src.core.adaptive import AdaptiveController, Progress, base_delay
+from src.core.spatial import SpatialHash
+from src.utils.config import current
+from src.utils.settings import ADAPTIVE
+
+# Типы фигур режима "shape"
+SHAPE_TYPES = ("rectangle", "oval", "triangle")
+
+# Допуск при проверке попадания (пикселей)
+HIT_TOLERANCE = 1
+
+
+class Stimulus(NamedTuple):
+    """Описание одного стимула"""
+    kind: str
+    x: int
+    y: int
+    size: int
+    fill: str
+    has_sound: bool
+
+    def contains(self, px: float, py: float) -> bool:
+        """Проверяет, попадает ли точка в фигуру"""
+        half = self.size / 2 + HIT_TOLERANCE
+        dx = px - self.x
+        dy = py - self.y
+        if abs(dx) > half or abs(dy) > half:
+            return False
+        if self.kind == "oval":
+            return (dx * dx + dy * dy) <= half * half
+        if self.kind == "triangle":
+            # Вершина сверху, основание снизу: ширина растет линейно вниз
+            return abs(dx) <= (dy + half) / 2
+        return True
+
+
+class Target:
+    """Живая цель режима "rush" """
+
+    __slots__ = ("target_id", "stimulus", "onset_ns", "expires_ns")
+
+    def __init__(self, target_id: int, stimulus: Stimulus,
+                 onset_ns: int, expires_ns: int):
+        self.target_id = target_id
+        self.stimulus = stimulus
+        self.onset_ns = onset_ns
+        self.expires_ns = expires_ns
+
+
+class HitResult(NamedTuple):
+    """Результат попадания по стимулу"""
+    stimulus: Stimulus
+    reaction_ns: int
+    points: int
+    scored: bool
+
+
+def compute_points(reaction_s: float, spawn_delay: int) -> int:
+    """
+    Считает очки за попадание
+
+    :param reaction_s: Время реакции в секундах
+    :param spawn_delay: Исходный интервал уровня в мс (base_delay)
+    """
+    game = current().game
+    return max(
+        game.points_min,
+        int(game.points_max * (1 - reaction_s / (spawn_delay / 1000)))
+    )
+
+
+class GameEngine:
+    """Состояние и правила одной игры"""
+
+    def __init__(self, clock: Callable[[], int] = time.perf_counter_ns,
+                 rng: Optional[random.Random] = None,
+                 width: Optional[int] = None, height: Optional[int] = None):
+        """
+        :param clock: Источник времени в наносекундах
+        :param rng: Генератор случайных чисел
+        :param width: Ширина игровой области (по умолчанию - из настроек окна)
+        :param height: Высота игровой области
+        """
+        # Конфигурация фиксируется на время игры и обновляется в start
+        self.config = current()
+        self.clock = clock
+        self.rng = rng or random.Random()
+        self.width = width or self.config.window.width
+        self.height = height or self.config.window.height
+
+        self.mode = "color"
+        self.difficulty = "medium"
+        self.spawn_delay = self.config.game.spawn_delay["medium"]
+        self.current_score = 0
+        self.best_score = 0
+        self.is_running = False
+        self.current: Optional[Stimulus] = None
+        self.onset_ns = 0
+
+        # Цели режима "rush" в порядке появления и их пространственный индекс
+        self.targets: Dict[int, Target] = {}
+        self.spatial = SpatialHash(self.config.game.shape_size + 2 * HIT_TOLERANCE)
+        self._target_ids = itertools.count(1)
+
+        # Заранее построенное расписание стимулов (TrialSchedule) или None
+        self.schedule = None
+
+        # Адаптивная сложность: подстраивает интервал, уровень и режим
+        self.adaptive: Optional[AdaptiveController] = None
+        if ADAPTIVE["enabled"]:
+            self.adaptive = AdaptiveController(self.mode, self.difficulty, self.rng)
+
+    def start(self, mode: str, difficulty: str,
+              current_score: int = 0, best_score: int = 0) -> None:
+        """Начинает игру с заданным режимом и счетом"""
+        config = current()
+        if config is not self.config:
+            # Конфигурация перечитана между играми
+            self.config = config
+            self.spatial = SpatialHash(config.game.shape_size + 2 * HIT_TOLERANCE)
+        self.mode = mode
+        self.difficulty = difficulty
+        self.spawn_delay = base_delay(mode, difficulty)
+        if self.adaptive is not None:
+            self.adaptive.set_level(mode, difficulty, current_score)
+        self.current_score = current_score
+        self.best_score = best_score
+        self.current = None
+        self.clear_targets()
+        self.is_running = True
+
+    def stop(self) -> None:
+        """Останавливает игру"""
+        self.is_running = False
+        self.current = None
+        self.clear_targets()
+
+    def resize(self, width: int, height: int) -> None:
+        """Задает размеры игровой области"""
+        self.width = width
+        self.height = height
+
+    def use_schedule(self, schedule) -> None:
+        """
+        Берет стимулы и интервалы из расписания
+
+        :param schedule: TrialSchedule или None (случайный выбор на каждом стимуле)
+        """
+        self.schedule = schedule
+
+    def next_interval(self) -> int:
+        """Интервал до следующего стимула (мс)"""
+        if self.schedule is not None:
+            return self.schedule.next_interval(self.spawn_delay)
+        return self.spawn_delay
+
+    def choose_stimulus(self) -> Stimulus:
+        """Выбирает следующий стимул для текущего режима"""
+        if self.schedule is not None:
+            return self.schedule.next_stimulus()
+        rng = self.rng
+        game = self.config.game
+        colors = self.config.colors
+        size = game.shape_size
+        padding = size + 20
+        x = rng.randint(padding, self.width - padding)
+        y = rng.randint(padding, self.height - padding)
+
+        if self.mode == "color":
+            # В режиме цвета всегда считаем попадания
+            return Stimulus("rectangle", x, y, size, rng.choice(colors.palette), True)
+        if self.mode == "shape":
+            # В режиме фигур всегда считаем попадания
+            return Stimulus(rng.choice(SHAPE_TYPES), x, y, size,
+                            colors.default_shape, True)
+        if self.mode == "rush":
+            return Stimulus(rng.choice(SHAPE_TYPES), x, y, size,
+                            rng.choice(colors.palette), True)
+        # В режиме звука - белый круг, звук случайно
+        return Stimulus("oval", x, y, size, colors.default_shape,
+                        rng.random() < game.sound_chance)
+
+    def present(self, stimulus: Stimulus, onset_ns: Optional[int] = None) -> None:
+        """
+        Делает стимул текущим
+
+        :param onset_ns: Момент появления (по умолчанию - сейчас)
+        """
+        self.current = stimulus
+        self.onset_ns = self.clock() if onset_ns is None else onset_ns
+
+    def expire(self) -> None:
+        """Убирает текущий стимул без попадания"""
+        # Беззвучный стимул режима "sound" пропускать и нужно
+        current = self.current
+        if current is not None and current.has_sound and self.adaptive is not None:
+            self._apply(self.adaptive.on_miss(self.current_score))
+        self.current = None
+
+    def _apply(self, progress: Progress) -> None:
+        """Применяет решение адаптивного контроллера"""
+        self.spawn_delay = progress.spawn_delay
+        self.difficulty = progress.difficulty
+        self.mode = progress.mode
+
+    def hit_test(self, x: float, y: float) -> bool:
+        """Проверяет попадание в текущий стимул"""
+        return self.current is not None and self.current.contains(x, y)
+
+    def hit(self, reaction_ns: Optional[int] = None) -> HitResult:
+        """
+        Засчитывает попадание по текущему стимулу
+
+        :param reaction_ns: Время реакции (по умолчанию - от появления до сейчас)
+        """
+        stimulus = self.current
+        if reaction_ns is None:
+            reaction_ns = self.clock() - self.onset_ns
+
+        self.current = None
+        return self._score(stimulus, reaction_ns)
+
+    def _score(self, stimulus: Stimulus, reaction_ns: int) -> HitResult:
+        """Начисляет очки за попадание"""
+        # Начисляем очки только если это не беззвучный объект в режиме звука
+        scored = self.mode != "sound" or stimulus.has_sound
+        points = 0
+        if scored:
+            # Очки - от исходного интервала уровня: подстроенный интервал
+            # следует за реакцией игрока и сравнял бы очки при любом навыке
+            points = compute_points(reaction_ns / 1e9,
+                                    base_delay(self.mode, self.difficulty))
+            self.current_score += points
+            if self.current_score > self.best_score:
+                self.best_score = self.current_score
+            if self.adaptive is not None:
+                self._apply(self.adaptive.on_hit(reaction_ns / 1e6, self.current_score))
+        return HitResult(stimulus, reaction_ns, points, scored)
+
+    def batch_size(self) -> int:
+        """Сколько целей "rush" добавит следующая партия (с учетом max_targets)"""
+        rush = self.config.game.rush
+        return max(0, min(rush.batch, rush.max_targets - len(self.targets)))
+
+    def spawn_targets(self, now_ns: Optional[int] = None,
+                      limit: Optional[int] = None) -> List[Target]:
+        """
+        Создает очередную партию целей режима "rush"
+
+        :param now_ns: Текущий момент (по умолчанию - clock())
+        :param limit: Наибольшее число целей (по умолчанию - вся партия)
+        :return: Новые цели (не больше, чем позволяет max_targets)
+        """
+        now = self.clock() if now_ns is None else now_ns
+        count = self.batch_size()
+        if limit is not None:
+            count = min(count, limit)
+        lifetime_ns = self.spawn_delay * 1_000_000
+
+        spawned = []
+        for _ in range(count):
+            stimulus = self.choose_stimulus()
+            target = Target(next(self._target_ids), stimulus, now, now + lifetime_ns)
+            self._index_target(target)
+            self.targets[target.target_id] = target
+            spawned.append(target)
+        return spawned
+
+    def _index_target(self, target: Target) -> None:
+        stimulus = target.stimulus
+        half = stimulus.size / 2 + HIT_TOLERANCE
+        self.spatial.insert(
+            target.target_id,
+            stimulus.x - half, stimulus.y - half,
+            stimulus.x + half, stimulus.y + half
+        )
+
+    def move_target(self, target_id: int, x: int, y: int) -> Optional[Target]:
+        """
+        Переносит живую цель "rush" (например, за границу уменьшенного поля)
+
+        :return: Цель или None, если она уже исчезла
+        """
+        target = self.targets.get(target_id)
+        if target is None:
+            return None
+        self.spatial.remove(target_id)
+        target.stimulus = target.stimulus._replace(x=x, y=y)
+        self._index_target(target)
+        return target
+
+    def expire_targets(self, now_ns: Optional[int] = None) -> List[Target]:
+        """
+        Убирает цели, время жизни которых истекло
+
+        Время жизни одинаково, поэтому цели истекают в порядке появления
+        и проверяются только самые старые.
+        """
+        now = self.clock() if now_ns is None else now_ns
+        expired = []
+        targets = self.targets
+        while targets:
+            target = next(iter(targets.values()))
+            if target.expires_ns > now:
+                break
+            self._remove_target(target)
+            expired.append(target)
+            if self.adaptive is not None:
+                self._apply(self.adaptive.on_miss(self.current_score))
+        return expired
+
+    def hit_target(self, x: float, y: float,
+                   click_ns: Optional[int] = None) -> Optional[Tuple[Target, HitResult]]:
+        """
+        Засчитывает клик по цели режима "rush"
+
+        :param click_ns: Момент клика (по умолчанию - clock())
+        :return: Цель и результат или None при промахе
+        """
+        hit = None
+        for target_id in self.spatial.query_point(x, y):
+            target = self.targets[target_id]
+            # Из перекрывающихся целей выбираем самую новую (она сверху)
+            if target.stimulus.contains(x, y) and (
+                    hit is None or target.target_id > hit.target_id):
+                hit = target
+        if hit is None:
+            return None
+
+        now = self.clock() if click_ns is None else click_ns
+        self._remove_target(hit)
+        return hit, self._score(hit.stimulus, max(0, now - hit.onset_ns))
+
+    def _remove_target(self, target: Target) -> None:
+        del self.targets[target.target_id]
+        self.spatial.remove(target.target_id)
+
+    def clear_targets(self) -> None:
+        """Убирает все цели режима "rush" """
+        self.targets.clear()
+        self.spatial.clear()
+
+    def get_scores(self) -> Dict[str, int]:
+        """Возвращает текущий и лучший счет"""
+        return {
+            'current_score': self.current_score,
+            'best_score': self.best_score
+        }
+
+
+class ManualClock:
+    """Часы, которые идут только по команде (для симуляций)"""
+
+    def __init__(self, start_ns: int = 0):
+        self.now = start_ns
+
+    def __call__(self) -> int:
+        return self.now
+
+    def advance(self, ns: int) -> None:
+        self.now += ns
+
+
+def simulate_session(engine: GameEngine, trials: int,
+                     reaction_ms: Callable[[random.Random], float],
+                     clock: ManualClock) -> Dict[str, int]:
+    """
+    Прогоняет игру без дисплея
+
+    Игрок реагирует на каждый стимул через reaction_ms(rng) мс; если это
+    дольше интервала между стимулами, стимул пропускается.
+
+    :return: Счет, число попаданий и пропусков
+    """
+    hits = misses = 0
+    for _ in range(trials):
+        stimulus = engine.choose_stimulus()
+        engine.present(stimulus)
+        reaction_ns = int(reaction_ms(engine.rng) * 1_000_000)
+        if reaction_ns >= engine.spawn_delay * 1_000_000:
+            clock.advance(engine.spawn_delay * 1_000_000)
+            engine.expire()
+            misses += 1
+            continue
+        clock.advance(reaction_ns)
+        if engine.hit_test(stimulus.x, stimulus.y):
+            engine.hit()
+            hits += 1
+    return {
+        'score': engine.current_score,
+        'hits': hits,
+        'misses': misses
+    }
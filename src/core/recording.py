@@ -0,0 +1,363 @@
+"""
+Модуль с записью и воспроизведением игровых сессий
+
+Игровое поле сообщает записи каждый вызов движка: запуск игры, показ
+и пропуск стимула, клик, шаг режима "rush". События упаковываются
+в записи фиксированной длины. При воспроизведении те же вызовы
+подаются движку с подставными часами, без дисплея и без ожидания,
+а начисленные очки сравниваются с записанными.
+"""
+import os
+import queue
+import struct
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Iterable, Iterator, List, NamedTuple, Optional
+from src.core.adaptive import AdaptiveController
+from src.core.engine import SHAPE_TYPES, GameEngine, ManualClock, Stimulus
+from src.utils.settings import RECORDING
+from src.utils.trial_log import DIFFICULTIES, MODES
+
+# Заголовок файла: сигнатура и версия формата
+MAGIC = b"RTRS"
+VERSION = 1
+HEADER = struct.Struct("<4sH")
+
+# Событие: тип, три байтовых поля, координаты, время, значение, два целых
+EVENT = struct.Struct("<BBBBhhqqii")
+
+# Типы событий
+START = 1    # a=режим, b=сложность, c=адаптивная сложность, x/y=размер поля,
+             # value=зерно, i=счет, j=рекорд
+PRESENT = 2  # a=фигура, b=звук, t=появление, value=цвет, j=размер
+EXPIRE = 3   # t=момент пропуска (в "rush" - проверка истекших целей)
+CLICK = 4    # a=попадание, t=клик, value=время реакции, i=очки
+TICK = 5     # t=создание партии "rush", value=момент ее появления
+TARGET = 6   # цель "rush", поля как у PRESENT
+STOP = 7     # t=остановка, i=счет, j=рекорд
+MOVE = 8     # цель "rush" перенесена при изменении размера: value=ID цели, x/y
+
+KINDS = SHAPE_TYPES
+
+
+class Event(NamedTuple):
+    """Одно событие записи"""
+    kind: int
+    a: int
+    b: int
+    c: int
+    x: int
+    y: int
+    t_ns: int
+    value: int
+    i: int
+    j: int
+
+
+def _fill_code(fill: str) -> int:
+    return int(fill[1:], 16)
+
+
+def _fill_str(code: int) -> str:
+    return f"#{code:06x}"
+
+
+def _stimulus_event(kind: int, stimulus: Stimulus, t_ns: int) -> bytes:
+    return EVENT.pack(
+        kind, KINDS.index(stimulus.kind), stimulus.has_sound, 0,
+        stimulus.x, stimulus.y, t_ns, _fill_code(stimulus.fill), 0, stimulus.size
+    )
+
+
+def _event_stimulus(event: Event) -> Stimulus:
+    return Stimulus(KINDS[event.a], event.x, event.y, event.j,
+                    _fill_str(event.value), bool(event.b))
+
+
+class SessionRecorder:
+    """
+    Пишет события игрового поля в файл
+
+    События упаковываются в память, а на диск их дописывает фоновый
+    поток, как и в журнале попыток.
+    """
+
+    def __init__(self, path: Optional[str] = None,
+                 batch_size: int = RECORDING["batch_size"]):
+        """
+        :param path: Путь к файлу (по умолчанию - новый файл в каталоге записей)
+        :param batch_size: Сколько событий копить перед сбросом на диск
+        """
+        if path is None:
+            os.makedirs(RECORDING["directory"], exist_ok=True)
+            path = os.path.join(
+                RECORDING["directory"],
+                time.strftime("session_%Y%m%d_%H%M%S") + f"_{os.getpid()}.rec"
+            )
+        self.path = path
+        self.batch_size = batch_size
+        self._events: List[bytes] = [HEADER.pack(MAGIC, VERSION)]
+        self._queue: "queue.SimpleQueue[Optional[bytes]]" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+
+    def _add(self, data: bytes) -> None:
+        self._events.append(data)
+        if len(self._events) >= self.batch_size:
+            self.flush()
+
+    def start(self, engine: GameEngine, seed: int, t_ns: int) -> None:
+        """Запуск игры (после GameEngine.start)"""
+        self._add(EVENT.pack(
+            START, MODES.index(engine.mode), DIFFICULTIES.index(engine.difficulty),
+            engine.adaptive is not None,
+            engine.width, engine.height, t_ns, seed,
+            engine.current_score, engine.best_score
+        ))
+
+    def present(self, stimulus: Stimulus, onset_ns: int) -> None:
+        """Показ стимула"""
+        self._add(_stimulus_event(PRESENT, stimulus, onset_ns))
+
+    def expire(self, t_ns: int) -> None:
+        """Пропуск текущего стимула или проверка истекших целей "rush" """
+        self._add(EVENT.pack(EXPIRE, 0, 0, 0, 0, 0, t_ns, 0, 0, 0))
+
+    def click(self, x: int, y: int, t_ns: int, hit: bool,
+              reaction_ns: int = 0, points: int = 0) -> None:
+        """Клик по полю (в том числе мимо)"""
+        self._add(EVENT.pack(CLICK, hit, 0, 0, x, y, t_ns, reaction_ns, points, 0))
+
+    def tick(self, now_ns: int, onset_ns: int, targets: Iterable) -> None:
+        """Партия целей режима "rush" """
+        self._add(EVENT.pack(TICK, 0, 0, 0, 0, 0, now_ns, onset_ns, 0, 0))
+        for target in targets:
+            self._add(_stimulus_event(TARGET, target.stimulus, onset_ns))
+
+    def move(self, target_id: int, x: int, y: int, t_ns: int) -> None:
+        """Перенос цели "rush" в новые границы поля"""
+        self._add(EVENT.pack(MOVE, 0, 0, 0, x, y, t_ns, target_id, 0, 0))
+
+    def stop(self, engine: GameEngine, t_ns: int) -> None:
+        """Остановка игры (перед GameEngine.stop)"""
+        self._add(EVENT.pack(STOP, 0, 0, 0, 0, 0, t_ns, 0,
+                             engine.current_score, engine.best_score))
+
+    def flush(self) -> None:
+        """Передает накопленные события фоновому потоку"""
+        if not self._events:
+            return
+        self._queue.put(b"".join(self._events))
+        self._events = []
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._write_batches, name="session-recorder", daemon=True
+            )
+            self._thread.start()
+
+    def close(self) -> None:
+        """Сбрасывает буфер и дожидается записи на диск"""
+        self.flush()
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def _write_batches(self) -> None:
+        """Дописывает пакеты в файл (выполняется в фоновом потоке)"""
+        with open(self.path, "ab") as f:
+            while True:
+                batch = self._queue.get()
+                if batch is None:
+                    break
+                f.write(batch)
+                f.flush()
+
+
+class NullRecorder(SessionRecorder):
+    """Запись выключена: события отбрасываются"""
+
+    def __init__(self):
+        self.path = None
+        self.batch_size = 0
+
+    def _add(self, data: bytes) -> None:
+        pass
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+def make_recorder() -> SessionRecorder:
+    """Создает запись сессии или заглушку, если запись выключена"""
+    return SessionRecorder() if RECORDING["enabled"] else NullRecorder()
+
+
+def iter_events(path: str) -> Iterator[Event]:
+    """Читает события из файла записи"""
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < HEADER.size:
+        return
+    magic, version = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path}: неизвестный формат записи")
+    body = memoryview(data)[HEADER.size:]
+    # Неполное событие в конце (оборванная запись) пропускаем
+    usable = len(body) - len(body) % EVENT.size
+    for fields in EVENT.iter_unpack(body[:usable]):
+        yield Event(*fields)
+
+
+class _TargetFeed:
+    """Подставное расписание: отдает записанные цели "rush" по порядку"""
+
+    def __init__(self):
+        self.stimuli: Deque[Stimulus] = deque()
+
+    def next_stimulus(self) -> Stimulus:
+        return self.stimuli.popleft()
+
+    def next_interval(self, spawn_delay: int) -> int:
+        return spawn_delay
+
+
+class Mismatch(NamedTuple):
+    """Расхождение воспроизведения с записью"""
+    index: int
+    event: str
+    recorded: int
+    replayed: int
+
+
+class ReplayResult(NamedTuple):
+    """Итог воспроизведения одной записи"""
+    path: str
+    events: int
+    clicks: int
+    hits: int
+    score: int
+    mismatches: List[Mismatch]
+
+    @property
+    def ok(self) -> bool:
+        return not self.mismatches
+
+
+def replay_session(path: str) -> ReplayResult:
+    """
+    Прогоняет запись через игровой движок без дисплея
+
+    Время берется из записи, поэтому воспроизведение идет так быстро,
+    как позволяет процессор.
+    """
+    clock = ManualClock()
+    engine = GameEngine(clock=clock)
+    feed = _TargetFeed()
+    mismatches: List[Mismatch] = []
+    count = clicks = hits = 0
+
+    events = list(iter_events(path))
+    for index, event in enumerate(events):
+        count += 1
+        clock.now = event.t_ns
+        kind = event.kind
+
+        if kind == START:
+            if not event.c:
+                engine.adaptive = None
+            elif engine.adaptive is None:
+                engine.adaptive = AdaptiveController(engine.mode, engine.difficulty,
+                                                     engine.rng)
+            engine.resize(event.x, event.y)
+            engine.start(MODES[event.a], DIFFICULTIES[event.b], event.i, event.j)
+            engine.rng.seed(event.value)
+            engine.use_schedule(feed)
+        elif kind == PRESENT:
+            engine.present(_event_stimulus(event), event.t_ns)
+        elif kind == EXPIRE:
+            if engine.mode == "rush":
+                engine.expire_targets(event.t_ns)
+            else:
+                engine.expire()
+        elif kind == TICK:
+            # Цели партии записаны сразу за шагом
+            following = index + 1
+            while following < len(events) and events[following].kind == TARGET:
+                feed.stimuli.append(_event_stimulus(events[following]))
+                following += 1
+            # Запись, оборванная посреди партии, дает меньше целей, чем нужно
+            expected = engine.batch_size()
+            recorded = len(feed.stimuli)
+            if recorded < expected:
+                mismatches.append(Mismatch(index, "targets", recorded, expected))
+            for target in engine.spawn_targets(event.t_ns, limit=recorded):
+                target.onset_ns = event.value
+            feed.stimuli.clear()
+        elif kind == CLICK:
+            clicks += 1
+            if engine.mode == "rush":
+                hit = engine.hit_target(event.x, event.y, event.t_ns)
+                result = hit[1] if hit else None
+            elif engine.hit_test(event.x, event.y):
+                result = engine.hit(event.value)
+            else:
+                result = None
+            if (result is not None) != bool(event.a):
+                mismatches.append(Mismatch(index, "hit", event.a, result is not None))
+            elif result is not None:
+                hits += 1
+                if result.points != event.i:
+                    mismatches.append(Mismatch(index, "points", event.i, result.points))
+        elif kind == MOVE:
+            engine.move_target(event.value, event.x, event.y)
+        elif kind == STOP:
+            if engine.current_score != event.i:
+                mismatches.append(
+                    Mismatch(index, "score", event.i, engine.current_score)
+                )
+            engine.stop()
+
+    return ReplayResult(path, count, clicks, hits, engine.current_score, mismatches)
+
+
+def replay_many(paths: Iterable[str]) -> Dict[str, ReplayResult]:
+    """Воспроизводит набор записей (регрессионная проверка архива)"""
+    return {path: replay_session(path) for path in paths}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Воспроизводит записи и сообщает о расхождениях
+
+    :return: Код выхода: 0, если все записи совпали с воспроизведением
+    """
+    import argparse
+    import glob
+
+    parser = argparse.ArgumentParser(description="Воспроизведение записанных сессий")
+    parser.add_argument(
+        "paths", nargs="*",
+        help="файлы записей (по умолчанию - все записи в каталоге сессий)"
+    )
+    args = parser.parse_args(argv)
+
+    paths = args.paths or sorted(glob.glob(os.path.join(RECORDING["directory"], "*.rec")))
+    started = time.perf_counter()
+    results = replay_many(paths)
+    elapsed = time.perf_counter() - started
+
+    failed = 0
+    for path, result in results.items():
+        status = "ok" if result.ok else "РАСХОЖДЕНИЕ"
+        print(f"{path}: {status}, событий {result.events}, "
+              f"попаданий {result.hits}/{result.clicks}, счет {result.score}")
+        for mismatch in result.mismatches[:5]:
+            print(f"    событие {mismatch.index} ({mismatch.event}): "
+                  f"записано {mismatch.recorded}, получено {mismatch.replayed}")
+        failed += not result.ok
+    print(f"Записей: {len(results)}, с расхождениями: {failed}, время: {elapsed:.2f}с")
+    return 1 if failed else 0
@@ -0,0 +1,214 @@
+"""
+Модуль с заранее построенным расписанием стимулов
+
+Вся последовательность стимулов сессии (позиции, фигуры, цвета, звук
+и разброс интервалов) строится одним пакетом из зерна, поэтому сессию
+можно воспроизвести, а в пути показа стимула нет генератора и ветвлений.
+"""
+import os
+import random
+from typing import Iterable, List, NamedTuple, Optional, Sequence
+from src.core.engine import SHAPE_TYPES, Stimulus
+from src.utils.config import current
+from src.utils.settings import SCHEDULE
+
+
+class Rect(NamedTuple):
+    """Прямоугольная область канваса"""
+    x0: float
+    y0: float
+    x1: float
+    y1: float
+
+
+def new_seed() -> int:
+    """Случайное зерно для сессии без заданного зерна"""
+    return int.from_bytes(os.urandom(8), "little") >> 1
+
+
+class TrialSchedule:
+    """
+    Последовательность стимулов одного режима
+
+    Стимулы и интервалы выдаются блоками по block_size; следующий блок
+    строится из того же зерна и номера блока, так что последовательность
+    бесконечна и воспроизводима.
+    """
+
+    def __init__(self, mode: str, seed: int, width: int, height: int,
+                 exclusions: Sequence[Rect] = (),
+                 block_size: int = SCHEDULE["block_size"]):
+        """
+        :param mode: Режим, для которого строятся стимулы
+        :param seed: Зерно генератора
+        :param width: Ширина канваса
+        :param height: Высота канваса
+        :param exclusions: Области, куда стимулы не ставятся
+        :param block_size: Сколько стимулов строить за раз
+        """
+        self.mode = mode
+        self.seed = seed
+        self.width = width
+        self.height = height
+        self.exclusions = tuple(exclusions)
+        self.block_size = block_size
+        self.block = 0
+        self.interval_block = 0
+        self.stimuli: List[Stimulus] = []
+        self.intervals: List[float] = []
+        self._stimulus_index = 0
+        self._interval_index = 0
+        self._build_block(0)
+        self._build_interval_block(0)
+
+    def _build_block(self, block: int) -> None:
+        """Строит блок стимулов с номером block"""
+        rng = random.Random(f"{self.seed}:{self.mode}:{block}")
+        count = self.block_size
+        config = current()
+        size = config.game.shape_size
+        positions = self._positions(rng, count, size)
+
+        # Свойства стимулов выбираются целыми пакетами
+        palette = config.colors.palette
+        default = config.colors.default_shape
+        if self.mode == "color":
+            kinds = ["rectangle"] * count
+            fills = rng.choices(palette, k=count)
+            sounds = [True] * count
+        elif self.mode == "shape":
+            kinds = rng.choices(SHAPE_TYPES, k=count)
+            fills = [default] * count
+            sounds = [True] * count
+        elif self.mode == "rush":
+            kinds = rng.choices(SHAPE_TYPES, k=count)
+            fills = rng.choices(palette, k=count)
+            sounds = [True] * count
+        else:
+            kinds = ["oval"] * count
+            fills = [default] * count
+            chance = config.game.sound_chance
+            sounds = [rng.random() < chance for _ in range(count)]
+
+        self.stimuli = [
+            Stimulus(kind, x, y, size, fill, has_sound)
+            for kind, (x, y), fill, has_sound in zip(kinds, positions, fills, sounds)
+        ]
+        self.block = block
+        self._stimulus_index = 0
+
+    def resize(self, width: int, height: int, exclusions: Sequence[Rect] = ()) -> None:
+        """
+        Переносит оставшиеся стимулы блока в новые границы канваса
+
+        Блок перестраивается из того же зерна, позиция в последовательности
+        сохраняется.
+        """
+        self.width = width
+        self.height = height
+        self.exclusions = tuple(exclusions)
+        index = self._stimulus_index
+        self._build_block(self.block)
+        self._stimulus_index = index
+
+    @property
+    def index(self) -> int:
+        """Номер следующего стимула в последовательности"""
+        return self.block * self.block_size + self._stimulus_index
+
+    def fits(self, stimulus: Stimulus) -> bool:
+        """Проверяет, что стимул в границах канваса и вне исключенных областей"""
+        padding = stimulus.size + 20
+        half = stimulus.size / 2
+        x, y = stimulus.x, stimulus.y
+        if not (padding <= x <= max(padding, self.width - padding)
+                and padding <= y <= max(padding, self.height - padding)):
+            return False
+        return not any(zone.x0 - half < x < zone.x1 + half
+                       and zone.y0 - half < y < zone.y1 + half
+                       for zone in self.exclusions)
+
+    def relocate(self, stimulus: Stimulus, key: str) -> Stimulus:
+        """
+        Переносит уже выбранный стимул в текущие границы
+
+        Последовательность расписания не сдвигается: новая позиция
+        зависит только от зерна и ключа стимула.
+
+        :param key: Ключ стимула (например, его номер в последовательности)
+        :return: Тот же стимул, если он и так помещается, иначе копия
+        """
+        if self.fits(stimulus):
+            return stimulus
+        rng = random.Random(f"{self.seed}:relocate:{key}")
+        (x, y), = self._positions(rng, 1, stimulus.size)
+        return stimulus._replace(x=x, y=y)
+
+    def _build_interval_block(self, block: int) -> None:
+        """Строит блок множителей интервала (отдельный поток зерна)"""
+        rng = random.Random(f"{self.seed}:interval:{block}")
+        jitter = SCHEDULE["interval_jitter"]
+        self.intervals = [1 + rng.uniform(-jitter, jitter)
+                          for _ in range(self.block_size)]
+        self.interval_block = block
+        self._interval_index = 0
+
+    def _positions(self, rng: random.Random, count: int, size: int) -> List[tuple]:
+        """Позиции центров в пределах канваса вне исключенных областей"""
+        padding = size + 20
+        half = size / 2
+        x_max = max(padding, self.width - padding)
+        y_max = max(padding, self.height - padding)
+        x_span = x_max - padding + 1
+        y_span = y_max - padding + 1
+        # Области расширяются на половину фигуры: дальше проверяется только центр
+        zones = [(zone.x0 - half, zone.y0 - half, zone.x1 + half, zone.y1 + half)
+                 for zone in self.exclusions]
+        uniform = rng.random
+        positions = []
+        limit = count * 20
+        attempts = 0
+        # Отбор с отклонением; если области закрывают почти все поле,
+        # после лимита попыток точки принимаются как есть
+        while len(positions) < count:
+            x = padding + int(uniform() * x_span)
+            y = padding + int(uniform() * y_span)
+            attempts += 1
+            if attempts <= limit:
+                for x0, y0, x1, y1 in zones:
+                    if x0 < x < x1 and y0 < y < y1:
+                        break
+                else:
+                    positions.append((x, y))
+                continue
+            positions.append((x, y))
+        return positions
+
+    def next_stimulus(self) -> Stimulus:
+        """Возвращает следующий стимул"""
+        if self._stimulus_index == len(self.stimuli):
+            self._build_block(self.block + 1)
+        stimulus = self.stimuli[self._stimulus_index]
+        self._stimulus_index += 1
+        return stimulus
+
+    def next_interval(self, spawn_delay: int) -> int:
+        """Возвращает следующий интервал с разбросом вокруг spawn_delay"""
+        if self._interval_index == len(self.intervals):
+            self._build_interval_block(self.interval_block + 1)
+        ratio = self.intervals[self._interval_index]
+        self._interval_index += 1
+        return int(spawn_delay * ratio)
+
+
+def build_schedule(mode: str, width: int, height: int,
+                   exclusions: Iterable[Rect] = (),
+                   seed: Optional[int] = SCHEDULE["seed"]) -> TrialSchedule:
+    """
+    Строит расписание сессии
+
+    :param seed: Зерно (None - случайное; оно сохраняется в расписании)
+    """
+    if seed is None:
+        seed = new_seed()
+    return TrialSchedule(mode, seed, width, height, tuple(exclusions))
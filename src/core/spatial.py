@@ -0,0 +1,61 @@
+"""
+Модуль с пространственным хэшем для проверки попаданий
+"""
+from typing import Dict, Hashable, List, Set, Tuple
+
+Cell = Tuple[int, int]
+
+
+class SpatialHash:
+    """
+    Равномерная сетка ячеек с ключами объектов
+
+    Объект регистрируется во всех ячейках, которые пересекает его рамка,
+    поэтому поиск по точке смотрит одну ячейку независимо от числа объектов.
+    """
+
+    def __init__(self, cell_size: int):
+        """
+        :param cell_size: Размер ячейки в пикселях (порядка размера объекта)
+        """
+        self.cell_size = cell_size
+        self.cells: Dict[Cell, Set[Hashable]] = {}
+        self.entries: Dict[Hashable, List[Cell]] = {}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _cells_for(self, x0: float, y0: float, x1: float, y1: float) -> List[Cell]:
+        size = self.cell_size
+        return [
+            (cx, cy)
+            for cx in range(int(x0 // size), int(x1 // size) + 1)
+            for cy in range(int(y0 // size), int(y1 // size) + 1)
+        ]
+
+    def insert(self, key: Hashable, x0: float, y0: float, x1: float, y1: float) -> None:
+        """Добавляет объект с рамкой (x0, y0) - (x1, y1)"""
+        if key in self.entries:
+            self.remove(key)
+        cells = self._cells_for(x0, y0, x1, y1)
+        for cell in cells:
+            self.cells.setdefault(cell, set()).add(key)
+        self.entries[key] = cells
+
+    def remove(self, key: Hashable) -> None:
+        """Удаляет объект, если он есть"""
+        for cell in self.entries.pop(key, ()):
+            bucket = self.cells[cell]
+            bucket.discard(key)
+            if not bucket:
+                del self.cells[cell]
+
+    def query_point(self, x: float, y: float) -> Set[Hashable]:
+        """Возвращает объекты, чьи рамки могут содержать точку"""
+        size = self.cell_size
+        return self.cells.get((int(x // size), int(y // size)), set())
+
+    def clear(self) -> None:
+        """Удаляет все объекты"""
+        self.cells.clear()
+        self.entries.clear()
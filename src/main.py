@@ -1,86 +1,149 @@
 """
 Главный модуль приложения
 """
+import os
+import sys
+import time
 import tkinter as tk
-import json
-from typing import Dict, Any
-from src.components.menu import Menu
-from src.components.game_field import GameField
-from src.utils.settings import WINDOW
+from typing import Dict, Any, Optional
+from src.utils.timing import StartupProfiler
+
+# Замер запуска начинается до импорта остальных модулей приложения
+_startup = StartupProfiler()
+
+with _startup.phase("imports"):
+    from src.components.menu import Menu
+    from src.utils.loop_monitor import LoopMonitor
+    from src.utils.profiling import profiled
+    from src.utils.config import current, reload_if_changed
+    from src.utils.storage import ScoreStore
 
 
 class ReactionTrainer:
     def __init__(self):
         """Инициализация приложения"""
-        self.root = tk.Tk()
-        self.root.title(WINDOW["title"])
-        # Устанавливаем полноэкранный режим
-        self.root.attributes('-fullscreen', True)
-        # Добавляем обработчик клавиши Escape
-        self.root.bind('<Escape>', lambda e: self.root.quit())
+        self.startup = _startup
+
+        with self.startup.phase("window"):
+            self.root = tk.Tk()
+            self.root.title(current().window.title)
+            # Устанавливаем полноэкранный режим
+            self.root.attributes('-fullscreen', True)
+            # Добавляем обработчик клавиши Escape
+            self.root.bind('<Escape>', lambda e: self.root.quit())
 
         # Настройки игры
         self.game_mode = "color"
         self.difficulty = "medium"
         self.best_score = 0
+        self.store = ScoreStore()
+        self._session_started: Optional[int] = None  # Начало текущей игры (time_ns)
+        self._playing = False  # Игра идет и еще не записана в историю
 
         # Загрузка настроек
-        self.load_settings()
+        with self.startup.phase("settings"):
+            self.load_settings()
 
         # Создание компонентов
-        self.menu = Menu(self.root, {
-            'continue_game': self.continue_game,
-            'new_game': self.start_new_game,
-            'select_mode': self.select_mode,
-            'show_instructions': Menu.show_instructions,
-            'exit_game': self.exit_game
-        })
-        
-        # Обновляем отображение лучшего результата и настроек
-        self.menu.update_best_score(self.best_score)
-        self.menu.update_mode_and_difficulty(self.game_mode, self.difficulty)
-
-        self.game_field = GameField(self.root, self.show_menu)
+        with self.startup.phase("menu"):
+            self.menu = Menu(self.root, {
+                'continue_game': self.continue_game,
+                'new_game': self.start_new_game,
+                'select_mode': self.select_mode,
+                'show_instructions': Menu.show_instructions,
+                'exit_game': self.exit_game
+            })
+            
+            # Обновляем отображение лучшего результата и настроек
+            self.menu.update_best_score(self.best_score)
+            self.menu.update_mode_and_difficulty(self.game_mode, self.difficulty)
+
+        # Монитор задержек цикла событий (пульс запускается в run)
+        self.monitor = LoopMonitor(self.root)
+
+        # Игровое поле создается при первом запуске игры
+        self._game_field = None
 
         # Показать меню при запуске
         self.show_menu()
+        self.root.after_idle(self._on_interactive)
+
+    @property
+    def game_field(self):
+        """Игровое поле (создается при первом обращении)"""
+        if self._game_field is None:
+            from src.components.field import GameField
+            self._game_field = GameField(self.root, self.show_menu, self.monitor)
+        return self._game_field
+
+    def _on_interactive(self) -> None:
+        """Фиксирует момент, когда меню отрисовано и принимает ввод"""
+        self.startup.mark_interactive()
+        if os.environ.get("REACTION_STARTUP_TIMING"):
+            phases = ", ".join(
+                f"{name}: {ms:.1f}мс" for name, ms in self.startup.report().items()
+            )
+            print(f"Запуск: {phases}", file=sys.stderr)
+
+    def get_scores(self) -> Optional[Dict[str, int]]:
+        """Возвращает счет игрового поля, если оно уже создано"""
+        if self._game_field is None:
+            return None
+        return self._game_field.get_scores()
 
     def load_settings(self) -> None:
-        """Загружает настройки из файла"""
-        try:
-            with open('best_score.json', 'r') as f:
-                data = json.load(f)
-                self.best_score = data.get('best_score', 0)
-                self.game_mode = data.get('game_mode', "color")
-                self.difficulty = data.get('difficulty', "medium")
-        except (FileNotFoundError, json.JSONDecodeError):
-            pass
+        """Загружает настройки и рекорд активного профиля"""
+        data = self.store.load()
+        self.best_score = data.get('best_score', 0)
+        self.game_mode = data.get('game_mode', "color")
+        self.difficulty = data.get('difficulty', "medium")
 
+    @profiled("app.save_settings")
     def save_settings(self) -> None:
-        """Сохраняет настройки в файл"""
-        scores = self.game_field.get_scores()
-        with open('best_score.json', 'w') as f:
-            json.dump({
-                'best_score': max(scores['best_score'], self.best_score),
-                'game_mode': self.game_mode,
-                'difficulty': self.difficulty
-            }, f)
+        """Планирует сохранение настроек (запись в базу идет в фоне)"""
+        scores = self.get_scores()
+        if scores:
+            self.best_score = max(scores['best_score'], self.best_score)
+        self.store.save({
+            'best_score': self.best_score,
+            'game_mode': self.game_mode,
+            'difficulty': self.difficulty
+        })
 
     def show_menu(self) -> None:
         """Показывает меню"""
-        self.game_field.stop_game()
-        self.game_field.hide()
+        if self._game_field is not None:
+            self._game_field.stop_game()
+            self._game_field.hide()
+            self.game_mode, self.difficulty = self._game_field.get_level()
+            self.finish_session()
         self.menu.show()
-        scores = self.game_field.get_scores()
-        self.best_score = max(scores['best_score'], self.best_score)
+        if self._game_field is not None:
+            # Сохраняем только если была игра - при запуске менять нечего
+            self.save_settings()
         self.menu.update_best_score(self.best_score)
         self.menu.update_mode_and_difficulty(self.game_mode, self.difficulty)
-        self.save_settings()
+
+    def finish_session(self) -> None:
+        """Записывает игру в историю профиля (продолженная игра - в ту же запись)"""
+        if not self._playing or self._session_started is None or self._game_field is None:
+            return
+        mode, difficulty = self._game_field.get_level()
+        self.store.record_session(
+            mode, difficulty,
+            self._game_field.get_scores()['current_score'],
+            self._session_started
+        )
+        self._playing = False
 
     def start_new_game(self) -> None:
         """Начинает новую игру"""
+        # Изменения файла конфигурации подхватываются между играми
+        reload_if_changed()
         self.menu.hide()
         self.game_field.show()
+        self._session_started = time.time_ns()
+        self._playing = True
         self.game_field.start_game(
             self.game_mode,
             self.difficulty,
@@ -91,9 +154,13 @@ class ReactionTrainer:
 
     def continue_game(self) -> None:
         """Продолжает текущую игру"""
+        reload_if_changed()
         self.menu.hide()
         self.game_field.show()
         scores = self.game_field.get_scores()
+        if self._session_started is None:
+            self._session_started = time.time_ns()
+        self._playing = True
         self.game_field.start_game(
             self.game_mode,
             self.difficulty,
@@ -123,7 +190,21 @@ class ReactionTrainer:
 
     def run(self) -> None:
         """Запускает приложение"""
-        self.root.mainloop()
+        self.monitor.start()
+        try:
+            self.root.mainloop()
+        finally:
+            self.monitor.stop()
+            # Сводка задержек цикла событий и кадров анимации
+            self.monitor.dump(
+                self._game_field.canvas if self._game_field is not None else None
+            )
+            # Игра могла быть прервана клавишей Escape
+            self.finish_session()
+            # Дописываем на диск все, что еще не сохранено
+            self.store.close()
+            if self._game_field is not None:
+                self._game_field.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,183 @@
+"""
+Модуль аналитики по журналу попыток
+
+Журнал отображается в память как структурированный массив NumPy,
+все расчеты векторные.
+"""
+from typing import Dict, Iterable, Tuple
+import numpy as np
+from src.utils.settings import TRIAL_LOG
+from src.utils.trial_log import DIFFICULTIES, FLAG_COMPROMISED, FLAG_SILENT, MODES, RECORD
+
+# Тип записи журнала, совпадающий с trial_log.RECORD
+TRIAL_DTYPE = np.dtype([
+    ("timestamp_ns", "<i8"),
+    ("mode", "u1"),
+    ("difficulty", "u1"),
+    ("flags", "u1"),
+    ("_pad", "V1"),
+    ("x", "<i2"),
+    ("y", "<i2"),
+    ("reaction_ns", "<i8"),
+    ("points", "<i4"),
+])
+assert TRIAL_DTYPE.itemsize == RECORD.size
+
+
+def load_trials(path: str = TRIAL_LOG["path"], mmap: bool = True) -> np.ndarray:
+    """
+    Загружает журнал попыток
+
+    :param path: Путь к файлу журнала
+    :param mmap: Отображать файл в память вместо чтения целиком
+    :return: Структурированный массив с типом TRIAL_DTYPE
+    """
+    try:
+        with open(path, "rb") as f:
+            f.seek(0, 2)
+            count = f.tell() // TRIAL_DTYPE.itemsize
+    except FileNotFoundError:
+        count = 0
+
+    if count == 0:
+        return np.empty(0, dtype=TRIAL_DTYPE)
+    if mmap:
+        return np.memmap(path, dtype=TRIAL_DTYPE, mode="r", shape=(count,))
+    return np.fromfile(path, dtype=TRIAL_DTYPE, count=count)
+
+
+def scored(trials: np.ndarray) -> np.ndarray:
+    """Оставляет только засчитанные попытки (без кликов по беззвучным стимулам)"""
+    return trials[(trials["flags"] & FLAG_SILENT) == 0]
+
+
+def reliable(trials: np.ndarray) -> np.ndarray:
+    """Оставляет попытки, время которых не искажено остановками цикла событий"""
+    return trials[(trials["flags"] & FLAG_COMPROMISED) == 0]
+
+
+def reaction_ms(trials: np.ndarray) -> np.ndarray:
+    """Возвращает времена реакции в миллисекундах"""
+    return trials["reaction_ns"] / 1e6
+
+
+def percentiles(values: np.ndarray,
+                qs: Iterable[float] = (50, 90, 95, 99)) -> Dict[str, float]:
+    """
+    Считает перцентили
+
+    :return: Словарь вида {"p50": ..., "p90": ...}
+    """
+    qs = tuple(qs)
+    if values.size == 0:
+        return {f"p{q:g}": float("nan") for q in qs}
+    result = np.percentile(values, qs)
+    return {f"p{q:g}": float(v) for q, v in zip(qs, result)}
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Скользящее среднее по окну из window попыток
+
+    :return: Массив длины len(values) - window + 1
+    """
+    if window <= 0 or values.size < window:
+        return np.empty(0, dtype=np.float64)
+    sums = np.cumsum(values, dtype=np.float64)
+    sums[window:] = sums[window:] - sums[:-window]
+    return sums[window - 1:] / window
+
+
+def outlier_mask(values: np.ndarray, threshold: float = 3.5) -> np.ndarray:
+    """
+    Маска выбросов по модифицированному z-показателю (через MAD)
+
+    :return: True для значений, которые нужно отбросить
+    """
+    if values.size == 0:
+        return np.zeros(0, dtype=bool)
+    median = np.median(values)
+    mad = np.median(np.abs(values - median))
+    if mad == 0:
+        return values != median
+    return 0.6745 * np.abs(values - median) / mad > threshold
+
+
+def reject_outliers(values: np.ndarray, threshold: float = 3.5) -> np.ndarray:
+    """Возвращает значения без выбросов"""
+    return values[~outlier_mask(values, threshold)]
+
+
+def learning_curve(values: np.ndarray, bin_size: int = 50) -> np.ndarray:
+    """
+    Кривая обучения: средние значения по последовательным блокам попыток
+
+    Неполный последний блок отбрасывается.
+    """
+    bins = values.size // bin_size
+    if bins == 0:
+        return np.empty(0, dtype=np.float64)
+    return values[:bins * bin_size].reshape(bins, bin_size).mean(axis=1)
+
+
+def breakdown(trials: np.ndarray) -> Dict[Tuple[str, str], Dict[str, float]]:
+    """
+    Статистика по парам (режим, сложность)
+
+    :return: Словарь {(режим, сложность): {"count", "mean_ms", "p50", "p90"}}
+    """
+    if trials.size == 0:
+        return {}
+
+    keys = trials["mode"].astype(np.int64) * len(DIFFICULTIES) + trials["difficulty"]
+    values = reaction_ms(trials)
+
+    # Сортируем по группе, затем по времени - медианы берутся из срезов
+    order = np.lexsort((values, keys))
+    keys = keys[order]
+    values = values[order]
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    ends = np.r_[starts[1:], keys.size]
+    sums = np.add.reduceat(values, starts)
+
+    result = {}
+    for start, end, total in zip(starts, ends, sums):
+        key = int(keys[start])
+        group = values[start:end]
+        mode, difficulty = divmod(key, len(DIFFICULTIES))
+        result[(MODES[mode], DIFFICULTIES[difficulty])] = {
+            "count": int(end - start),
+            "mean_ms": float(total / (end - start)),
+            **percentiles(group, (50, 90))
+        }
+    return result
+
+
+def report(path: str = TRIAL_LOG["path"], window: int = 20,
+           bin_size: int = 50) -> Dict[str, object]:
+    """
+    Сводный отчет по журналу попыток
+
+    :param path: Путь к файлу журнала
+    :param window: Окно скользящего среднего
+    :param bin_size: Размер блока для кривой обучения
+    """
+    trials = scored(load_trials(path))
+    timed = reliable(trials)
+    values = reaction_ms(timed)
+    clean = reject_outliers(values)
+    rolling = rolling_mean(values, window)
+    return {
+        "trials": int(trials.size),
+        "compromised": int(trials.size - timed.size),
+        "outliers": int(values.size - clean.size),
+        "mean_ms": float(clean.mean()) if clean.size else float("nan"),
+        "percentiles": percentiles(clean),
+        "points": int(trials["points"].sum()),
+        "rolling_mean_last": float(rolling[-1]) if rolling.size else float("nan"),
+        "learning_curve": learning_curve(clean, bin_size).tolist(),
+        "breakdown": {
+            f"{mode}/{difficulty}": stats
+            for (mode, difficulty), stats in breakdown(timed).items()
+        }
+    }
@@ -2,139 +2,260 @@
 Модуль с утилитами для анимаций
 """
 import tkinter as tk
-from typing import List, Callable, Optional
-from src.utils.settings import ANIMATION
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Callable, Optional, Tuple
+from src.utils.config import current, parse_rgb
+from src.utils.layout import get_layout
+from src.utils.profiling import profile_block, profiled
+from src.utils.resources import ResourceRegistry
+from src.utils.scheduler import AnimationHandle, get_scheduler
 
 
-def create_gradient(canvas: tk.Canvas, color1: str, color2: str) -> None:
-    """Создает градиентный фон на канвасе"""
-    width = canvas.winfo_width()
-    height = canvas.winfo_height()
-    
-    if width <= 1 or height <= 1:
-        canvas.update()
-        width = canvas.winfo_width()
-        height = canvas.winfo_height()
-    
+def _render_gradient(canvas: tk.Canvas, width: int, height: int,
+                     color1: str, color2: str) -> tk.PhotoImage:
+    """
+    Рендерит вертикальный градиент в изображение
+
+    Строится столбец шириной в один пиксель, который затем
+    растягивается по горизонтали средствами Tk.
+    """
+    # Цвета конфигурации уже разобраны
+    rgb = current().colors.rgb
+    r1, g1, b1 = rgb.get(color1) or parse_rgb(color1)
+    r2, g2, b2 = rgb.get(color2) or parse_rgb(color2)
+
+    rows = []
     for i in range(height):
-        # Вычисляем цвет для текущей строки
         ratio = i / height
-        r1, g1, b1 = [int(color1[i:i+2], 16) for i in (1, 3, 5)]
-        r2, g2, b2 = [int(color2[i:i+2], 16) for i in (1, 3, 5)]
         r = int(r1 * (1 - ratio) + r2 * ratio)
         g = int(g1 * (1 - ratio) + g2 * ratio)
         b = int(b1 * (1 - ratio) + b2 * ratio)
-        color = f'#{r:02x}{g:02x}{b:02x}'
-        canvas.create_line(0, i, width, i, fill=color)
+        rows.append(f'{{#{r:02x}{g:02x}{b:02x}}}')
+
+    column = tk.PhotoImage(master=canvas, width=1, height=height)
+    column.put(' '.join(rows), to=(0, 0))
+    return column.zoom(width, 1)
+
+
+# Кэш отрендеренных градиентов: (ширина, высота, цвет1, цвет2) -> изображение
+_gradient_cache: "OrderedDict[Tuple[int, int, str, str], tk.PhotoImage]" = OrderedDict()
+
+
+def create_gradient(canvas: tk.Canvas, color1: str, color2: str) -> int:
+    """
+    Создает или обновляет градиентный фон на канвасе
+
+    Градиент рендерится один раз в изображение и кэшируется. Фон на
+    канвасе всегда один: если он уже есть, у него меняется изображение.
+    Размер берется из раскладки канваса.
+
+    :return: ID элемента фона
+    """
+    layout = get_layout(canvas)
+    width, height = layout.width, layout.height
+
+    key = (width, height, color1, color2)
+    image = _gradient_cache.get(key)
+    if image is None:
+        with profile_block("animation.gradient_render"):
+            image = _render_gradient(canvas, width, height, color1, color2)
+        _gradient_cache[key] = image
+        if len(_gradient_cache) > current().animation.gradient_cache_size:
+            _gradient_cache.popitem(last=False)
+    else:
+        _gradient_cache.move_to_end(key)
+
+    existing = canvas.find_withtag("gradient")
+    if existing:
+        item = existing[0]
+        canvas.itemconfigure(item, image=image)
+        if len(existing) > 1:
+            canvas.delete(*existing[1:])
+    else:
+        item = canvas.create_image(0, 0, image=image, anchor="nw", tags=("gradient",))
+    canvas.tag_lower(item)
+    return item
+
+
+@lru_cache(maxsize=64)
+def shape_keyframes(offsets: Tuple[float, ...], steps: int,
+                    start_scale: float, end_scale: float) -> Tuple[Tuple[float, ...], ...]:
+    """
+    Кадры масштабирования фигуры относительно ее центра
+
+    Таблица строится один раз для каждой формы, размера и числа шагов.
+
+    :param offsets: Вершины фигуры полного размера относительно центра
+    :return: Смещения вершин для кадров 0..steps
+    """
+    frames = []
+    for step in range(steps + 1):
+        scale = start_scale + (end_scale - start_scale) * (step / steps)
+        frames.append(tuple(value * scale for value in offsets))
+    return tuple(frames)
+
+
+def _translate(frames: Tuple[Tuple[float, ...], ...],
+               x: float, y: float) -> Tuple[Tuple[float, ...], ...]:
+    """Переносит кадры в точку (x, y)"""
+    return tuple(
+        tuple(value + (y if i % 2 else x) for i, value in enumerate(frame))
+        for frame in frames
+    )
 
 
 def animate_shape(canvas: tk.Canvas, shape_id: int, 
                  start_scale: float = 0.1, end_scale: float = 1.0,
-                 on_complete: Optional[Callable] = None) -> str:
+                 on_complete: Optional[Callable] = None) -> Optional[AnimationHandle]:
     """
     Анимация появления фигуры
+
+    Кадры берутся из таблицы и переносятся в позицию фигуры один раз
+    при запуске, шаг - это один вызов coords.
     
-    :return: ID анимации
+    :return: Дескриптор анимации
     """
     coords = canvas.coords(shape_id)
     if not coords:
-        return ""
+        return None
         
     # Находим центр фигуры
     center_x = sum(coords[::2]) / len(coords[::2])
     center_y = sum(coords[1::2]) / len(coords[1::2])
+    offsets = tuple(
+        value - (center_y if i % 2 else center_x) for i, value in enumerate(coords)
+    )
+    steps = current().animation.steps
+    frames = _translate(
+        shape_keyframes(offsets, steps, start_scale, end_scale), center_x, center_y
+    )
     
-    def animate_step(step: int) -> None:
+    def animate_step(step: int) -> bool:
         if not canvas.winfo_exists():
-            return
-            
-        scale = start_scale + (end_scale - start_scale) * (step / ANIMATION["steps"])
-        
-        # Масштабируем координаты относительно центра
-        new_coords = []
-        for i in range(0, len(coords), 2):
-            x = center_x + (coords[i] - center_x) * scale
-            y = center_y + (coords[i+1] - center_y) * scale
-            new_coords.extend([x, y])
+            return False
             
-        canvas.coords(shape_id, *new_coords)
+        canvas.coords(shape_id, frames[step])
         
-        if step < ANIMATION["steps"]:
-            return canvas.after(ANIMATION["speed"], lambda: animate_step(step + 1))
-        elif on_complete:
+        if step < steps:
+            return True
+        if on_complete:
             on_complete()
-            return ""
+        return False
     
-    return animate_step(0) or ""
+    return get_scheduler(canvas).add(profiled("animation.shape_step")(animate_step))
+
 
+@lru_cache(maxsize=16)
+def flash_keyframes(radius: float, rings: int,
+                    steps: int) -> Tuple[Tuple[Tuple[float, ...], ...], ...]:
+    """
+    Кадры вспышки: для каждого шага - рамки колец относительно центра
 
-def create_flash_effect(canvas: tk.Canvas, x: int, y: int, color: str) -> List[str]:
+    :return: frames[шаг][кольцо] = (x0, y0, x1, y1)
+    """
+    frames = []
+    for step in range(steps):
+        boxes = []
+        for i in range(rings):
+            r = radius * (1 - i / rings) * (1 + step / steps)
+            boxes.append((-r, -r, r, r))
+        frames.append(tuple(boxes))
+    return tuple(frames)
+
+
+def create_flash_effect(canvas: tk.Canvas, x: int, y: int, color: str,
+                        resources: Optional[ResourceRegistry] = None) -> AnimationHandle:
     """
     Создает эффект вспышки при клике
-    
-    :return: Список ID анимаций
+
+    :param resources: Реестр компонента, которому принадлежат кольца
+    :return: Дескриптор анимации
     """
-    animation_ids = []
-    rings = []
-    
-    for i in range(ANIMATION["flash_rings"]):
-        radius = ANIMATION["flash_radius"] * (1 - i/ANIMATION["flash_rings"])
-        ring = canvas.create_oval(
-            x - radius, y - radius,
-            x + radius, y + radius,
-            fill=color,
-            outline="",
-            width=2
-        )
-        rings.append(ring)
-    
-    def fade_step(step: int, rings: List[int]) -> Optional[str]:
+    animation = current().animation
+    steps = animation.steps
+    frames = tuple(
+        _translate(boxes, x, y)
+        for boxes in flash_keyframes(animation.flash_radius, animation.flash_rings, steps)
+    )
+    rings = [
+        canvas.create_oval(*box, fill=color, outline="", width=2)
+        for box in frames[0]
+    ]
+    if resources is not None:
+        for ring in rings:
+            resources.own(ring)
+
+    def remove_rings() -> None:
         if not canvas.winfo_exists():
-            return None
-            
-        if step >= 10 or not rings:
-            for ring in rings:
+            return
+        for ring in rings:
+            if resources is not None:
+                resources.delete(ring)
+            else:
                 canvas.delete(ring)
-            return None
-        
+
+    def fade_step(step: int) -> bool:
+        if not canvas.winfo_exists():
+            return False
+
+        if step >= steps:
+            remove_rings()
+            return False
+
         # Изменяем размер колец
-        for i, ring in enumerate(rings):
-            radius = ANIMATION["flash_radius"] * (1 - i/ANIMATION["flash_rings"]) * (1 + step/10)
-            canvas.coords(
-                ring,
-                x - radius, y - radius,
-                x + radius, y + radius
-            )
-        
-        return canvas.after(20, lambda: fade_step(step + 1, rings))
-    
-    animation_id = fade_step(0, rings)
-    if animation_id:
-        animation_ids.append(animation_id)
-    
-    return animation_ids
+        for ring, box in zip(rings, frames[step]):
+            canvas.coords(ring, box)
+        return True
+
+    return get_scheduler(canvas).add(
+        profiled("animation.flash_step")(fade_step), on_cancel=remove_rings
+    )
+
+
+@lru_cache(maxsize=16)
+def font_keyframes(family: str, size: int, steps: int,
+                   start_scale: float, end_scale: float) -> Tuple[Tuple[str, int], ...]:
+    """Кадры размера шрифта для анимации текста"""
+    return tuple(
+        (family, max(1, round(size * (start_scale + (end_scale - start_scale) * step / steps))))
+        for step in range(steps + 1)
+    )
 
 
 def animate_text(canvas: tk.Canvas, text_id: int, center_x: int, center_y: int,
                 start_scale: float = 0.1, end_scale: float = 1.0,
-                on_complete: Optional[Callable] = None) -> str:
+                on_complete: Optional[Callable] = None,
+                font: Tuple[str, int] = ("Helvetica", 14)) -> AnimationHandle:
     """
     Анимация появления текста
-    
-    :return: ID анимации
+
+    Текст растет за счет размера шрифта (canvas.scale двигает только
+    точку привязки текста, а не его размер).
+
+    :param font: Итоговый шрифт текста
+    :return: Дескриптор анимации
     """
-    canvas.scale(text_id, center_x, center_y, start_scale, start_scale)
+    steps = current().animation.steps
+    frames = font_keyframes(font[0], font[1], steps, start_scale, end_scale)
+    canvas.coords(text_id, center_x, center_y)
+
+    def finish() -> None:
+        # При отмене текст сразу получает итоговый размер
+        if canvas.winfo_exists():
+            canvas.itemconfigure(text_id, font=frames[-1])
     
-    def animate_step(step: int) -> Optional[str]:
+    def animate_step(step: int) -> bool:
         if not canvas.winfo_exists():
-            return None
+            return False
             
-        if step <= 10:
-            scale = start_scale + (end_scale - start_scale) * (step / 10)
-            canvas.scale(text_id, center_x, center_y, scale, scale)
-            return canvas.after(ANIMATION["speed"], lambda: animate_step(step + 1))
-        elif on_complete:
+        canvas.itemconfigure(text_id, font=frames[step])
+        if step < steps:
+            return True
+        if on_complete:
             on_complete()
-            return None
+        return False
     
-    return animate_step(0) or ""
\ No newline at end of file
+    return get_scheduler(canvas).add(
+        profiled("animation.text_step")(animate_step), on_cancel=finish
+    )
@@ -0,0 +1,307 @@
+"""
+Модуль со звуковым движком
+
+Тоны синтезируются в PCM один раз и кэшируются, воспроизведение идет
+в отдельном потоке. Для каждого сигнала фиксируется момент фактического
+начала воспроизведения, от которого отсчитывается реакция в режиме звука.
+"""
+import io
+import math
+import os
+import queue
+import shutil
+import subprocess
+import sys
+import threading
+import time
+import wave
+from array import array
+from typing import Dict, Optional, Tuple
+from src.utils.settings import AUDIO
+
+
+def synthesize_tone(frequency: float, duration: int, sample_rate: int,
+                    volume: float) -> bytes:
+    """
+    Синтезирует синусоидальный тон
+
+    :param frequency: Частота в Гц
+    :param duration: Длительность в мс
+    :param sample_rate: Частота дискретизации
+    :param volume: Громкость от 0 до 1
+    :return: 16-битный моно PCM (little-endian)
+    """
+    count = sample_rate * duration // 1000
+    # Короткие нарастание и затухание убирают щелчки на краях
+    fade = max(1, min(count // 2, sample_rate // 200))
+    amplitude = 32767 * volume
+    step = 2 * math.pi * frequency / sample_rate
+
+    samples = array("h", bytes(2 * count))
+    for i in range(count):
+        envelope = min(1.0, i / fade, (count - 1 - i) / fade)
+        samples[i] = int(amplitude * envelope * math.sin(step * i))
+    if sys.byteorder == "big":
+        samples.byteswap()
+    return samples.tobytes()
+
+
+def pcm_to_wav(pcm: bytes, sample_rate: int) -> bytes:
+    """Упаковывает моно PCM в WAV"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(pcm)
+    return buffer.getvalue()
+
+
+def _ms_to_ns(ms: float) -> int:
+    return int(ms * 1_000_000)
+
+
+class AudioBackend:
+    """
+    Базовый звуковой бэкенд: play вызывается из потока звукового движка
+
+    play возвращает момент начала звука (perf_counter_ns), который бэкенд
+    оценивает по завершению вызова и задержке вывода (None - сигнал
+    не воспроизведен). Бэкенд, который блокирует поток на весь сигнал,
+    сообщает момент начала заранее через expected_onset.
+    """
+
+    name = "base"
+
+    def expected_onset(self) -> Optional[int]:
+        """Момент начала звука до вызова play (None - известен только после)"""
+        return None
+
+    def play(self, pcm: bytes, wav: bytes, sample_rate: int) -> Optional[int]:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class NullBackend(AudioBackend):
+    """Бэкенд без звука (для запуска без аудиоустройства)"""
+
+    name = "null"
+
+    def play(self, pcm: bytes, wav: bytes, sample_rate: int) -> int:
+        return time.perf_counter_ns()
+
+
+class FileBackend(AudioBackend):
+    """Бэкенд, сохраняющий каждый сигнал в WAV-файл"""
+
+    name = "file"
+
+    def __init__(self, directory: str = AUDIO["output_dir"]):
+        self.directory = directory
+        self.count = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def play(self, pcm: bytes, wav: bytes, sample_rate: int) -> int:
+        self.count += 1
+        path = os.path.join(self.directory, f"tone_{self.count:06d}.wav")
+        with open(path, "wb") as f:
+            f.write(wav)
+        return time.perf_counter_ns()
+
+
+class WinsoundBackend(AudioBackend):
+    """Бэкенд Windows на winsound"""
+
+    name = "winsound"
+
+    def __init__(self, latency: float = AUDIO["output_latency"]):
+        import winsound
+        self.winsound = winsound
+        self.latency_ns = _ms_to_ns(latency)
+
+    def expected_onset(self) -> int:
+        # PlaySound возвращается только по окончании сигнала, а клик может
+        # прийти раньше: начало звука - момент вызова плюс задержка вывода
+        return time.perf_counter_ns() + self.latency_ns
+
+    def play(self, pcm: bytes, wav: bytes, sample_rate: int) -> None:
+        # SND_MEMORY не поддерживает SND_ASYNC, поэтому вызов синхронный -
+        # он выполняется в потоке звукового движка
+        self.winsound.PlaySound(wav, self.winsound.SND_MEMORY)
+
+
+class AplayBackend(AudioBackend):
+    """
+    Бэкенд Linux на aplay
+
+    Процесс aplay запускается один раз и получает сырой PCM через stdin,
+    поэтому на каждый сигнал не тратится время на запуск процесса.
+    """
+
+    name = "aplay"
+
+    def __init__(self, sample_rate: int = AUDIO["sample_rate"],
+                 buffer_time: int = AUDIO["buffer_time"],
+                 latency: float = AUDIO["output_latency"]):
+        """
+        :param sample_rate: Частота дискретизации
+        :param buffer_time: Размер буфера aplay (мс)
+        :param latency: Дополнительная задержка вывода устройства (мс)
+        """
+        self.sample_rate = sample_rate
+        self.buffer_time = buffer_time
+        # Звук начинается, когда буфер aplay заполнен и передан устройству
+        self.latency_ns = _ms_to_ns(buffer_time + latency)
+        self.process: Optional[subprocess.Popen] = None
+
+    def _ensure_process(self) -> subprocess.Popen:
+        if self.process is None or self.process.poll() is not None:
+            self.process = subprocess.Popen(
+                ["aplay", "-q", "-t", "raw", "-f", "S16_LE", "-c", "1",
+                 "-r", str(self.sample_rate), f"--buffer-time={self.buffer_time * 1000}"],
+                stdin=subprocess.PIPE,
+                stderr=subprocess.DEVNULL
+            )
+        return self.process
+
+    def play(self, pcm: bytes, wav: bytes, sample_rate: int) -> Optional[int]:
+        process = self._ensure_process()
+        try:
+            process.stdin.write(pcm)
+            process.stdin.flush()
+        except BrokenPipeError:
+            self.process = None
+            return None
+        return time.perf_counter_ns() + self.latency_ns
+
+    def close(self) -> None:
+        if self.process is not None:
+            self.process.stdin.close()
+            self.process.wait()
+            self.process = None
+
+
+def select_backend(name: str = AUDIO["backend"]) -> AudioBackend:
+    """
+    Выбирает звуковой бэкенд
+
+    :param name: "auto", "winsound", "aplay", "file" или "null";
+                 переменная окружения REACTION_AUDIO имеет приоритет
+    """
+    name = os.environ.get("REACTION_AUDIO", name)
+    if name == "auto":
+        if sys.platform == "win32":
+            name = "winsound"
+        elif shutil.which("aplay"):
+            name = "aplay"
+        else:
+            name = "null"
+
+    if name == "winsound":
+        return WinsoundBackend()
+    if name == "aplay":
+        return AplayBackend()
+    if name == "file":
+        return FileBackend()
+    return NullBackend()
+
+
+class PlaybackTicket:
+    """
+    Квитанция о запуске сигнала
+
+    onset_ns - момент начала звука по оценке бэкенда (после передачи
+    сигнала устройству с поправкой на задержку вывода, у блокирующего
+    бэкенда - заранее, до вызова); None, пока сигнал не передан или если
+    воспроизвести его не удалось.
+    """
+
+    __slots__ = ("requested_ns", "onset_ns", "_started")
+
+    def __init__(self):
+        self.requested_ns = time.perf_counter_ns()
+        self.onset_ns: Optional[int] = None
+        self._started = threading.Event()
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[int]:
+        """Ждет передачи сигнала бэкенду и возвращает момент начала звука"""
+        self._started.wait(timeout)
+        return self.onset_ns
+
+
+class AudioEngine:
+    """Воспроизводит закэшированные тоны в отдельном потоке"""
+
+    def __init__(self, backend: Optional[AudioBackend] = None,
+                 sample_rate: int = AUDIO["sample_rate"]):
+        """
+        :param backend: Звуковой бэкенд (по умолчанию - select_backend())
+        :param sample_rate: Частота дискретизации
+        """
+        self.backend = backend or select_backend()
+        self.sample_rate = sample_rate
+        self._tones: Dict[Tuple[float, int, float], Tuple[bytes, bytes]] = {}
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+
+    def tone(self, frequency: float = AUDIO["frequency"],
+             duration: int = AUDIO["duration"],
+             volume: float = AUDIO["volume"]) -> Tuple[bytes, bytes]:
+        """Возвращает PCM и WAV тона, синтезируя его при первом обращении"""
+        key = (frequency, duration, volume)
+        cached = self._tones.get(key)
+        if cached is None:
+            pcm = synthesize_tone(frequency, duration, self.sample_rate, volume)
+            cached = (pcm, pcm_to_wav(pcm, self.sample_rate))
+            self._tones[key] = cached
+        return cached
+
+    def play_tone(self, frequency: float = AUDIO["frequency"],
+                  duration: int = AUDIO["duration"],
+                  volume: float = AUDIO["volume"]) -> PlaybackTicket:
+        """
+        Ставит тон в очередь воспроизведения
+
+        :return: Квитанция, в которую поток запишет момент начала звука
+        """
+        pcm, wav = self.tone(frequency, duration, volume)
+        ticket = PlaybackTicket()
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="audio", daemon=True
+            )
+            self._thread.start()
+        self._queue.put((pcm, wav, ticket))
+        return ticket
+
+    def close(self) -> None:
+        """Останавливает поток воспроизведения и бэкенд"""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+        self.backend.close()
+
+    def _run(self) -> None:
+        """Цикл потока воспроизведения"""
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            pcm, wav, ticket = job
+            expected = self.backend.expected_onset()
+            if expected is not None:
+                # Блокирующий бэкенд: квитанция заполняется до вызова
+                ticket.onset_ns = expected
+                ticket._started.set()
+            try:
+                onset_ns = self.backend.play(pcm, wav, self.sample_rate)
+                if expected is None:
+                    ticket.onset_ns = onset_ns
+            except OSError as e:
+                print(f"Ошибка воспроизведения звука: {e}", file=sys.stderr)
+                # Звука не было: реакция отсчитывается от показа
+                ticket.onset_ns = None
+            ticket._started.set()
@@ -0,0 +1,358 @@
+"""
+Модуль со скомпилированной конфигурацией игры
+
+Настройки собираются слоями: значения по умолчанию из settings.py
+и colors.py, пользовательский JSON-файл и переменные окружения.
+Результат проверяется и компилируется в неизменяемые объекты
+с готовыми значениями (цвета уже разобраны в RGB, палитра собрана
+в кортеж), поэтому горячие пути читают атрибуты, а не ищут ключи
+во вложенных словарях.
+
+Между играми достаточно вызвать reload_if_changed: файл перечитывается,
+только если изменилось время его модификации.
+"""
+import copy
+import json
+import os
+import re
+import sys
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, NamedTuple, Optional, Tuple
+from src.utils.colors import COLORS
+from src.utils.settings import ANIMATION, CONFIG, GAME, PROGRESSION, WINDOW
+
+Rgb = Tuple[int, int, int]
+
+# Разделы конфигурации и их значения по умолчанию
+DEFAULTS = {
+    "window": WINDOW,
+    "game": GAME,
+    "animation": ANIMATION,
+    "progression": PROGRESSION,
+    "colors": COLORS,
+}
+
+_COLOR_RE = re.compile(r"#[0-9a-fA-F]{6}")
+
+# Разделы, в которые можно добавлять свои ключи (например, цвета фигур)
+_OPEN_SECTIONS = {"colors.shapes"}
+
+
+class ConfigError(ValueError):
+    """Ошибка в пользовательской конфигурации"""
+
+
+class WindowConfig(NamedTuple):
+    title: str
+    width: int
+    height: int
+
+
+class RushConfig(NamedTuple):
+    lifetime: Mapping[str, int]
+    spawn_interval: int
+    batch: int
+    max_targets: int
+
+
+class GameConfig(NamedTuple):
+    shape_size: int
+    spawn_delay: Mapping[str, int]
+    points_min: int
+    points_max: int
+    sound_chance: float
+    rush: RushConfig
+
+
+class AnimationConfig(NamedTuple):
+    speed: int
+    steps: int
+    flash_radius: int
+    flash_rings: int
+    gradient_cache_size: int
+
+
+class ProgressionConfig(NamedTuple):
+    difficulty_thresholds: Mapping[str, int]
+    mode_thresholds: Mapping[str, int]
+    mode_order: Tuple[str, ...]
+    difficulty_order: Tuple[str, ...]
+    mode_change_chance: float
+
+
+class ColorsConfig(NamedTuple):
+    bg: str
+    text: str
+    button: str
+    primary: str
+    flash: str
+    gradient1: str
+    gradient2: str
+    shapes: Mapping[str, str]
+    palette: Tuple[str, ...]    # Все цвета фигур (режимы "color" и "rush")
+    default_shape: str
+    rgb: Mapping[str, Rgb]      # "#rrggbb" -> (r, g, b) для всех цветов
+
+
+class Config(NamedTuple):
+    """Скомпилированная конфигурация"""
+    window: WindowConfig
+    game: GameConfig
+    animation: AnimationConfig
+    progression: ProgressionConfig
+    colors: ColorsConfig
+    path: str
+    mtime: Optional[float]  # Время модификации файла (None - файла нет)
+
+
+def parse_rgb(color: str) -> Rgb:
+    """Разбирает цвет вида #rrggbb в кортеж RGB"""
+    return int(color[1:3], 16), int(color[3:5], 16), int(color[5:7], 16)
+
+
+def merge(base: Dict[str, Any], override: Dict[str, Any],
+          where: str = "") -> Dict[str, Any]:
+    """
+    Накладывает переопределения на словарь значений по умолчанию
+
+    Ключи и типы значений должны совпадать со значениями по умолчанию.
+
+    :return: Новый словарь (base не изменяется)
+    """
+    result = copy.deepcopy(base)
+    for key, value in override.items():
+        name = f"{where}.{key}" if where else key
+        if key not in base:
+            if where not in _OPEN_SECTIONS:
+                raise ConfigError(f"{name}: неизвестный параметр")
+            result[key] = value
+            continue
+        default = base[key]
+        if isinstance(default, dict):
+            if not isinstance(value, dict):
+                raise ConfigError(f"{name}: ожидается раздел")
+            result[key] = merge(default, value, name)
+            continue
+        if isinstance(default, bool) or isinstance(value, bool):
+            valid = type(value) is type(default)
+        elif isinstance(default, float):
+            valid = isinstance(value, (int, float))
+        elif isinstance(default, (list, tuple)):
+            valid = isinstance(value, (list, tuple))
+        else:
+            valid = isinstance(value, type(default))
+        if not valid:
+            raise ConfigError(f"{name}: ожидается {type(default).__name__}")
+        result[key] = value
+    return result
+
+
+def env_overrides(environ: Mapping[str, str],
+                  prefix: str = CONFIG["env_prefix"]) -> Dict[str, Any]:
+    """
+    Собирает переопределения из переменных окружения
+
+    REACTION__GAME__SPAWN_DELAY__EASY=1800 задает game.spawn_delay.easy;
+    значение разбирается как JSON, иначе берется строкой.
+    """
+    result: Dict[str, Any] = {}
+    for name, raw in environ.items():
+        if not name.startswith(prefix):
+            continue
+        keys = name[len(prefix):].lower().split("__")
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError:
+            value = raw
+        node = result
+        for key in keys[:-1]:
+            node = node.setdefault(key, {})
+            if not isinstance(node, dict):
+                raise ConfigError(f"{name}: конфликт с другой переменной")
+        node[keys[-1]] = value
+    return result
+
+
+def _check(condition: bool, message: str) -> None:
+    if not condition:
+        raise ConfigError(message)
+
+
+def _levels(values: Dict[str, int], order: Tuple[str, ...], name: str) -> Mapping[str, int]:
+    """Проверяет значения по уровням сложности и замораживает словарь"""
+    for level in order:
+        _check(level in values, f"{name}: нет значения для {level}")
+        _check(values[level] > 0, f"{name}.{level}: должно быть больше нуля")
+    return MappingProxyType(dict(values))
+
+
+def compile_config(data: Dict[str, Dict[str, Any]], path: str = "",
+                   mtime: Optional[float] = None) -> Config:
+    """
+    Проверяет объединенные настройки и строит из них Config
+
+    :param data: Разделы как в DEFAULTS
+    """
+    window = data["window"]
+    game = data["game"]
+    animation = data["animation"]
+    progression = data["progression"]
+    colors = data["colors"]
+
+    _check(window["width"] > 0 and window["height"] > 0, "window: размер должен быть больше нуля")
+
+    mode_order = tuple(progression["mode_order"])
+    difficulty_order = tuple(progression["difficulty_order"])
+    _check(set(mode_order) <= {"color", "shape", "sound", "rush"} and mode_order,
+           "progression.mode_order: неизвестный режим")
+    _check(set(difficulty_order) == set(game["spawn_delay"]),
+           "progression.difficulty_order: должны быть перечислены все сложности")
+    _check(0 <= progression["mode_change_chance"] <= 1,
+           "progression.mode_change_chance: ожидается число от 0 до 1")
+
+    _check(game["shape_size"] > 0, "game.shape_size: должно быть больше нуля")
+    _check(0 <= game["sound_chance"] <= 1, "game.sound_chance: ожидается число от 0 до 1")
+    points = game["points"]
+    _check(0 <= points["min"] <= points["max"], "game.points: нужно 0 <= min <= max")
+    rush = game["rush"]
+    _check(rush["spawn_interval"] > 0 and rush["batch"] > 0 and rush["max_targets"] > 0,
+           "game.rush: параметры должны быть больше нуля")
+
+    _check(animation["steps"] > 0 and animation["speed"] > 0,
+           "animation: steps и speed должны быть больше нуля")
+    _check(animation["flash_rings"] > 0 and animation["gradient_cache_size"] > 0,
+           "animation: flash_rings и gradient_cache_size должны быть больше нуля")
+
+    shapes = colors["shapes"]
+    named = {key: value for key, value in colors.items() if key != "shapes"}
+    for key, value in list(named.items()) + [(f"shapes.{k}", v) for k, v in shapes.items()]:
+        _check(isinstance(value, str) and _COLOR_RE.fullmatch(value) is not None,
+               f"colors.{key}: ожидается цвет вида #rrggbb")
+    _check("default" in shapes, "colors.shapes: нет цвета default")
+    rgb = {color: parse_rgb(color)
+           for color in list(named.values()) + list(shapes.values())}
+
+    return Config(
+        window=WindowConfig(window["title"], window["width"], window["height"]),
+        game=GameConfig(
+            shape_size=game["shape_size"],
+            spawn_delay=_levels(game["spawn_delay"], difficulty_order, "game.spawn_delay"),
+            points_min=points["min"],
+            points_max=points["max"],
+            sound_chance=float(game["sound_chance"]),
+            rush=RushConfig(
+                lifetime=_levels(rush["lifetime"], difficulty_order, "game.rush.lifetime"),
+                spawn_interval=rush["spawn_interval"],
+                batch=rush["batch"],
+                max_targets=rush["max_targets"],
+            ),
+        ),
+        animation=AnimationConfig(
+            animation["speed"], animation["steps"], animation["flash_radius"],
+            animation["flash_rings"], animation["gradient_cache_size"]
+        ),
+        progression=ProgressionConfig(
+            difficulty_thresholds=MappingProxyType(dict(progression["difficulty_thresholds"])),
+            mode_thresholds=MappingProxyType(dict(progression["mode_thresholds"])),
+            mode_order=mode_order,
+            difficulty_order=difficulty_order,
+            mode_change_chance=float(progression["mode_change_chance"]),
+        ),
+        colors=ColorsConfig(
+            bg=colors["bg"], text=colors["text"], button=colors["button"],
+            primary=colors["primary"], flash=colors["flash"],
+            gradient1=colors["gradient1"], gradient2=colors["gradient2"],
+            shapes=MappingProxyType(dict(shapes)),
+            palette=tuple(shapes.values()),
+            default_shape=shapes["default"],
+            rgb=MappingProxyType(rgb),
+        ),
+        path=path,
+        mtime=mtime,
+    )
+
+
+def config_path() -> str:
+    """Путь к пользовательскому файлу (REACTION_CONFIG имеет приоритет)"""
+    return os.environ.get("REACTION_CONFIG") or CONFIG["path"]
+
+
+def _mtime(path: str) -> Optional[float]:
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+def load(path: Optional[str] = None,
+         environ: Optional[Mapping[str, str]] = None) -> Config:
+    """
+    Собирает конфигурацию из всех слоев
+
+    :param path: Пользовательский файл (по умолчанию - config_path())
+    :param environ: Переменные окружения (по умолчанию - os.environ)
+    """
+    path = path or config_path()
+    environ = os.environ if environ is None else environ
+    mtime = _mtime(path)
+
+    data: Dict[str, Any] = DEFAULTS
+    if mtime is not None:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                user = json.load(f)
+        except (OSError, UnicodeDecodeError, json.JSONDecodeError) as e:
+            # Файл, который нельзя прочитать, - такая же ошибка конфигурации
+            raise ConfigError(f"{path}: {e}") from None
+        if not isinstance(user, dict):
+            raise ConfigError(f"{path}: ожидается объект JSON")
+        data = merge(data, user)
+    overrides = env_overrides(environ)
+    if overrides:
+        data = merge(data, overrides)
+    return compile_config(data, path, mtime)
+
+
+_current: Optional[Config] = None
+
+
+def current() -> Config:
+    """
+    Действующая конфигурация
+
+    При первом обращении конфигурация загружается; если пользовательский
+    файл содержит ошибку, используются значения по умолчанию.
+    """
+    global _current
+    if _current is None:
+        try:
+            _current = load()
+        except ConfigError as e:
+            print(f"Ошибка конфигурации: {e}", file=sys.stderr)
+            _current = compile_config(DEFAULTS, config_path(), _mtime(config_path()))
+    return _current
+
+
+def reload_if_changed() -> bool:
+    """
+    Перечитывает конфигурацию, если файл изменился
+
+    Проверка - один вызов stat. При ошибке в файле остается прежняя
+    конфигурация.
+
+    :return: True, если конфигурация заменена
+    """
+    global _current
+    config = current()
+    path = config_path()
+    mtime = _mtime(path)
+    if path == config.path and mtime == config.mtime:
+        return False
+    try:
+        _current = load(path)
+    except ConfigError as e:
+        print(f"Ошибка конфигурации: {e}", file=sys.stderr)
+        # Запоминаем время, чтобы не разбирать тот же файл повторно
+        _current = config._replace(path=path, mtime=mtime)
+        return False
+    return True
@@ -0,0 +1,343 @@
+"""
+Модуль экспорта журнала попыток
+
+Журнал читается блоками фиксированного размера, каждый блок
+фильтруется и преобразуется векторно и сразу пишется в выходной файл,
+поэтому расход памяти не зависит от длины истории. Игрок попытки
+определяется по истории игр в базе результатов: попытка относится
+к профилю, в игру которого попадает ее время.
+
+Parquet пишется через необязательный пакет pyarrow.
+"""
+import csv
+import os
+import sqlite3
+import sys
+import time
+from datetime import datetime
+from typing import Iterator, List, NamedTuple, Optional, Sequence
+import numpy as np
+from src.utils.analytics import TRIAL_DTYPE
+from src.utils.settings import EXPORT, STORAGE, TRIAL_LOG
+from src.utils.trial_log import DIFFICULTIES, MODES
+
+FORMATS = ("csv", "parquet")
+
+COLUMNS = ("timestamp", "user", "mode", "difficulty", "reaction_ms",
+           "points", "x", "y", "flags")
+
+
+class Sessions(NamedTuple):
+    """Интервалы игр, отсортированные по началу"""
+    started: np.ndarray
+    ended: np.ndarray
+    users: np.ndarray   # Индекс имени в names для каждой игры
+    names: List[str]
+
+
+def load_sessions(db_path: str = STORAGE["db_path"]) -> Sessions:
+    """
+    Загружает интервалы игр всех профилей
+
+    База открывается только для чтения; если ее нет, интервалов нет.
+    """
+    empty = Sessions(np.empty(0, np.int64), np.empty(0, np.int64),
+                     np.empty(0, np.int32), [])
+    if not os.path.exists(db_path):
+        return empty
+    db = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        profiles = db.execute("SELECT id, name FROM profiles ORDER BY id").fetchall()
+        rows = db.execute(
+            "SELECT started_at, ended_at, profile_id FROM sessions ORDER BY started_at"
+        ).fetchall()
+    finally:
+        db.close()
+    names = [name for _, name in profiles]
+    if not rows:
+        return empty._replace(names=names)
+    ids = {pid: index for index, (pid, _) in enumerate(profiles)}
+    started, ended, owners = zip(*rows)
+    return Sessions(
+        np.array(started, dtype=np.int64),
+        np.array(ended, dtype=np.int64),
+        np.array([ids[pid] for pid in owners], dtype=np.int32),
+        names
+    )
+
+
+def resolve_users(sessions: Sessions, timestamps: np.ndarray) -> np.ndarray:
+    """
+    Определяет профиль для каждой попытки
+
+    :return: Индексы имен в sessions.names (-1 - попытка вне известных игр)
+    """
+    if sessions.started.size == 0:
+        return np.full(timestamps.size, -1, dtype=np.int32)
+    index = np.searchsorted(sessions.started, timestamps, side="right") - 1
+    clipped = np.maximum(index, 0)
+    inside = (index >= 0) & (timestamps <= sessions.ended[clipped])
+    return np.where(inside, sessions.users[clipped], -1).astype(np.int32)
+
+
+def parse_time(value: str) -> int:
+    """
+    Разбирает дату или дату со временем (ISO 8601) в time_ns
+
+    Время без часового пояса считается местным.
+    """
+    return int(datetime.fromisoformat(value).timestamp() * 1_000_000_000)
+
+
+def iter_chunks(path: str = TRIAL_LOG["path"],
+                chunk_size: int = EXPORT["chunk_size"]) -> Iterator[np.ndarray]:
+    """
+    Читает журнал блоками по chunk_size попыток
+
+    Неполная запись в конце файла (оборванная запись) пропускается.
+    """
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return
+    with f:
+        remaining = os.fstat(f.fileno()).st_size // TRIAL_DTYPE.itemsize
+        while remaining > 0:
+            chunk = np.fromfile(f, dtype=TRIAL_DTYPE, count=min(chunk_size, remaining))
+            if chunk.size == 0:
+                break
+            remaining -= chunk.size
+            yield chunk
+
+
+class Filter(NamedTuple):
+    """Условия отбора попыток (None - без ограничения)"""
+    since_ns: Optional[int] = None
+    until_ns: Optional[int] = None
+    user: Optional[int] = None  # Индекс имени в Sessions.names
+    modes: Optional[Sequence[int]] = None
+
+
+class Columns(NamedTuple):
+    """Отобранные попытки блока, по столбцам"""
+    timestamp_ns: np.ndarray
+    users: np.ndarray
+    mode: np.ndarray
+    difficulty: np.ndarray
+    reaction_ms: np.ndarray
+    points: np.ndarray
+    x: np.ndarray
+    y: np.ndarray
+    flags: np.ndarray
+
+    def __len__(self) -> int:
+        return self.timestamp_ns.size
+
+
+def select(chunk: np.ndarray, sessions: Sessions, where: Filter) -> Columns:
+    """Фильтрует блок журнала и раскладывает его по столбцам"""
+    timestamps = chunk["timestamp_ns"]
+    mask = np.ones(chunk.size, dtype=bool)
+    if where.since_ns is not None:
+        mask &= timestamps >= where.since_ns
+    if where.until_ns is not None:
+        mask &= timestamps < where.until_ns
+    if where.modes is not None:
+        mask &= np.isin(chunk["mode"], where.modes)
+    users = resolve_users(sessions, timestamps)
+    if where.user is not None:
+        mask &= users == where.user
+    if not mask.all():
+        chunk = chunk[mask]
+        users = users[mask]
+    return Columns(
+        chunk["timestamp_ns"], users, chunk["mode"], chunk["difficulty"],
+        chunk["reaction_ns"] / 1e6, chunk["points"], chunk["x"], chunk["y"],
+        chunk["flags"]
+    )
+
+
+class CsvWriter:
+    """Пишет блоки в CSV"""
+
+    def __init__(self, path: str, sessions: Sessions):
+        if path == "-":
+            self._file = sys.stdout
+            self._close = False
+        else:
+            self._file = open(path, "w", newline="", encoding="utf-8",
+                              buffering=EXPORT["buffer_size"])
+            self._close = True
+        self._writer = csv.writer(self._file, lineterminator="\n")
+        self._writer.writerow(COLUMNS)
+        # Последний элемент - для попыток вне известных игр (индекс -1)
+        self._users = np.array(sessions.names + [""], dtype=object)
+        self._modes = np.array(MODES, dtype=object)
+        self._difficulties = np.array(DIFFICULTIES, dtype=object)
+
+    def write(self, columns: Columns) -> None:
+        # Время - ISO 8601 в UTC с точностью до микросекунд
+        stamps = np.datetime_as_string(
+            columns.timestamp_ns.view("datetime64[ns]"), unit="us", timezone="UTC"
+        )
+        self._writer.writerows(zip(
+            stamps.tolist(),
+            self._users[columns.users].tolist(),
+            self._modes[columns.mode].tolist(),
+            self._difficulties[columns.difficulty].tolist(),
+            np.round(columns.reaction_ms, 3).tolist(),
+            columns.points.tolist(),
+            columns.x.tolist(),
+            columns.y.tolist(),
+            columns.flags.tolist(),
+        ))
+
+    def close(self) -> None:
+        if self._close:
+            self._file.close()
+        else:
+            self._file.flush()
+
+
+class ParquetWriter:
+    """Пишет блоки в Parquet: каждый блок - отдельная группа строк"""
+
+    def __init__(self, path: str, sessions: Sessions):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError(
+                "Для экспорта в Parquet нужен пакет pyarrow (pip install pyarrow)"
+            ) from None
+        self._pa = pa
+        self._users = pa.array(sessions.names + [""], type=pa.string())
+        self._modes = pa.array(MODES, type=pa.string())
+        self._difficulties = pa.array(DIFFICULTIES, type=pa.string())
+        self._schema = pa.schema([
+            ("timestamp", pa.timestamp("ns", tz="UTC")),
+            ("user", pa.dictionary(pa.int32(), pa.string())),
+            ("mode", pa.dictionary(pa.int8(), pa.string())),
+            ("difficulty", pa.dictionary(pa.int8(), pa.string())),
+            ("reaction_ms", pa.float64()),
+            ("points", pa.int32()),
+            ("x", pa.int16()),
+            ("y", pa.int16()),
+            ("flags", pa.uint8()),
+        ])
+        self._writer = pq.ParquetWriter(path, self._schema, compression="zstd")
+
+    def write(self, columns: Columns) -> None:
+        pa = self._pa
+        users = np.where(columns.users < 0, len(self._users) - 1, columns.users)
+        table = pa.Table.from_arrays([
+            pa.array(columns.timestamp_ns, type=pa.timestamp("ns", tz="UTC")),
+            pa.DictionaryArray.from_arrays(pa.array(users, pa.int32()), self._users),
+            pa.DictionaryArray.from_arrays(
+                pa.array(columns.mode.astype(np.int8)), self._modes),
+            pa.DictionaryArray.from_arrays(
+                pa.array(columns.difficulty.astype(np.int8)), self._difficulties),
+            pa.array(columns.reaction_ms),
+            pa.array(columns.points),
+            pa.array(columns.x),
+            pa.array(columns.y),
+            pa.array(columns.flags),
+        ], schema=self._schema)
+        self._writer.write_table(table)
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+def export(output: str, fmt: str = "csv", log_path: str = TRIAL_LOG["path"],
+           db_path: str = STORAGE["db_path"], since: Optional[str] = None,
+           until: Optional[str] = None, user: Optional[str] = None,
+           modes: Optional[Sequence[str]] = None,
+           chunk_size: int = EXPORT["chunk_size"]) -> int:
+    """
+    Экспортирует журнал попыток
+
+    :param output: Путь к выходному файлу ("-" - stdout, только для CSV)
+    :param fmt: Формат из FORMATS
+    :param since: Начало периода (включительно, ISO 8601)
+    :param until: Конец периода (не включительно, ISO 8601)
+    :param user: Имя профиля
+    :param modes: Режимы игры
+    :return: Число выгруженных попыток
+    """
+    sessions = load_sessions(db_path)
+    user_index = None
+    if user is not None:
+        if user not in sessions.names:
+            raise ValueError(f"Профиль {user!r} не найден в {db_path}")
+        user_index = sessions.names.index(user)
+    for mode in modes or ():
+        if mode not in MODES:
+            raise ValueError(f"Неизвестный режим {mode!r}")
+
+    where = Filter(
+        since_ns=parse_time(since) if since else None,
+        until_ns=parse_time(until) if until else None,
+        user=user_index,
+        modes=[MODES.index(mode) for mode in modes] if modes else None,
+    )
+    if fmt == "parquet":
+        if output == "-":
+            raise ValueError("Parquet нельзя выводить в stdout")
+        writer = ParquetWriter(output, sessions)
+    else:
+        writer = CsvWriter(output, sessions)
+
+    total = 0
+    try:
+        for chunk in iter_chunks(log_path, chunk_size):
+            columns = select(chunk, sessions, where)
+            if len(columns):
+                writer.write(columns)
+                total += len(columns)
+    finally:
+        writer.close()
+    return total
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Экспорт журнала попыток из командной строки
+
+    :return: Код выхода
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Экспорт истории попыток")
+    parser.add_argument("output", help='выходной файл ("-" - stdout)')
+    parser.add_argument("--format", choices=FORMATS,
+                        help="формат (по умолчанию - по расширению файла, иначе csv)")
+    parser.add_argument("--since", help="начало периода, например 2024-05-01")
+    parser.add_argument("--until", help="конец периода (не включительно)")
+    parser.add_argument("--user", help="имя профиля")
+    parser.add_argument("--mode", action="append", choices=MODES,
+                        help="режим игры (можно указать несколько раз)")
+    parser.add_argument("--log", default=TRIAL_LOG["path"], help="файл журнала попыток")
+    parser.add_argument("--db", default=STORAGE["db_path"], help="база результатов")
+    parser.add_argument("--chunk-size", type=int, default=EXPORT["chunk_size"],
+                        help="попыток в одном блоке")
+    args = parser.parse_args(argv)
+
+    fmt = args.format
+    if fmt is None:
+        fmt = "parquet" if args.output.endswith(".parquet") else "csv"
+
+    started = time.perf_counter()
+    try:
+        total = export(args.output, fmt, args.log, args.db, args.since, args.until,
+                       args.user, args.mode, args.chunk_size)
+    except (ImportError, ValueError) as e:
+        print(f"Ошибка: {e}", file=sys.stderr)
+        return 2
+    except BrokenPipeError:
+        # Получатель закрыл stdout раньше времени (например, head)
+        sys.stdout = None
+        return 0
+    elapsed = time.perf_counter() - started
+    print(f"Выгружено попыток: {total}, время: {elapsed:.2f}с", file=sys.stderr)
+    return 0
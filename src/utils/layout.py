@@ -0,0 +1,100 @@
+"""
+Модуль с раскладкой канваса
+
+При переходе в полноэкранный режим Tk присылает серию событий
+<Configure>. Раскладка запоминает только последний размер и пересчитывает
+все зависимые элементы (фон, счет, границы спавна) один раз за кадр.
+Текущие размеры канваса хранятся здесь, поэтому остальным модулям
+не нужно каждый раз опрашивать winfo_width/winfo_height.
+"""
+import tkinter as tk
+import weakref
+from typing import Callable, List, Optional, Tuple
+from src.utils.config import current
+
+
+class CanvasLayout:
+    """Закэшированные размеры канваса и подписчики на их изменение"""
+
+    def __init__(self, canvas: tk.Canvas, interval: Optional[int] = None):
+        """
+        :param canvas: Канвас, размеры которого отслеживаются
+        :param interval: Окно объединения событий в мс (по умолчанию - кадр)
+        """
+        self.canvas = canvas
+        self.interval = interval or current().animation.speed
+        width, height = canvas.winfo_width(), canvas.winfo_height()
+        if width <= 1 or height <= 1:
+            # Канвас еще не отрисован - берем размер окна из настроек
+            window = current().window
+            width, height = window.width, window.height
+        self.width = width
+        self.height = height
+        self._listeners: List[Callable[[int, int], None]] = []
+        self._pending: Optional[Tuple[int, int]] = None
+        self._after_id: Optional[str] = None
+
+        # Статистика: сколько событий пришло и сколько раз пересчитана раскладка
+        self.events = 0
+        self.relayouts = 0
+
+        canvas.bind("<Configure>", self._on_configure, add="+")
+
+    def subscribe(self, callback: Callable[[int, int], None]) -> None:
+        """
+        Подписывает на изменение размеров
+
+        :param callback: Вызывается с новыми шириной и высотой
+        """
+        self._listeners.append(callback)
+
+    def unsubscribe(self, callback: Callable[[int, int], None]) -> None:
+        """Отменяет подписку"""
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _on_configure(self, event: tk.Event) -> None:
+        """Запоминает размер; пересчет - один раз на серию событий"""
+        self.events += 1
+        self._pending = (event.width, event.height)
+        if self._after_id is None:
+            self._after_id = self.canvas.after(self.interval, self._relayout)
+
+    def _relayout(self) -> None:
+        """Применяет последний размер из серии событий"""
+        self._after_id = None
+        size, self._pending = self._pending, None
+        if size is None or size == (self.width, self.height):
+            return
+        self.width, self.height = size
+        self.relayouts += 1
+        for callback in list(self._listeners):
+            callback(self.width, self.height)
+
+    def flush(self) -> None:
+        """
+        Применяет отложенное изменение размера немедленно
+
+        Только что упакованный канвас еще не получил ни одного <Configure>,
+        поэтому размер берется у Tk после расчета геометрии.
+        """
+        self.canvas.update_idletasks()
+        if self._after_id is not None:
+            self.canvas.after_cancel(self._after_id)
+            self._after_id = None
+        width, height = self.canvas.winfo_width(), self.canvas.winfo_height()
+        if width > 1 and height > 1:
+            self._pending = (width, height)
+        self._relayout()
+
+
+_layouts: "weakref.WeakKeyDictionary[tk.Canvas, CanvasLayout]" = weakref.WeakKeyDictionary()
+
+
+def get_layout(canvas: tk.Canvas) -> CanvasLayout:
+    """Возвращает раскладку канваса, создавая ее при необходимости"""
+    layout = _layouts.get(canvas)
+    if layout is None:
+        layout = CanvasLayout(canvas)
+        _layouts[canvas] = layout
+    return layout
@@ -0,0 +1,204 @@
+"""
+Модуль с монитором задержек цикла событий Tk
+
+Пульс (after с фиксированным периодом) измеряет, насколько поздно цикл
+событий выполняет отложенные вызовы, и запоминает промежутки, когда
+цикл стоял. Попытки, на время которых пришлась такая остановка или
+сильное опоздание спавна, отрисовки или обработки клика, помечаются
+как недостоверные.
+"""
+import json
+import os
+import sys
+import time
+import tkinter as tk
+from collections import deque
+from typing import Callable, Deque, Dict, Optional, Tuple
+from src.utils.config import current
+from src.utils.layout import get_layout
+from src.utils.profiling import Histogram
+from src.utils.scheduler import get_scheduler
+from src.utils.settings import MONITOR
+from src.utils.timing import TrialTiming
+
+
+class LoopMonitor:
+    """Следит за опозданиями отложенных вызовов, кадров и обработки ввода"""
+
+    def __init__(self, widget: tk.Misc,
+                 clock: Callable[[], int] = time.perf_counter_ns,
+                 interval: int = MONITOR["heartbeat"],
+                 threshold: int = MONITOR["stall_threshold"]):
+        """
+        :param widget: Виджет, через который планируется пульс
+        :param clock: Источник времени в наносекундах
+        :param interval: Период пульса в мс
+        :param threshold: Опоздание в мс, начиная с которого цикл считается вставшим
+        """
+        self.widget = widget
+        self.clock = clock
+        self.interval = interval
+        self.threshold_ns = threshold * 1_000_000
+
+        self.heartbeat = Histogram()  # Опоздание пульса
+        self.spawn = Histogram()      # Опоздание таймера спавна
+        self.input = Histogram()      # Задержка доставки клика до обработчика
+        self.stalls: Deque[Tuple[int, int]] = deque(maxlen=MONITOR["stall_history"])
+        self.compromised_trials = 0
+
+        self._after_id: Optional[str] = None
+        self._expected_ns = 0
+        self._beats = 0
+        self._overlay: Optional[Tuple[tk.Canvas, int]] = None
+
+    def start(self) -> None:
+        """Запускает пульс"""
+        if self._after_id is None:
+            self._expected_ns = self.clock() + self.interval * 1_000_000
+            self._after_id = self.widget.after(self.interval, self._beat)
+
+    def stop(self) -> None:
+        """Останавливает пульс"""
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _beat(self) -> None:
+        """Отложенный вызов пульса: измеряет собственное опоздание"""
+        now = self.clock()
+        lag = max(0, now - self._expected_ns)
+        self.heartbeat.add(lag)
+        if lag >= self.threshold_ns:
+            # Цикл стоял с планового момента пульса до текущего
+            self.stalls.append((self._expected_ns, now))
+
+        self._beats += 1
+        if self._overlay is not None and self._beats % MONITOR["overlay_every"] == 0:
+            self._draw_overlay()
+
+        self._expected_ns = now + self.interval * 1_000_000
+        self._after_id = self.widget.after(self.interval, self._beat)
+
+    def stalled(self, start_ns: int, end_ns: int) -> bool:
+        """Проверяет, стоял ли цикл событий в промежутке [start_ns, end_ns]"""
+        # Пульс, который уже должен был сработать, но еще не выполнен,
+        # означает остановку, которая длится до сих пор
+        if (self._after_id is not None and self._expected_ns <= end_ns
+                and self.clock() - self._expected_ns >= self.threshold_ns):
+            return True
+        for stall_start, stall_end in reversed(self.stalls):
+            if stall_end < start_ns:
+                break
+            if stall_start <= end_ns:
+                return True
+        return False
+
+    def check_trial(self, timing: TrialTiming) -> bool:
+        """
+        Учитывает временные отметки попытки
+
+        :return: True, если время попытки недостоверно
+        """
+        self.spawn.add(timing.scheduling_lag_ns)
+        latency = max(0, timing.handler_latency_ns)
+        self.input.add(latency)
+        compromised = (
+            timing.scheduling_lag_ns >= self.threshold_ns
+            or timing.render_ns >= self.threshold_ns
+            or latency >= self.threshold_ns
+            or self.stalled(timing.onset_ns, timing.handled_ns)
+        )
+        self.compromised_trials += compromised
+        return compromised
+
+    def check_click(self, onset_ns: int, click_ns: int, handled_ns: int) -> bool:
+        """
+        Учитывает клик без полной разметки попытки (режим "rush")
+
+        :return: True, если время попытки недостоверно
+        """
+        latency = max(0, handled_ns - click_ns)
+        self.input.add(latency)
+        compromised = latency >= self.threshold_ns or self.stalled(onset_ns, handled_ns)
+        self.compromised_trials += compromised
+        return compromised
+
+    def attach_overlay(self, canvas: tk.Canvas) -> None:
+        """Показывает на канвасе строку со статистикой задержек"""
+        if self._overlay is None:
+            item = canvas.create_text(
+                10, get_layout(canvas).height - 10, anchor="sw", text="",
+                font=("Courier", 10), fill=current().colors.text, tags=("monitor",)
+            )
+            self._overlay = (canvas, item)
+
+    def _draw_overlay(self) -> None:
+        canvas, item = self._overlay
+        frames = get_scheduler(canvas)
+        canvas.itemconfigure(item, text=(
+            f"пульс p99 {self.heartbeat.percentile(0.99) / 1e6:.1f}мс  "
+            f"спавн p99 {self.spawn.percentile(0.99) / 1e6:.1f}мс  "
+            f"ввод p99 {self.input.percentile(0.99) / 1e6:.1f}мс  "
+            f"пропущено кадров {frames.missed_frames}  "
+            f"остановок {len(self.stalls)}  "
+            f"недостоверных попыток {self.compromised_trials}"
+        ))
+        canvas.coords(item, 10, get_layout(canvas).height - 10)
+        canvas.tag_raise(item)
+
+    def report(self, canvas: Optional[tk.Canvas] = None) -> Dict[str, object]:
+        """
+        Сводка задержек
+
+        :param canvas: Канвас, статистика кадров которого добавляется в сводку
+        """
+        data = {
+            "heartbeat": self.heartbeat.summary(),
+            "spawn": self.spawn.summary(),
+            "input": self.input.summary(),
+            "stalls": len(self.stalls),
+            "compromised_trials": self.compromised_trials,
+        }
+        if canvas is not None:
+            data["frames"] = get_scheduler(canvas).stats()
+        return data
+
+    def dump(self, canvas: Optional[tk.Canvas] = None,
+             target: str = MONITOR["report"]) -> None:
+        """
+        Выводит сводку (при выходе из приложения)
+
+        :param target: "1" - в stderr, иначе путь к JSON-файлу, "" - не выводить
+        """
+        if not target:
+            return
+        data = self.report(canvas)
+        if target != "1":
+            with open(target, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+            return
+        print("Цикл событий (мкс):", file=sys.stderr)
+        for name in ("heartbeat", "spawn", "input"):
+            stats = data[name]
+            print(
+                f"  {name}: {stats['calls']} замеров, p50 {stats['p50_us']:.1f}, "
+                f"p99 {stats['p99_us']:.1f}, макс {stats['max_us']:.1f}",
+                file=sys.stderr
+            )
+        frames = data.get("frames")
+        if frames is not None:
+            print(
+                f"  кадры: {frames['ticks']} тиков, сверх бюджета {frames['over_budget']}, "
+                f"пропущено {frames['missed_frames']}, макс {frames['max_tick_ms']:.1f}мс",
+                file=sys.stderr
+            )
+        print(f"  остановок {data['stalls']}, "
+              f"недостоверных попыток {data['compromised_trials']}", file=sys.stderr)
+
+
+def overlay_enabled() -> bool:
+    """Нужно ли показывать строку монитора (REACTION_OVERLAY имеет приоритет)"""
+    value = os.environ.get("REACTION_OVERLAY")
+    if value is not None:
+        return value not in ("", "0")
+    return MONITOR["overlay"]
@@ -0,0 +1,196 @@
+"""
+Модуль со встроенным профилированием горячих путей
+
+Профилирование включается переменной окружения REACTION_PROFILE (или
+флагом --profile при запуске run.py). Значение "1" выводит отчет в stderr
+при выходе, любое другое значение - путь к JSON-файлу отчета.
+
+Если профилирование выключено, profiled возвращает функцию без обертки,
+а profile_block - общий пустой контекст, поэтому в рабочей сборке
+накладные расходы практически нулевые.
+"""
+import atexit
+import contextlib
+import functools
+import json
+import os
+import sys
+import time
+from typing import Callable, ContextManager, Dict, Optional, TypeVar
+
+ENV_VAR = "REACTION_PROFILE"
+
+# Решение принимается один раз при импорте: обертки создаются при
+# определении классов, поэтому переключить его позже нельзя
+ENABLED = bool(os.environ.get(ENV_VAR))
+
+F = TypeVar("F", bound=Callable)
+
+
+def _bucket(ns: int) -> int:
+    """Корзина длительности: 4 корзины на каждую степень двойки"""
+    if ns < 8:
+        return ns
+    bits = ns.bit_length()
+    return bits * 4 + ((ns >> (bits - 3)) & 3)
+
+
+def _bucket_limit(index: int) -> int:
+    """Верхняя граница корзины (нс)"""
+    if index < 8:
+        return index
+    bits, sub = divmod(index, 4)
+    return (4 + sub + 1) << (bits - 3)
+
+
+class Histogram:
+    """
+    Гистограмма длительностей с логарифмическими корзинами
+
+    На каждую степень двойки приходится 4 корзины (погрешность до 25%),
+    поэтому запись - это несколько целочисленных операций без сортировок
+    и списков замеров.
+    """
+
+    __slots__ = ("buckets", "count", "total_ns", "min_ns", "max_ns")
+
+    def __init__(self):
+        self.buckets = [0] * 256
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = 0
+        self.max_ns = 0
+
+    def add(self, ns: int) -> None:
+        """Учитывает одну длительность"""
+        self.buckets[min(255, _bucket(ns))] += 1
+        if not self.count or ns < self.min_ns:
+            self.min_ns = ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+        self.count += 1
+        self.total_ns += ns
+
+    def percentile(self, q: float) -> float:
+        """Верхняя граница корзины, в которую попадает перцентиль q (нс)"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank and count:
+                return float(min(_bucket_limit(index), self.max_ns))
+        return float(self.max_ns)
+
+    def summary(self) -> Dict[str, float]:
+        """Сводка в микросекундах"""
+        count = self.count or 1
+        return {
+            "calls": self.count,
+            "total_ms": self.total_ns / 1e6,
+            "mean_us": self.total_ns / count / 1000,
+            "min_us": self.min_ns / 1000,
+            "p50_us": self.percentile(0.50) / 1000,
+            "p90_us": self.percentile(0.90) / 1000,
+            "p99_us": self.percentile(0.99) / 1000,
+            "max_us": self.max_ns / 1000,
+        }
+
+
+# Гистограммы по именам точек замера
+_histograms: Dict[str, Histogram] = {}
+
+
+def histogram(name: str) -> Histogram:
+    """Возвращает гистограмму точки замера, создавая ее при необходимости"""
+    hist = _histograms.get(name)
+    if hist is None:
+        hist = _histograms[name] = Histogram()
+    return hist
+
+
+def profiled(name: str) -> Callable[[F], F]:
+    """
+    Декоратор замера длительности вызовов
+
+    :param name: Имя точки замера в отчете
+    """
+    if not ENABLED:
+        return lambda func: func
+
+    def decorator(func: F) -> F:
+        hist = histogram(name)
+        clock = time.perf_counter_ns
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                hist.add(clock() - started)
+        return wrapper
+    return decorator
+
+
+class _Block:
+    """Контекст замера участка кода"""
+
+    __slots__ = ("hist", "started")
+
+    def __init__(self, hist: Histogram):
+        self.hist = hist
+        self.started = 0
+
+    def __enter__(self) -> None:
+        self.started = time.perf_counter_ns()
+
+    def __exit__(self, *exc) -> None:
+        self.hist.add(time.perf_counter_ns() - self.started)
+
+
+_NULL_BLOCK = contextlib.nullcontext()
+
+
+def profile_block(name: str) -> ContextManager:
+    """
+    Контекст замера участка кода
+
+    :param name: Имя точки замера в отчете
+    """
+    if not ENABLED:
+        return _NULL_BLOCK
+    return _Block(histogram(name))
+
+
+def report() -> Dict[str, Dict[str, float]]:
+    """Сводка по всем точкам замера, начиная с самых затратных"""
+    items = sorted(_histograms.items(), key=lambda item: -item[1].total_ns)
+    return {name: hist.summary() for name, hist in items if hist.count}
+
+
+def dump(target: Optional[str] = None) -> None:
+    """
+    Выводит отчет
+
+    :param target: "1" - в stderr, иначе путь к JSON-файлу
+    """
+    target = target or os.environ.get(ENV_VAR) or "1"
+    data = report()
+    if target == "1":
+        print("Профиль (мкс):", file=sys.stderr)
+        for name, stats in data.items():
+            print(
+                f"  {name}: {stats['calls']} вызовов, среднее {stats['mean_us']:.1f}, "
+                f"p50 {stats['p50_us']:.1f}, p99 {stats['p99_us']:.1f}, "
+                f"макс {stats['max_us']:.1f}",
+                file=sys.stderr
+            )
+    else:
+        with open(target, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+if ENABLED:
+    atexit.register(dump)
@@ -0,0 +1,139 @@
+"""
+Модуль с реестром ресурсов компонентов
+
+Компонент регистрирует свои элементы канваса, отложенные вызовы
+и анимации в собственном реестре. Сработавшие вызовы и завершенные
+анимации удаляются из реестра сами, поэтому за многочасовую сессию
+реестр не растет, а close освобождает все, что осталось.
+"""
+import tkinter as tk
+import weakref
+from typing import Callable, Dict, List, Optional, Set
+from src.utils.scheduler import AnimationHandle
+
+# Минимальный размер списка анимаций, после которого он чистится
+PRUNE_MIN = 32
+
+
+class ResourceRegistry:
+    """Элементы канваса, отложенные вызовы и анимации одного компонента"""
+
+    def __init__(self, widget: tk.Misc, name: str):
+        """
+        :param widget: Виджет (канвас), которому принадлежат ресурсы
+        :param name: Имя компонента в отчете
+        """
+        self.widget = widget
+        self.name = name
+        self.items: Set[int] = set()
+        self.afters: Set[str] = set()
+        self.animations: List[AnimationHandle] = []
+        self._prune_at = PRUNE_MIN
+        _registries.add(self)
+
+    def own(self, item: int) -> int:
+        """Регистрирует элемент канваса"""
+        self.items.add(item)
+        return item
+
+    def delete(self, item: int) -> None:
+        """Удаляет элемент с канваса"""
+        if item in self.items:
+            self.items.discard(item)
+            self.widget.delete(item)
+
+    def after(self, delay: int, func: Callable, *args) -> str:
+        """Планирует вызов; после срабатывания он уходит из реестра"""
+        after_id = ""
+
+        def fire() -> None:
+            self.afters.discard(after_id)
+            func(*args)
+
+        after_id = self.widget.after(delay, fire)
+        self.afters.add(after_id)
+        return after_id
+
+    def after_idle(self, func: Callable, *args) -> str:
+        """Планирует вызов на ближайший простой цикла событий"""
+        after_id = ""
+
+        def fire() -> None:
+            self.afters.discard(after_id)
+            func(*args)
+
+        after_id = self.widget.after_idle(fire)
+        self.afters.add(after_id)
+        return after_id
+
+    def after_cancel(self, after_id: Optional[str]) -> None:
+        """Отменяет запланированный вызов, если он еще не сработал"""
+        if after_id in self.afters:
+            self.afters.discard(after_id)
+            self.widget.after_cancel(after_id)
+
+    def track(self, handle: Optional[AnimationHandle]) -> Optional[AnimationHandle]:
+        """Регистрирует анимацию (None пропускается)"""
+        if handle is not None and handle.active:
+            self.animations.append(handle)
+            if len(self.animations) >= self._prune_at:
+                self.prune()
+        return handle
+
+    def prune(self) -> int:
+        """
+        Убирает завершенные и отмененные анимации
+
+        Порог следующей чистки - удвоенное число живых анимаций, так что
+        чистка в среднем стоит O(1) на добавление.
+
+        :return: Сколько записей убрано
+        """
+        before = len(self.animations)
+        self.animations = [handle for handle in self.animations if handle.active]
+        self._prune_at = max(PRUNE_MIN, 2 * len(self.animations))
+        return before - len(self.animations)
+
+    def cancel_animations(self) -> None:
+        """Отменяет все анимации компонента"""
+        animations, self.animations = self.animations, []
+        for handle in animations:
+            handle.cancel()
+        self._prune_at = PRUNE_MIN
+
+    def cancel_all(self) -> None:
+        """Отменяет отложенные вызовы и анимации; элементы остаются"""
+        afters, self.afters = self.afters, set()
+        for after_id in afters:
+            self.widget.after_cancel(after_id)
+        self.cancel_animations()
+
+    def close(self) -> None:
+        """Освобождает все ресурсы компонента"""
+        self.cancel_all()
+        items, self.items = self.items, set()
+        if items:
+            self.widget.delete(*items)
+
+    def counts(self) -> Dict[str, int]:
+        """Число живых ресурсов по видам"""
+        self.prune()
+        return {
+            "items": len(self.items),
+            "afters": len(self.afters),
+            "animations": len(self.animations),
+        }
+
+
+_registries: "weakref.WeakSet[ResourceRegistry]" = weakref.WeakSet()
+
+
+def live_counts() -> Dict[str, Dict[str, int]]:
+    """Живые ресурсы всех реестров по именам компонентов"""
+    report: Dict[str, Dict[str, int]] = {}
+    for registry in list(_registries):
+        counts = registry.counts()
+        total = report.setdefault(registry.name, dict.fromkeys(counts, 0))
+        for kind, count in counts.items():
+            total[kind] += count
+    return report
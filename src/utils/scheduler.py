@@ -0,0 +1,160 @@
+"""
+Модуль с планировщиком кадров анимаций
+"""
+import time
+import tkinter as tk
+import weakref
+from typing import Callable, Dict, List, Optional
+from src.utils.config import current
+
+
+class AnimationHandle:
+    """Дескриптор запущенной анимации, который можно отменить"""
+
+    __slots__ = ("step", "frame", "active", "on_cancel")
+
+    def __init__(self, step: Callable[[int], bool],
+                 on_cancel: Optional[Callable] = None):
+        self.step = step
+        self.frame = 0
+        self.active = True
+        self.on_cancel = on_cancel
+
+    def cancel(self) -> None:
+        """Останавливает анимацию, если она еще идет"""
+        if self.active:
+            self.active = False
+            if self.on_cancel:
+                self.on_cancel()
+
+    @property
+    def done(self) -> bool:
+        return not self.active
+
+
+class FrameScheduler:
+    """
+    Общий таймер кадров для всех анимаций виджета
+
+    Все активные анимации продвигаются одним обратным вызовом after
+    с фиксированным шагом, поэтому N эффектов стоят один таймер на кадр.
+    """
+
+    def __init__(self, widget: tk.Misc, interval: Optional[int] = None):
+        """
+        :param widget: Виджет, через который планируются кадры
+        :param interval: Длительность кадра в мс (по умолчанию - из конфигурации)
+        """
+        self.widget = widget
+        self.interval = interval or current().animation.speed
+        self.animations: List[AnimationHandle] = []
+        self._after_id: Optional[str] = None
+        self._next_tick_ns = 0
+        self._in_tick = False
+
+        # Статистика по бюджету кадра
+        self.ticks = 0
+        self.over_budget = 0
+        self.last_tick_ns = 0
+        self.max_tick_ns = 0
+        self.missed_frames = 0
+
+    def add(self, step: Callable[[int], bool],
+            on_cancel: Optional[Callable] = None) -> AnimationHandle:
+        """
+        Запускает анимацию
+
+        Нулевой кадр выполняется сразу, следующие - на тиках планировщика.
+
+        :param step: Функция шага, принимает номер кадра и возвращает
+                     True, пока анимация должна продолжаться
+        :param on_cancel: Вызывается при отмене анимации
+        :return: Дескриптор анимации
+        """
+        handle = AnimationHandle(step, on_cancel)
+        if not step(0):
+            handle.active = False
+            return handle
+
+        handle.frame = 1
+        self.animations.append(handle)
+        if self._after_id is None and not self._in_tick:
+            self._next_tick_ns = time.perf_counter_ns() + self.interval * 1_000_000
+            self._after_id = self.widget.after(self.interval, self._tick)
+        return handle
+
+    def cancel_all(self) -> None:
+        """Отменяет все анимации и останавливает таймер"""
+        animations, self.animations = self.animations, []
+        for handle in animations:
+            handle.cancel()
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _tick(self) -> None:
+        """Продвигает все активные анимации на один кадр"""
+        self._after_id = None
+        started = time.perf_counter_ns()
+        # Кадры, которые должны были пройти за время опоздания тика
+        self.missed_frames += max(0, started - self._next_tick_ns) // (
+            self.interval * 1_000_000)
+
+        # Анимации, запущенные во время тика, попадут в новый список
+        current, self.animations = self.animations, []
+        alive = []
+        self._in_tick = True
+        try:
+            for handle in current:
+                if not handle.active:
+                    continue
+                if handle.step(handle.frame):
+                    handle.frame += 1
+                    alive.append(handle)
+                else:
+                    handle.active = False
+        finally:
+            self._in_tick = False
+        self.animations = alive + self.animations
+
+        finished = time.perf_counter_ns()
+        self.ticks += 1
+        self.last_tick_ns = finished - started
+        self.max_tick_ns = max(self.max_tick_ns, self.last_tick_ns)
+        if self.last_tick_ns > self.interval * 1_000_000:
+            self.over_budget += 1
+
+        if self.animations:
+            # Фиксированный шаг: следующий тик считаем от планового времени
+            self._next_tick_ns += self.interval * 1_000_000
+            delay = max(0, (self._next_tick_ns - finished) // 1_000_000)
+            if delay == 0:
+                self._next_tick_ns = finished
+            self._after_id = self.widget.after(delay, self._tick)
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Возвращает статистику бюджета кадра
+
+        :return: Словарь с числом тиков, превышений и длительностями в мс
+        """
+        return {
+            'ticks': self.ticks,
+            'over_budget': self.over_budget,
+            'last_tick_ms': self.last_tick_ns / 1e6,
+            'max_tick_ms': self.max_tick_ns / 1e6,
+            'missed_frames': self.missed_frames,
+            'active': len(self.animations)
+        }
+
+
+_schedulers: "weakref.WeakKeyDictionary[tk.Misc, FrameScheduler]" = weakref.WeakKeyDictionary()
+
+
+def get_scheduler(widget: tk.Misc) -> FrameScheduler:
+    """Возвращает планировщик кадров виджета, создавая его при необходимости"""
+    scheduler = _schedulers.get(widget)
+    if scheduler is None:
+        scheduler = FrameScheduler(widget)
+        _schedulers[widget] = scheduler
+    return scheduler
@@ -20,6 +20,21 @@ GAME = {
     "points": {
         "min": 10,
         "max": 100
+    },
+    # Доля стимулов со звуком в режиме "sound"
+    "sound_chance": 0.4,
+    # Режим "rush": много одновременных целей
+    "rush": {
+        # Время жизни цели (мс)
+        "lifetime": {
+            "easy": 3000,
+            "medium": 2000,
+            "hard": 1200
+        },
+        # Интервал между партиями (мс) и размер партии
+        "spawn_interval": 250,
+        "batch": 4,
+        "max_targets": 60
     }
 }
 
@@ -28,7 +43,130 @@ ANIMATION = {
     "speed": 30,
     "steps": 10,
     "flash_radius": 50,
-    "flash_rings": 3
+    "flash_rings": 3,
+    # Сколько отрендеренных градиентов держать в кэше
+    "gradient_cache_size": 4
+}
+
+# Сохранение настроек и рекордов
+STORAGE = {
+    # База SQLite с профилями, историей игр и рекордами
+    "db_path": "scores.db",
+    # Старый JSON-файл: переносится в базу один раз
+    "settings_path": "best_score.json",
+    # Профиль по умолчанию (переменная окружения REACTION_USER имеет приоритет)
+    "default_profile": "player",
+    # Задержка перед записью на диск (мс): частые сохранения объединяются
+    "debounce": 500
+}
+
+# Звук
+AUDIO = {
+    # "auto", "winsound", "aplay", "file" или "null"
+    "backend": "auto",
+    "sample_rate": 44100,
+    # Сигнал режима "sound"
+    "frequency": 880,
+    "duration": 150,
+    "volume": 0.5,
+    # Буфер aplay (мс): столько звука уходит в устройство до начала вывода
+    "buffer_time": 20,
+    # Дополнительная задержка вывода устройства (мс), если она измерена
+    "output_latency": 0,
+    # Каталог для бэкенда "file"
+    "output_dir": "audio_out"
+}
+
+# Журнал попыток
+TRIAL_LOG = {
+    "path": "trials.bin",
+    # Сколько попыток копить в памяти перед записью на диск
+    "batch_size": 256
+}
+
+# Пользовательская конфигурация поверх значений по умолчанию
+CONFIG = {
+    # JSON-файл с переопределениями (переменная REACTION_CONFIG имеет приоритет)
+    "path": "config.json",
+    # Префикс переменных окружения: REACTION__GAME__SHAPE_SIZE=60
+    "env_prefix": "REACTION__"
+}
+
+# Экспорт журнала попыток
+EXPORT = {
+    # Сколько попыток читать и записывать за один шаг
+    "chunk_size": 65536,
+    # Размер буфера выходного файла (байт)
+    "buffer_size": 1 << 20
+}
+
+# Монитор задержек цикла событий
+MONITOR = {
+    # Период пульса (мс)
+    "heartbeat": 50,
+    # Опоздание (мс), начиная с которого цикл считается вставшим,
+    # а попытка - недостоверной
+    "stall_threshold": 20,
+    # Сколько последних остановок помнить
+    "stall_history": 256,
+    # Строка статистики на игровом поле и частота ее обновления (в пульсах)
+    "overlay": False,
+    "overlay_every": 10,
+    # Сводка при выходе: "1" - в stderr, иначе путь к JSON-файлу, "" - не выводить
+    "report": "1"
+}
+
+# Запись игровых сессий
+RECORDING = {
+    "enabled": True,
+    # Каталог файлов записи (один файл на запуск приложения)
+    "directory": "sessions",
+    # Сколько событий копить в памяти перед записью на диск
+    "batch_size": 512
+}
+
+# Расписание стимулов
+SCHEDULE = {
+    # Зерно расписания (None - новое случайное в каждой игре)
+    "seed": None,
+    # Сколько стимулов строить за один пакет
+    "block_size": 256,
+    # Разброс интервала между стимулами (доля от spawn_delay)
+    "interval_jitter": 0.15,
+    # Размер области счета в правом верхнем углу (ширина, высота)
+    "hud_size": (260, 60),
+    # Отступ вокруг исключенных областей
+    "exclusion_margin": 10
+}
+
+# Адаптивная сложность
+ADAPTIVE = {
+    "enabled": True,
+    # Вес нового времени реакции в экспоненциальном среднем
+    "ewma_alpha": 0.2,
+    # Интервал стремится к средней реакции, умноженной на этот запас
+    "delay_factor": 2.5,
+    # Наибольшее относительное изменение интервала за одно событие
+    "delay_step": 0.05,
+    # Границы интервала относительно исходного значения уровня
+    "min_ratio": 0.6,
+    "max_ratio": 1.5
+}
+
+# Калибровка очков (calibrate.py)
+CALIBRATION = {
+    # Сколько попыток моделировать на уровень и сколько за один блок
+    "draws": 1_000_000,
+    "chunk_size": 1 << 20,
+    "seed": 0,
+    # Время клика игроков разного уровня, мс: экс-гауссово распределение
+    # (нормальная часть mu/sigma плюс экспоненциальный хвост tau);
+    # в отличие от простой реакции сюда входит и движение мышью
+    "skills": {
+        "novice": {"mu": 650, "sigma": 110, "tau": 250},
+        "average": {"mu": 520, "sigma": 80, "tau": 170},
+        "expert": {"mu": 420, "sigma": 55, "tau": 100}
+    }
 }
 
 # Настройки прогрессии
@@ -43,11 +181,12 @@ PROGRESSION = {
     "mode_thresholds": {
         "color": 0,       # Доступен сразу
         "shape": 7000,    # После 7000 очков
-        "sound": 15000    # После 15000 очков
+        "sound": 15000,   # После 15000 очков
+        "rush": 25000     # После 25000 очков
     },
     
     # Порядок режимов и сложности
-    "mode_order": ["color", "shape", "sound"],
+    "mode_order": ["color", "shape", "sound", "rush"],
     "difficulty_order": ["easy", "medium", "hard"],
     
     # Шанс смены режима (0-1)
@@ -59,7 +198,8 @@ LOCALIZATION = {
     "modes": {
         "color": "Цвета",
         "shape": "Фигуры",
-        "sound": "Звуки"
+        "sound": "Звуки",
+        "rush": "Натиск"
     },
     "difficulties": {
         "easy": "Легкий",
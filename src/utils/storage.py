@@ -0,0 +1,331 @@
+"""
+Модуль сохранения настроек и рекордов
+
+Данные хранятся в локальной базе SQLite (режим WAL): профили игроков,
+история игр и таблица лучших результатов по профилю, режиму и
+сложности. Чтение идет напрямую по индексам, а запись откладывается
+и выполняется пакетами в фоновом потоке.
+"""
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from src.utils.settings import STORAGE
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS profiles (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    created_at INTEGER NOT NULL,
+    game_mode TEXT NOT NULL DEFAULT 'color',
+    difficulty TEXT NOT NULL DEFAULT 'medium'
+);
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    profile_id INTEGER NOT NULL REFERENCES profiles(id),
+    mode TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    started_at INTEGER NOT NULL,
+    ended_at INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_profile
+    ON sessions(profile_id, mode, difficulty, started_at);
+CREATE INDEX IF NOT EXISTS idx_sessions_mode
+    ON sessions(mode, difficulty, started_at);
+CREATE INDEX IF NOT EXISTS idx_sessions_date
+    ON sessions(started_at);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_sessions_game
+    ON sessions(profile_id, started_at);
+CREATE TABLE IF NOT EXISTS bests (
+    profile_id INTEGER NOT NULL REFERENCES profiles(id),
+    mode TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    best_score INTEGER NOT NULL,
+    achieved_at INTEGER NOT NULL,
+    PRIMARY KEY (profile_id, mode, difficulty)
+);
+CREATE INDEX IF NOT EXISTS idx_bests_leaderboard
+    ON bests(mode, difficulty, best_score DESC);
+"""
+
+# Одна запись на игру: продолженная игра обновляет свою запись
+_UPSERT_SESSION = """
+INSERT INTO sessions (profile_id, mode, difficulty, score, started_at, ended_at)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (profile_id, started_at) DO UPDATE SET
+    mode = excluded.mode,
+    difficulty = excluded.difficulty,
+    score = excluded.score,
+    ended_at = excluded.ended_at
+"""
+
+# Обновление лучшего результата только если новый результат выше
+_UPSERT_BEST = """
+INSERT INTO bests (profile_id, mode, difficulty, best_score, achieved_at)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (profile_id, mode, difficulty) DO UPDATE SET
+    best_score = excluded.best_score,
+    achieved_at = excluded.achieved_at
+WHERE excluded.best_score > bests.best_score
+"""
+
+
+def connect(path: str) -> sqlite3.Connection:
+    """Открывает базу с настройками, общими для всех соединений"""
+    db = sqlite3.connect(path, timeout=5)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    db.execute("PRAGMA foreign_keys=ON")
+    return db
+
+
+def default_profile() -> str:
+    """Имя профиля по умолчанию (переменная окружения REACTION_USER имеет приоритет)"""
+    return os.environ.get("REACTION_USER") or STORAGE["default_profile"]
+
+
+class ScoreStore:
+    """
+    Хранилище профилей и рекордов в SQLite
+
+    Операции записи копятся на время debounce и выполняются фоновым
+    потоком одной транзакцией, поэтому игровой поток не ждет диска.
+    """
+
+    def __init__(self, path: str = STORAGE["db_path"],
+                 profile: Optional[str] = None,
+                 json_path: Optional[str] = STORAGE["settings_path"],
+                 debounce: int = STORAGE["debounce"]):
+        """
+        :param path: Путь к файлу базы
+        :param profile: Имя профиля (по умолчанию - default_profile())
+        :param json_path: Старый JSON-файл настроек для однократного переноса
+        :param debounce: Задержка перед записью в мс
+        """
+        self.path = path
+        self.debounce = debounce / 1000
+        self._db = connect(path)
+        with self._db:
+            self._db.executescript(SCHEMA)
+        self.profile = profile or default_profile()
+        self.profile_id = self._ensure_profile(self.profile)
+        if json_path:
+            self._migrate_json(json_path)
+
+        self._cond = threading.Condition()
+        self._pending: List[Tuple[str, tuple]] = []
+        self._due = 0.0
+        self._writing = False
+        self._flush_requested = False
+        self._closing = False
+        self._thread: Optional[threading.Thread] = None
+
+    def _ensure_profile(self, name: str) -> int:
+        """Возвращает ID профиля, создавая его при необходимости"""
+        with self._db:
+            self._db.execute(
+                "INSERT OR IGNORE INTO profiles (name, created_at) VALUES (?, ?)",
+                (name, time.time_ns())
+            )
+        row = self._db.execute("SELECT id FROM profiles WHERE name = ?", (name,)).fetchone()
+        return row[0]
+
+    def _migrate_json(self, json_path: str) -> None:
+        """Однократно переносит рекорд и настройки из JSON-файла"""
+        done = self._db.execute(
+            "SELECT 1 FROM meta WHERE key = 'json_migrated'"
+        ).fetchone()
+        if done:
+            return
+        try:
+            with open(json_path, 'r') as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            data = {}
+
+        with self._db:
+            if isinstance(data, dict) and data:
+                mode = data.get('game_mode', "color")
+                difficulty = data.get('difficulty', "medium")
+                self._db.execute(
+                    "UPDATE profiles SET game_mode = ?, difficulty = ? WHERE id = ?",
+                    (mode, difficulty, self.profile_id)
+                )
+                # Старый рекорд был общим - относим его к последнему режиму
+                best_score = int(data.get('best_score', 0))
+                if best_score > 0:
+                    self._db.execute(
+                        _UPSERT_BEST,
+                        (self.profile_id, mode, difficulty, best_score, time.time_ns())
+                    )
+            self._db.execute(
+                "INSERT OR IGNORE INTO meta (key, value) VALUES ('json_migrated', ?)",
+                (json_path,)
+            )
+
+    def use_profile(self, name: str) -> None:
+        """Переключает активный профиль"""
+        self.flush()
+        self.profile = name
+        self.profile_id = self._ensure_profile(name)
+
+    def load(self) -> Dict[str, Any]:
+        """
+        Загружает настройки и рекорд активного профиля
+
+        :return: Словарь с best_score, game_mode и difficulty
+        """
+        game_mode, difficulty = self._db.execute(
+            "SELECT game_mode, difficulty FROM profiles WHERE id = ?",
+            (self.profile_id,)
+        ).fetchone()
+        return {
+            'best_score': self.best_score(),
+            'game_mode': game_mode,
+            'difficulty': difficulty
+        }
+
+    def best_score(self, mode: Optional[str] = None,
+                   difficulty: Optional[str] = None) -> int:
+        """Лучший результат активного профиля (во всех режимах или в заданном)"""
+        if mode is None:
+            row = self._db.execute(
+                "SELECT MAX(best_score) FROM bests WHERE profile_id = ?",
+                (self.profile_id,)
+            ).fetchone()
+        else:
+            row = self._db.execute(
+                "SELECT best_score FROM bests "
+                "WHERE profile_id = ? AND mode = ? AND difficulty = ?",
+                (self.profile_id, mode, difficulty)
+            ).fetchone()
+        return (row[0] or 0) if row else 0
+
+    def save(self, data: Dict[str, Any]) -> None:
+        """Планирует сохранение режима и сложности активного профиля"""
+        self._enqueue(
+            "UPDATE profiles SET game_mode = ?, difficulty = ? WHERE id = ?",
+            (data['game_mode'], data['difficulty'], self.profile_id)
+        )
+
+    def record_session(self, mode: str, difficulty: str, score: int,
+                       started_at: int, ended_at: Optional[int] = None) -> None:
+        """
+        Планирует запись игры и обновление рекорда
+
+        Повторный вызов с тем же started_at (игру продолжили из меню)
+        обновляет ту же запись истории.
+
+        :param started_at: Начало игры (time_ns)
+        :param ended_at: Конец игры (по умолчанию - сейчас)
+        """
+        ended_at = time.time_ns() if ended_at is None else ended_at
+        self._enqueue(
+            _UPSERT_SESSION,
+            (self.profile_id, mode, difficulty, score, started_at, ended_at)
+        )
+        self._enqueue(_UPSERT_BEST, (self.profile_id, mode, difficulty, score, ended_at))
+
+    def leaderboard(self, mode: str, difficulty: str,
+                    limit: int = 10) -> List[Tuple[str, int]]:
+        """Лучшие профили в режиме и сложности: [(имя, результат)]"""
+        self.flush()
+        return self._db.execute(
+            "SELECT p.name, b.best_score FROM bests b "
+            "JOIN profiles p ON p.id = b.profile_id "
+            "WHERE b.mode = ? AND b.difficulty = ? "
+            "ORDER BY b.best_score DESC LIMIT ?",
+            (mode, difficulty, limit)
+        ).fetchall()
+
+    def profile_bests(self) -> Dict[Tuple[str, str], int]:
+        """Рекорды активного профиля по режимам и сложностям"""
+        self.flush()
+        return {
+            (mode, difficulty): score
+            for mode, difficulty, score in self._db.execute(
+                "SELECT mode, difficulty, best_score FROM bests WHERE profile_id = ?",
+                (self.profile_id,)
+            )
+        }
+
+    def profiles(self) -> List[str]:
+        """Имена всех профилей"""
+        return [name for name, in self._db.execute("SELECT name FROM profiles ORDER BY name")]
+
+    def _enqueue(self, sql: str, params: tuple) -> None:
+        """Добавляет операцию в пакет фоновой записи"""
+        with self._cond:
+            self._pending.append((sql, params))
+            self._due = time.monotonic() + self.debounce
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="score-store", daemon=True
+                )
+                self._thread.start()
+            self._cond.notify_all()
+
+    def flush(self) -> None:
+        """Немедленно записывает отложенные операции и ждет завершения"""
+        with self._cond:
+            if self._thread is None:
+                return
+            self._flush_requested = True
+            self._cond.notify_all()
+            while self._pending or self._writing:
+                self._cond.wait()
+            self._flush_requested = False
+
+    def close(self) -> None:
+        """Записывает отложенные операции и закрывает базу"""
+        self.flush()
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join()
+        self._closing = False
+        self._db.close()
+
+    def _run(self) -> None:
+        """Цикл фонового потока записи (у потока свое соединение)"""
+        db = connect(self.path)
+        try:
+            while True:
+                with self._cond:
+                    while True:
+                        if self._pending and (
+                                self._flush_requested or self._closing
+                                or time.monotonic() >= self._due):
+                            break
+                        if self._closing:
+                            return
+                        timeout = None
+                        if self._pending:
+                            timeout = self._due - time.monotonic()
+                        self._cond.wait(timeout)
+                    batch, self._pending = self._pending, []
+                    self._writing = True
+
+                try:
+                    # Весь пакет - одна транзакция
+                    with db:
+                        for sql, params in batch:
+                            db.execute(sql, params)
+                except sqlite3.Error as e:
+                    print(f"Не удалось сохранить результаты: {e}", file=sys.stderr)
+                finally:
+                    with self._cond:
+                        self._writing = False
+                        self._cond.notify_all()
+        finally:
+            db.close()
@@ -0,0 +1,178 @@
+"""
+Модуль измерения времени реакции
+"""
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, Optional
+
+# Период переполнения event.time (32-битный счетчик миллисекунд)
+_EVENT_TIME_WRAP_MS = 1 << 32
+# Если событие оказалось старше этого порога, смещение часов считается устаревшим
+_STALE_OFFSET_NS = 1_000_000_000
+
+
+@dataclass
+class TrialTiming:
+    """Сырые временные отметки одной попытки (perf_counter, нс)"""
+    scheduled_ns: int
+    fired_ns: int
+    onset_ns: int
+    click_ns: int
+    handled_ns: int
+    # Фактическое начало звукового сигнала, если стимул звуковой
+    audio_onset_ns: Optional[int] = None
+
+    @property
+    def scheduling_lag_ns(self) -> int:
+        """Опоздание срабатывания таймера спавна относительно плана"""
+        return max(0, self.fired_ns - self.scheduled_ns)
+
+    @property
+    def render_ns(self) -> int:
+        """Время от срабатывания таймера до первого видимого кадра"""
+        return self.onset_ns - self.fired_ns
+
+    @property
+    def reaction_ns(self) -> int:
+        """Время от появления стимула (или начала звука) до клика"""
+        if self.audio_onset_ns is not None:
+            return max(0, self.click_ns - self.audio_onset_ns)
+        return self.click_ns - self.onset_ns
+
+    @property
+    def handler_latency_ns(self) -> int:
+        """Задержка доставки клика до обработчика"""
+        return self.handled_ns - self.click_ns
+
+
+class EventClock:
+    """
+    Переводит метки event.time Tk в шкалу perf_counter_ns
+
+    event.time идет по часам оконной системы (мс), поэтому смещение
+    оценивается как минимум из (момент обработки - event.time):
+    наименее задержанное событие дает самую точную оценку.
+    """
+
+    def __init__(self) -> None:
+        self._offset_ns: Optional[int] = None
+
+    def to_perf_ns(self, event_time_ms: int, now_ns: int) -> int:
+        """
+        Возвращает момент события в шкале perf_counter_ns
+
+        :param event_time_ms: Значение event.time
+        :param now_ns: Момент входа в обработчик
+        """
+        if not event_time_ms:
+            # Синтетические события не имеют метки времени
+            return now_ns
+
+        event_ns = (event_time_ms % _EVENT_TIME_WRAP_MS) * 1_000_000
+        offset = now_ns - event_ns
+        if (self._offset_ns is None or offset < self._offset_ns
+                or event_ns + self._offset_ns < now_ns - _STALE_OFFSET_NS):
+            self._offset_ns = offset
+        return min(event_ns + self._offset_ns, now_ns)
+
+
+class ReactionTimer:
+    """Собирает временные отметки попыток на монотонных часах"""
+
+    def __init__(self, clock: Callable[[], int] = time.perf_counter_ns):
+        """
+        :param clock: Источник времени в наносекундах
+        """
+        self.clock = clock
+        self.event_clock = EventClock()
+        self.last_trial: Optional[TrialTiming] = None
+        self._scheduled_ns: Optional[int] = None
+        self._trial_scheduled_ns = 0
+        self._fired_ns = 0
+        self._onset_ns: Optional[int] = None
+
+    def schedule(self, delay_ms: int) -> None:
+        """Запоминает плановый момент следующего спавна"""
+        self._scheduled_ns = self.clock() + delay_ms * 1_000_000
+
+    def fired(self) -> None:
+        """Отмечает срабатывание таймера спавна"""
+        self._fired_ns = self.clock()
+        if self._scheduled_ns is None:
+            self._trial_scheduled_ns = self._fired_ns
+        else:
+            self._trial_scheduled_ns = self._scheduled_ns
+        self._scheduled_ns = None
+        self._onset_ns = None
+
+    def stimulus_shown(self) -> None:
+        """
+        Отмечает появление стимула
+
+        Вызывается после того, как первый видимый кадр отправлен на экран.
+        """
+        self._onset_ns = self.clock()
+
+    def click(self, event_time_ms: int,
+              handled_ns: Optional[int] = None,
+              audio_onset_ns: Optional[int] = None) -> Optional[TrialTiming]:
+        """
+        Фиксирует клик по текущему стимулу
+
+        :param event_time_ms: Значение event.time
+        :param handled_ns: Момент входа в обработчик (по умолчанию - сейчас)
+        :param audio_onset_ns: Начало звукового сигнала, если он был
+        :return: Временные отметки попытки или None, если стимула нет
+        """
+        if handled_ns is None:
+            handled_ns = self.clock()
+        click_ns = self.event_clock.to_perf_ns(event_time_ms, handled_ns)
+        if self._onset_ns is None:
+            return None
+
+        self.last_trial = TrialTiming(
+            scheduled_ns=self._trial_scheduled_ns,
+            fired_ns=self._fired_ns,
+            onset_ns=self._onset_ns,
+            click_ns=max(click_ns, self._onset_ns),
+            handled_ns=handled_ns,
+            audio_onset_ns=audio_onset_ns
+        )
+        self._onset_ns = None
+        return self.last_trial
+
+
+class StartupProfiler:
+    """Замеряет фазы запуска приложения до появления интерактивного меню"""
+
+    def __init__(self, clock: Callable[[], int] = time.perf_counter_ns):
+        self.clock = clock
+        self.started_ns = clock()
+        self.phases: Dict[str, int] = {}
+        self.interactive_ns: Optional[int] = None
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Замеряет длительность фазы запуска"""
+        started = self.clock()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0) + self.clock() - started
+
+    def mark_interactive(self) -> None:
+        """Отмечает момент, когда меню готово к вводу"""
+        if self.interactive_ns is None:
+            self.interactive_ns = self.clock() - self.started_ns
+
+    def report(self) -> Dict[str, float]:
+        """
+        Возвращает длительности фаз в мс
+
+        :return: Словарь фаз и итогового времени до интерактивного меню
+        """
+        result = {name: ns / 1e6 for name, ns in self.phases.items()}
+        if self.interactive_ns is not None:
+            result["time_to_interactive"] = self.interactive_ns / 1e6
+        return result
@@ -0,0 +1,136 @@
+"""
+Модуль с журналом попыток
+
+Каждая попытка записывается в файл фиксированной длины:
+время (нс, time_ns), режим, сложность, флаги, позиция стимула,
+время реакции (нс) и начисленные очки.
+"""
+import queue
+import struct
+import threading
+import time
+from typing import Iterator, NamedTuple, Optional
+from src.utils.settings import TRIAL_LOG
+
+# Формат записи: little-endian, без выравнивания
+RECORD = struct.Struct("<qBBBxhhqi")
+
+# Коды режимов и сложностей в записи - индексы в этих кортежах
+MODES = ("color", "shape", "sound", "rush")
+DIFFICULTIES = ("easy", "medium", "hard")
+
+# Флаги записи
+FLAG_SILENT = 1  # Клик по беззвучному стимулу в режиме звука
+FLAG_COMPROMISED = 2  # Время попытки искажено остановкой цикла событий
+
+
+class TrialRecord(NamedTuple):
+    """Одна попытка из журнала"""
+    timestamp_ns: int
+    mode: str
+    difficulty: str
+    flags: int
+    x: int
+    y: int
+    reaction_ns: int
+    points: int
+
+
+class TrialLog:
+    """
+    Буферизованный журнал попыток
+
+    Записи упаковываются в заранее выделенный буфер, а заполненные
+    пакеты дописываются в файл фоновым потоком, поэтому обработчик
+    клика не выполняет ввода-вывода.
+    """
+
+    def __init__(self, path: str = TRIAL_LOG["path"],
+                 batch_size: int = TRIAL_LOG["batch_size"]):
+        """
+        :param path: Путь к файлу журнала
+        :param batch_size: Сколько записей копить перед сбросом на диск
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self._buffer = bytearray(RECORD.size * batch_size)
+        self._count = 0
+        self._queue: "queue.SimpleQueue[Optional[bytes]]" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+
+    def append(self, mode: str, difficulty: str, x: int, y: int,
+               reaction_ns: int, points: int, flags: int = 0,
+               timestamp_ns: Optional[int] = None) -> None:
+        """Добавляет попытку в буфер"""
+        RECORD.pack_into(
+            self._buffer, self._count * RECORD.size,
+            time.time_ns() if timestamp_ns is None else timestamp_ns,
+            MODES.index(mode),
+            DIFFICULTIES.index(difficulty),
+            flags,
+            x, y,
+            reaction_ns,
+            points
+        )
+        self._count += 1
+        if self._count == self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Передает накопленные записи фоновому потоку"""
+        if not self._count:
+            return
+        self._queue.put(bytes(self._buffer[:self._count * RECORD.size]))
+        self._count = 0
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._write_batches, name="trial-log", daemon=True
+            )
+            self._thread.start()
+
+    def close(self) -> None:
+        """Сбрасывает буфер и дожидается записи на диск"""
+        self.flush()
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def _write_batches(self) -> None:
+        """Дописывает пакеты в файл (выполняется в фоновом потоке)"""
+        with open(self.path, "ab") as f:
+            while True:
+                batch = self._queue.get()
+                if batch is None:
+                    break
+                f.write(batch)
+                f.flush()
+
+
+def iter_records(path: str = TRIAL_LOG["path"],
+                 chunk_records: int = 4096) -> Iterator[TrialRecord]:
+    """
+    Потоково читает журнал попыток
+
+    :param path: Путь к файлу журнала
+    :param chunk_records: Сколько записей читать за раз
+    """
+    chunk_size = RECORD.size * chunk_records
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return
+
+    with f:
+        while True:
+            chunk = f.read(chunk_size)
+            # Неполную запись в конце (оборванная запись) пропускаем
+            usable = len(chunk) - len(chunk) % RECORD.size
+            for (timestamp_ns, mode, difficulty, flags,
+                 x, y, reaction_ns, points) in RECORD.iter_unpack(chunk[:usable]):
+                yield TrialRecord(
+                    timestamp_ns, MODES[mode], DIFFICULTIES[difficulty],
+                    flags, x, y, reaction_ns, points
+                )
+            if len(chunk) < chunk_size:
+                break
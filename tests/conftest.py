@@ -0,0 +1,22 @@
+"""
+Общие фикстуры тестов
+"""
+import os
+import sys
+import pytest
+
+# Модули игры импортируются как src.*, как и в скриптах из корня проекта
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils import config  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def default_config(monkeypatch, tmp_path):
+    """Конфигурация по умолчанию: без config.json и переменных окружения"""
+    for name in list(os.environ):
+        if name.startswith(config.CONFIG["env_prefix"]):
+            monkeypatch.delenv(name)
+    monkeypatch.setenv("REACTION_CONFIG", str(tmp_path / "config.json"))
+    monkeypatch.setattr(config, "_current", None)
+    yield
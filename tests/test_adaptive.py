@@ -0,0 +1,91 @@
+"""
+Тесты адаптивной сложности
+"""
+import random
+import statistics
+import pytest
+from src.core.adaptive import AdaptiveController, StreamingStats, base_delay
+from src.core.engine import GameEngine, ManualClock, compute_points
+from src.utils.config import current
+from src.utils.settings import ADAPTIVE
+
+
+def test_streaming_stats_match_batch_statistics():
+    values = [310.0, 420.5, 280.0, 515.25, 399.0]
+    stats = StreamingStats(alpha=0.5)
+    for value in values:
+        stats.update(value)
+
+    assert stats.count == len(values)
+    assert stats.mean == pytest.approx(statistics.mean(values))
+    assert stats.variance == pytest.approx(statistics.variance(values))
+    ewma = values[0]
+    for value in values[1:]:
+        ewma += 0.5 * (value - ewma)
+    assert stats.ewma == pytest.approx(ewma)
+
+
+def test_delay_moves_by_at_most_one_step():
+    controller = AdaptiveController("color", "easy", random.Random(0))
+    base = controller.spawn_delay
+    progress = controller.on_hit(100.0, 0)
+
+    assert progress.spawn_delay == int(base * (1 - ADAPTIVE["delay_step"]))
+
+
+def test_delay_stays_within_ratio_bounds():
+    controller = AdaptiveController("color", "easy", random.Random(0))
+    base = base_delay("color", "easy")
+    for _ in range(200):
+        controller.on_hit(50.0, 0)
+    assert controller.spawn_delay == int(base * ADAPTIVE["min_ratio"])
+
+    for _ in range(200):
+        controller.on_miss(0)
+    assert controller.spawn_delay == int(base * ADAPTIVE["max_ratio"])
+
+
+def test_difficulty_rises_at_threshold():
+    controller = AdaptiveController("color", "easy", random.Random(0))
+    threshold = current().progression.difficulty_thresholds["easy"]
+
+    assert not controller.on_hit(400.0, threshold - 1).level_changed
+    progress = controller.on_hit(400.0, threshold)
+    assert progress.level_changed
+    assert progress.difficulty == "medium"
+    assert progress.spawn_delay == base_delay(progress.mode, "medium")
+
+
+def test_modes_unlock_by_score():
+    controller = AdaptiveController("color", "easy")
+    thresholds = current().progression.mode_thresholds
+
+    assert controller.unlocked_modes(0) == ["color"]
+    assert "shape" in controller.unlocked_modes(thresholds["shape"])
+    assert controller.unlocked_modes(thresholds["rush"]) == list(
+        current().progression.mode_order
+    )
+
+
+def test_set_level_keeps_statistics():
+    controller = AdaptiveController("color", "easy")
+    controller.on_hit(400.0, 0)
+    controller.set_level("shape", "hard", 0)
+
+    assert controller.stats.count == 1
+    assert controller.spawn_delay == base_delay("shape", "hard")
+
+
+def test_points_ignore_adapted_delay():
+    clock = ManualClock()
+    engine = GameEngine(clock=clock, rng=random.Random(0))
+    engine.adaptive = AdaptiveController("color", "easy", engine.rng)
+    engine.start("color", "easy")
+    for _ in range(50):
+        engine.present(engine.choose_stimulus())
+        engine.hit(200 * 1_000_000)
+    assert engine.spawn_delay < base_delay("color", "easy")
+
+    engine.present(engine.choose_stimulus())
+    result = engine.hit(400 * 1_000_000)
+    assert result.points == compute_points(0.4, base_delay("color", "easy"))
@@ -0,0 +1,100 @@
+"""
+Тесты слоев конфигурации
+"""
+import json
+import os
+import pytest
+from src.utils import config
+from src.utils.config import ConfigError, DEFAULTS, env_overrides, load, merge
+
+
+def test_merge_overrides_nested_values():
+    merged = merge(DEFAULTS, {"game": {"spawn_delay": {"easy": 2500}, "sound_chance": 1}})
+
+    assert merged["game"]["spawn_delay"] == {"easy": 2500, "medium": 1500, "hard": 1000}
+    assert merged["game"]["sound_chance"] == 1
+    assert DEFAULTS["game"]["spawn_delay"]["easy"] == 2000
+
+
+@pytest.mark.parametrize("override, message", [
+    ({"game": {"unknown": 1}}, "game.unknown"),
+    ({"game": {"shape_size": "big"}}, "game.shape_size"),
+    ({"game": {"rush": 5}}, "game.rush"),
+    ({"progression": {"mode_change_chance": True}}, "mode_change_chance"),
+])
+def test_merge_rejects_unknown_keys_and_types(override, message):
+    with pytest.raises(ConfigError, match=message):
+        merge(DEFAULTS, override)
+
+
+def test_merge_allows_new_shape_colors():
+    merged = merge(DEFAULTS, {"colors": {"shapes": {"purple": "#800080"}}})
+    assert merged["colors"]["shapes"]["purple"] == "#800080"
+
+
+def test_env_overrides_parse_json_and_strings():
+    overrides = env_overrides({
+        "REACTION__GAME__SPAWN_DELAY__EASY": "1800",
+        "REACTION__WINDOW__TITLE": "Тест",
+        "OTHER": "1",
+    })
+    assert overrides == {"game": {"spawn_delay": {"easy": 1800}}, "window": {"title": "Тест"}}
+
+
+def test_load_layers_file_then_environment(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({"game": {"shape_size": 60, "points": {"max": 200}}}))
+    compiled = load(str(path), {"REACTION__GAME__SHAPE_SIZE": "70"})
+
+    assert compiled.game.shape_size == 70
+    assert compiled.game.points_max == 200
+    assert compiled.mtime == os.stat(path).st_mtime
+    assert compiled.colors.rgb[compiled.colors.bg] == config.parse_rgb(compiled.colors.bg)
+
+
+@pytest.mark.parametrize("data", [
+    {"game": {"points": {"min": 50, "max": 10}}},
+    {"game": {"spawn_delay": {"easy": 0}}},
+    {"colors": {"bg": "black"}},
+    {"progression": {"mode_order": ["color", "dance"]}},
+])
+def test_load_validates_values(tmp_path, data):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps(data))
+    with pytest.raises(ConfigError):
+        load(str(path), {})
+
+
+@pytest.mark.parametrize("content", [b"{broken", b"\xff\xfe{}", b"[1, 2]"])
+def test_load_reports_unreadable_files(tmp_path, content):
+    path = tmp_path / "config.json"
+    path.write_bytes(content)
+    with pytest.raises(ConfigError):
+        load(str(path), {})
+
+
+def test_compiled_config_is_immutable():
+    compiled = load(os.environ["REACTION_CONFIG"], {})
+    with pytest.raises(AttributeError):
+        compiled.game.shape_size = 1
+    with pytest.raises(TypeError):
+        compiled.game.spawn_delay["easy"] = 1
+
+
+def test_reload_only_when_file_changes():
+    path = os.environ["REACTION_CONFIG"]
+    before = config.current()
+    assert not config.reload_if_changed()
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"game": {"shape_size": 64}}, f)
+    assert config.reload_if_changed()
+    assert config.current().game.shape_size == 64
+    assert before.game.shape_size != 64
+
+    # Ошибка в файле оставляет прежнюю конфигурацию
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("{broken")
+    os.utime(path, (1, 1))
+    assert not config.reload_if_changed()
+    assert config.current().game.shape_size == 64
@@ -0,0 +1,125 @@
+"""
+Тесты игрового движка без дисплея
+"""
+import random
+from src.core.engine import GameEngine, ManualClock, Stimulus, compute_points, simulate_session
+from src.utils.config import current
+
+MS = 1_000_000
+
+
+def make_engine(mode="color", difficulty="easy", adaptive=False, seed=1):
+    clock = ManualClock()
+    engine = GameEngine(clock=clock, rng=random.Random(seed))
+    if not adaptive:
+        engine.adaptive = None
+    engine.start(mode, difficulty)
+    return engine, clock
+
+
+def test_hit_scores_reaction_against_base_delay():
+    engine, clock = make_engine()
+    stimulus = engine.choose_stimulus()
+    engine.present(stimulus)
+    clock.advance(500 * MS)
+
+    assert engine.hit_test(stimulus.x, stimulus.y)
+    result = engine.hit()
+
+    assert result.reaction_ns == 500 * MS
+    assert result.points == compute_points(0.5, current().game.spawn_delay["easy"])
+    assert engine.current_score == result.points
+    assert engine.best_score == result.points
+    assert engine.current is None
+
+
+def test_points_have_floor():
+    game = current().game
+    assert compute_points(10.0, 1000) == game.points_min
+    assert compute_points(0.0, 1000) == game.points_max
+
+
+def test_click_outside_stimulus_misses():
+    engine, _ = make_engine()
+    stimulus = engine.choose_stimulus()
+    engine.present(stimulus)
+
+    assert not engine.hit_test(stimulus.x + stimulus.size, stimulus.y)
+    assert engine.current is stimulus
+
+
+def test_shape_contains():
+    oval = Stimulus("oval", 100, 100, 50, "#ffffff", True)
+    triangle = Stimulus("triangle", 100, 100, 50, "#ffffff", True)
+    assert oval.contains(100, 100)
+    assert not oval.contains(124, 124)
+    assert triangle.contains(100, 120)
+    assert not triangle.contains(120, 80)
+
+
+def test_expire_clears_stimulus_without_points():
+    engine, _ = make_engine()
+    engine.present(engine.choose_stimulus())
+    engine.expire()
+
+    assert engine.current is None
+    assert engine.current_score == 0
+
+
+def test_expire_slows_adaptive_interval():
+    engine, _ = make_engine(adaptive=True)
+    before = engine.spawn_delay
+    engine.present(engine.choose_stimulus())
+    engine.expire()
+
+    assert engine.spawn_delay > before
+
+
+def test_silent_sound_stimulus_scores_nothing():
+    engine, _ = make_engine(mode="sound")
+    silent = Stimulus("oval", 200, 200, 50, "#ffffff", False)
+    engine.present(silent)
+    result = engine.hit(300 * MS)
+
+    assert not result.scored
+    assert result.points == 0
+    assert engine.current_score == 0
+
+
+def test_rush_targets_expire_and_hit():
+    engine, clock = make_engine(mode="rush")
+    targets = engine.spawn_targets()
+    assert len(targets) == current().game.rush.batch
+
+    first = targets[0].stimulus
+    clock.advance(200 * MS)
+    hit = engine.hit_target(first.x, first.y)
+    assert hit is not None
+    assert hit[1].reaction_ns == 200 * MS
+    assert targets[0].target_id not in engine.targets
+
+    clock.advance(engine.spawn_delay * MS)
+    expired = engine.expire_targets()
+    assert {target.target_id for target in expired} == {t.target_id for t in targets[1:]}
+    assert not engine.targets
+
+
+def test_rush_batch_respects_limit():
+    engine, _ = make_engine(mode="rush")
+    assert len(engine.spawn_targets(limit=1)) == 1
+
+
+def run_session(seed):
+    engine, clock = make_engine(adaptive=True, seed=seed)
+    return simulate_session(engine, 500, lambda rng: rng.gauss(450, 120), clock)
+
+
+def test_simulate_session_is_deterministic():
+    first = run_session(7)
+    assert run_session(7) == first
+    assert first["hits"] + first["misses"] == 500
+    assert first["score"] > 0
+
+
+def test_simulate_session_depends_on_seed():
+    assert run_session(7) != run_session(8)
@@ -0,0 +1,141 @@
+"""
+Тесты записи и воспроизведения сессий
+"""
+import random
+from src.core.engine import GameEngine, ManualClock
+from src.core.recording import CLICK, EVENT, HEADER, KINDS, SessionRecorder, replay_session
+from src.core.schedule import build_schedule
+
+MS = 1_000_000
+
+
+def start(path, mode, seed=1):
+    clock = ManualClock(10**12)
+    engine = GameEngine(clock=clock, rng=random.Random(seed))
+    recorder = SessionRecorder(str(path))
+    engine.start(mode, "easy")
+    engine.use_schedule(build_schedule(mode, engine.width, engine.height, seed=seed))
+    engine.rng.seed(seed)
+    recorder.start(engine, seed, clock())
+    return engine, clock, recorder
+
+
+def finish(engine, clock, recorder):
+    recorder.stop(engine, clock())
+    engine.stop()
+    recorder.close()
+
+
+def record_classic(path, trials=300):
+    engine, clock, recorder = start(path, "color")
+    rng = random.Random(42)
+    for trial in range(trials):
+        stimulus = engine.choose_stimulus()
+        engine.present(stimulus)
+        recorder.present(stimulus, engine.onset_ns)
+        clock.advance(rng.randint(150, 900) * MS)
+        if trial % 5 == 4:
+            recorder.expire(clock())
+            engine.expire()
+        elif trial % 7 == 6:
+            x, y = stimulus.x + 3 * stimulus.size, stimulus.y
+            engine.hit_test(x, y)
+            recorder.click(x, y, clock(), False)
+            recorder.expire(clock())
+            engine.expire()
+        else:
+            result = engine.hit()
+            recorder.click(stimulus.x, stimulus.y, clock(), True,
+                           result.reaction_ns, result.points)
+        clock.advance(200 * MS)
+    score = engine.current_score
+    finish(engine, clock, recorder)
+    return score
+
+
+def record_rush(path, ticks=40, move_at=None):
+    engine, clock, recorder = start(path, "rush")
+    for tick in range(ticks):
+        if tick == move_at:
+            for target in list(engine.targets.values()):
+                x, y = target.stimulus.x // 2, target.stimulus.y // 2
+                engine.move_target(target.target_id, x, y)
+                recorder.move(target.target_id, x, y, clock())
+        clock.advance(250 * MS)
+        recorder.expire(clock())
+        engine.expire_targets()
+        targets = engine.spawn_targets()
+        recorder.tick(clock(), clock(), targets)
+        if targets:
+            clock.advance(300 * MS)
+            target = targets[0].stimulus
+            hit = engine.hit_target(target.x, target.y)
+            recorder.click(target.x, target.y, clock(), True,
+                           hit[1].reaction_ns, hit[1].points)
+    score = engine.current_score
+    finish(engine, clock, recorder)
+    return score
+
+
+def test_classic_round_trip(tmp_path):
+    path = tmp_path / "classic.rec"
+    score = record_classic(path)
+    result = replay_session(str(path))
+
+    assert result.ok, result.mismatches
+    assert result.score == score > 0
+    assert 0 < result.hits < result.clicks
+
+
+def test_rush_round_trip(tmp_path):
+    path = tmp_path / "rush.rec"
+    score = record_rush(path)
+    result = replay_session(str(path))
+
+    assert result.ok, result.mismatches
+    assert result.score == score > 0
+
+
+def test_rush_round_trip_with_moved_targets(tmp_path):
+    path = tmp_path / "rush.rec"
+    score = record_rush(path, move_at=5)
+    result = replay_session(str(path))
+
+    assert result.ok, result.mismatches
+    assert result.score == score > 0
+
+
+def test_tampered_points_are_reported(tmp_path):
+    path = tmp_path / "classic.rec"
+    record_classic(path, trials=20)
+    data = bytearray(path.read_bytes())
+    # Первое событие клика: поле очков увеличиваем на 1
+    offset = HEADER.size
+    while offset < len(data):
+        fields = list(EVENT.unpack_from(data, offset))
+        if fields[0] == CLICK and fields[1]:
+            fields[8] += 1
+            EVENT.pack_into(data, offset, *fields)
+            break
+        offset += EVENT.size
+    path.write_bytes(bytes(data))
+
+    mismatches = replay_session(str(path)).mismatches
+    assert [mismatch.event for mismatch in mismatches] == ["points"]
+
+
+def test_truncated_rush_batch_is_reported(tmp_path):
+    path = tmp_path / "rush.rec"
+    record_rush(path, ticks=3)
+    # START, EXPIRE, TICK и две цели из четырех
+    cut = HEADER.size + 5 * EVENT.size
+    path.write_bytes(path.read_bytes()[:cut])
+
+    result = replay_session(str(path))
+    assert [(m.event, m.recorded, m.replayed) for m in result.mismatches] == [
+        ("targets", 2, 4)
+    ]
+
+
+def test_shape_codes_are_unique():
+    assert len(set(KINDS)) == len(KINDS)
@@ -0,0 +1,83 @@
+"""
+Тесты расписания стимулов
+"""
+from src.core.schedule import Rect, TrialSchedule, build_schedule
+from src.utils.config import current
+from src.utils.settings import SCHEDULE
+
+
+def take(schedule, count):
+    return [schedule.next_stimulus() for _ in range(count)]
+
+
+def test_stimuli_stay_inside_canvas():
+    width, height = 1920, 1080
+    schedule = build_schedule("rush", width, height, seed=3)
+    padding = current().game.shape_size + 20
+    stimuli = take(schedule, 3 * SCHEDULE["block_size"])
+
+    assert all(padding <= s.x <= width - padding for s in stimuli)
+    assert all(padding <= s.y <= height - padding for s in stimuli)
+    # Поле используется целиком, а не только область 800x600
+    assert max(s.x for s in stimuli) > 800
+    assert max(s.y for s in stimuli) > 600
+
+
+def test_stimuli_avoid_exclusions():
+    zones = [Rect(0, 0, 400, 300), Rect(500, 0, 800, 100)]
+    schedule = build_schedule("shape", 800, 600, zones, seed=5)
+    for stimulus in take(schedule, 2 * SCHEDULE["block_size"]):
+        half = stimulus.size / 2
+        for zone in zones:
+            overlaps = (stimulus.x + half > zone.x0 and stimulus.x - half < zone.x1
+                        and stimulus.y + half > zone.y0 and stimulus.y - half < zone.y1)
+            assert not overlaps, (stimulus, zone)
+
+
+def test_same_seed_same_sequence():
+    first = build_schedule("color", 800, 600, seed=11)
+    second = build_schedule("color", 800, 600, seed=11)
+    assert take(first, 600) == take(second, 600)
+    assert [first.next_interval(1000) for _ in range(300)] == \
+        [second.next_interval(1000) for _ in range(300)]
+
+
+def test_intervals_within_jitter():
+    schedule = build_schedule("color", 800, 600, seed=2)
+    jitter = SCHEDULE["interval_jitter"]
+    for _ in range(500):
+        assert 1000 * (1 - jitter) - 1 <= schedule.next_interval(1000) <= 1000 * (1 + jitter)
+
+
+def test_sound_mode_mixes_silent_stimuli():
+    stimuli = take(build_schedule("sound", 800, 600, seed=4), SCHEDULE["block_size"])
+    assert {s.kind for s in stimuli} == {"oval"}
+    assert any(s.has_sound for s in stimuli)
+    assert not all(s.has_sound for s in stimuli)
+
+
+def test_resize_keeps_position_and_moves_rest():
+    schedule = TrialSchedule("color", 9, 1920, 1080)
+    take(schedule, 10)
+    schedule.resize(640, 480)
+    padding = current().game.shape_size + 20
+
+    assert schedule._stimulus_index == 10
+    for stimulus in take(schedule, 300):
+        assert stimulus.x <= 640 - padding and stimulus.y <= 480 - padding
+
+
+def test_relocate_is_deterministic_and_keeps_sequence():
+    schedule = TrialSchedule("color", 9, 1920, 1080)
+    control = TrialSchedule("color", 9, 1920, 1080)
+    staged = take(schedule, 10)[-1]
+    take(control, 10)
+    schedule.resize(640, 480)
+    control.resize(640, 480)
+
+    moved = schedule.relocate(staged, "stimulus:9")
+    assert moved == schedule.relocate(staged, "stimulus:9")
+    assert schedule.fits(moved) and moved.kind == staged.kind
+    assert schedule.index == 10
+    assert take(schedule, 50) == take(control, 50)
+    assert schedule.relocate(moved, "stimulus:9") is moved
@@ -0,0 +1,75 @@
+"""
+Тесты хранилища профилей и рекордов
+"""
+import json
+import pytest
+from src.utils.storage import ScoreStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ScoreStore(str(tmp_path / "scores.db"), profile="alice",
+                       json_path=None, debounce=0)
+    yield store
+    store.close()
+
+
+def test_json_settings_migrated_once(tmp_path):
+    legacy = tmp_path / "best_score.json"
+    legacy.write_text(json.dumps(
+        {"best_score": 3200, "game_mode": "shape", "difficulty": "hard"}
+    ))
+    path = str(tmp_path / "scores.db")
+
+    store = ScoreStore(path, profile="alice", json_path=str(legacy), debounce=0)
+    assert store.load() == {"best_score": 3200, "game_mode": "shape", "difficulty": "hard"}
+    assert store.best_score("shape", "hard") == 3200
+    store.save({"best_score": 3200, "game_mode": "color", "difficulty": "easy"})
+    store.close()
+
+    # Повторный запуск не переносит файл заново поверх новых настроек
+    legacy.write_text(json.dumps({"best_score": 9999, "game_mode": "sound"}))
+    store = ScoreStore(path, profile="alice", json_path=str(legacy), debounce=0)
+    assert store.load() == {"best_score": 3200, "game_mode": "color", "difficulty": "easy"}
+    store.close()
+
+
+def test_missing_or_broken_json_is_ignored(tmp_path):
+    broken = tmp_path / "best_score.json"
+    broken.write_text("{not json")
+    store = ScoreStore(str(tmp_path / "scores.db"), json_path=str(broken), debounce=0)
+    assert store.load()["best_score"] == 0
+    store.close()
+
+
+def test_best_only_grows(store):
+    store.record_session("color", "easy", 500, 1, 2)
+    store.record_session("color", "easy", 300, 3, 4)
+    store.record_session("shape", "easy", 800, 5, 6)
+    store.flush()
+
+    assert store.best_score("color", "easy") == 500
+    assert store.best_score() == 800
+    assert store.profile_bests() == {("color", "easy"): 500, ("shape", "easy"): 800}
+
+
+def test_continued_game_updates_one_row(store):
+    store.record_session("color", "easy", 200, 10, 20)
+    store.record_session("color", "medium", 700, 10, 40)
+    store.flush()
+
+    rows = store._db.execute(
+        "SELECT mode, difficulty, score, started_at, ended_at FROM sessions"
+    ).fetchall()
+    assert rows == [("color", "medium", 700, 10, 40)]
+
+
+def test_leaderboard_across_profiles(store):
+    store.record_session("color", "easy", 400, 1, 2)
+    store.use_profile("bob")
+    store.record_session("color", "easy", 900, 3, 4)
+    store.record_session("color", "hard", 100, 5, 6)
+
+    assert store.leaderboard("color", "easy") == [("bob", 900), ("alice", 400)]
+    assert store.profiles() == ["alice", "bob"]
+    assert store.best_score() == 900